@@ -56,11 +56,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "albumz_app.observability.slow_queries.SlowQueryMiddleware",
+    "albumz_app.observability.middleware.MetricsMiddleware",
+    "albumz_app.observability.memory.MemoryPeakMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "albumz_app.observability.timing.ServerTimingMiddleware",
+    "albumz_app.observability.profiling.ProfilingMiddleware",
+    "albumz_app.replicas.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -110,6 +116,36 @@ else:
             "PORT": os.getenv("POSTGRESQL_PORT", "5432"),
         }
     }
+    # Trigram lookups used by fuzzy search.
+    INSTALLED_APPS.append("django.contrib.postgres")
+
+# Read replicas: the reads of GET requests are spread over them, see
+# albumz_app/replicas.py. Locally, a copy of db.sqlite3 can act as a replica.
+if DEBUG:
+    REPLICA_CONFIGS = [
+        {**DATABASES["default"], "NAME": BASE_DIR / name}
+        for name in os.getenv("DJANGO_SQLITE_REPLICAS", "").split(",")
+        if name
+    ]
+else:
+    REPLICA_CONFIGS = [
+        {**DATABASES["default"], "HOST": host}
+        for host in os.getenv("POSTGRESQL_REPLICA_HOSTS", "").split(",")
+        if host
+    ]
+for number, config in enumerate(REPLICA_CONFIGS, start=1):
+    DATABASES[f"replica{number}"] = {**config, "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["albumz_app.replicas.ReplicaRouter"]
+# After writing, a user reads from the primary for this many seconds.
+REPLICA_STICKINESS_SECONDS = 10
+# Replicas lagging more than REPLICA_MAX_LAG seconds are skipped; the lag is
+# measured at most every REPLICA_LAG_CHECK_INTERVAL seconds per process.
+REPLICA_MAX_LAG = 5
+REPLICA_LAG_CHECK_INTERVAL = 5
+# PostgreSQL only: number of hash partitions (by user) `manage.py
+# partition_albums` creates for the album table, see albumz_app/partitioning.py.
+ALBUM_PARTITIONS = int(os.getenv("ALBUM_PARTITIONS", 16))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -158,6 +194,23 @@ STATICFILES_DIRS = [
 # This is only used when you run `collectstatic` for production
 STATIC_ROOT = BASE_DIR / "static"  # <project_root>/static/
 
+# In production `collectstatic` fingerprints and precompresses the static
+# files, see albumz_app/static_storage.py.
+if DEBUG:
+    STATIC_FILES_BACKEND = "django.contrib.staticfiles.storage.StaticFilesStorage"
+else:
+    STATIC_FILES_BACKEND = (
+        "albumz_app.static_storage.CompressedManifestStaticFilesStorage"
+    )
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": STATIC_FILES_BACKEND},
+}
+
+# Uploaded album covers and their thumbnails, served by nginx in production
+MEDIA_URL = "/media/"
+MEDIA_ROOT = Path(os.getenv("DJANGO_MEDIA_ROOT", BASE_DIR / "media"))
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -168,3 +221,169 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
 }
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Shared by all Gunicorn workers of a container (the file based cache needs no
+# extra service), so per-user state such as API throttling is global.
+# The API throttling buckets have a cache of their own: culling the default
+# cache (at 300 entries) would refill the buckets it evicts. A bucket expires
+# once it is full again, so only recently active users hold an entry.
+THROTTLE_CACHE_MAX_ENTRIES = 100_000
+
+if DEBUG:
+    CACHES = {
+        "default": {
+            "BACKEND": "albumz_app.observability.cache.InstrumentedLocMemCache",
+        },
+        "throttle": {
+            "BACKEND": "albumz_app.observability.cache.InstrumentedLocMemCache",
+            "LOCATION": "throttle",
+            "OPTIONS": {"MAX_ENTRIES": THROTTLE_CACHE_MAX_ENTRIES},
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "albumz_app.observability.cache.InstrumentedFileBasedCache",
+            "LOCATION": os.getenv("DJANGO_CACHE_DIR", "/tmp/albumz_cache"),
+        },
+        "throttle": {
+            "BACKEND": "albumz_app.observability.cache.InstrumentedFileBasedCache",
+            "LOCATION": os.getenv(
+                "DJANGO_THROTTLE_CACHE_DIR", "/tmp/albumz_throttle_cache"
+            ),
+            "OPTIONS": {"MAX_ENTRIES": THROTTLE_CACHE_MAX_ENTRIES},
+        },
+    }
+
+# Prometheus scrapes /metrics with an "Authorization: Bearer <METRICS_TOKEN>"
+# header, staff users can open it in the browser. Without a token only staff
+# users have access.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Statements of a request taking longer than SLOW_QUERY_THRESHOLD_MS are logged
+# and stored, see `manage.py slow_queries`. The estimated plans (EXPLAIN without
+# ANALYZE) of this share of them are captured as well.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1))
+
+# Responses carry a Server-Timing header (auth, db, render and app time) for
+# every request with SERVER_TIMING, or only for staff users with
+# SERVER_TIMING_FOR_STAFF.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "False") == "True"
+SERVER_TIMING_FOR_STAFF = os.getenv("SERVER_TIMING_FOR_STAFF", "True") == "True"
+
+# Staff users profile a request with the X-Profile header or the ?profile query
+# parameter. The stack is sampled every PROFILE_SAMPLE_INTERVAL seconds and
+# only the newest PROFILES_MAX_COUNT profiles are kept on the local disk.
+PROFILES_ROOT = Path(os.getenv("DJANGO_PROFILES_ROOT", BASE_DIR / "profiles"))
+PROFILES_MAX_COUNT = 100
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+# Traces allocations with tracemalloc from the start of every worker (slow, for
+# diagnosing leaks), keeping MEMORY_TRACING_FRAMES frames per allocation.
+# Staff users can also start it in a single worker through /memory.
+MEMORY_TRACING = os.getenv("MEMORY_TRACING", "False") == "True"
+MEMORY_TRACING_FRAMES = 25
+
+# Collaborative filtering recommendations (see `manage.py
+# refresh_recommendations`): recommendations kept per user, neighbours kept per
+# album, albums owned by fewer users are not recommended, and the number of
+# processes computing the similarities (the number of CPUs by default).
+RECOMMENDATIONS_PER_USER = 20
+RECOMMENDATION_NEIGHBORS = 50
+RECOMMENDATION_MIN_OWNERS = 2
+RECOMMENDATION_PROCESSES = int(os.getenv("RECOMMENDATION_PROCESSES", 0)) or None
+# Collectors with the most similar rating profiles kept per user (see `manage.py
+# refresh_similar_collectors`).
+SIMILAR_COLLECTORS_PER_USER = 10
+
+# Site-wide leaderboards (see `manage.py reconcile_leaderboards`): albums listed
+# by default and at most, and the ratings an album needs to be among the
+# highest rated.
+LEADERBOARD_SIZE = 20
+LEADERBOARD_MAX_SIZE = 100
+LEADERBOARD_MIN_RATINGS = 5
+
+# Albums whose normalized artist and title are equal are duplicates. Changing
+# this requires `manage.py rebuild_match_keys`.
+ALBUM_MATCH_KEY_STRIP_ARTICLES = True
+
+# Token-bucket throttling of the albums API, per user and per action.
+# "burst" is the bucket size, "refill" the number of tokens regained per second.
+API_THROTTLE_BUCKETS = {
+    "default": {"burst": 60, "refill": 1.0},
+    "list": {"burst": 60, "refill": 1.0},
+    "create": {"burst": 30, "refill": 0.5},
+    "average_rating": {"burst": 20, "refill": 0.2},
+    "move_to_collection": {"burst": 30, "refill": 0.5},
+    "cover": {"burst": 10, "refill": 0.1},
+    "bulk_delete": {"burst": 5, "refill": 0.05},
+    "import_albums": {"burst": 5, "refill": 0.01},
+    "autocomplete": {"burst": 120, "refill": 5.0},
+    "recommendations": {"burst": 30, "refill": 0.5},
+    "similar_collectors": {"burst": 30, "refill": 0.5},
+    "changes": {"burst": 60, "refill": 1.0},
+}
+
+# Background jobs (see `manage.py run_jobs`)
+# A failed job is retried after JOB_RETRY_BACKOFF * 2 ** (attempt - 1) seconds.
+# Workers refresh the lock of their running jobs every JOB_HEARTBEAT_INTERVAL
+# seconds (and on every progress report); a job whose lock was not refreshed
+# for JOB_LOCK_TIMEOUT seconds is considered abandoned by a dead worker and is
+# queued again.
+JOB_RETRY_BACKOFF = 10
+JOB_HEARTBEAT_INTERVAL = 60
+JOB_LOCK_TIMEOUT = 10 * 60
+
+# Album imports (see `manage.py import_albums`)
+# Uploaded files are kept outside of MEDIA_ROOT, so they are never served.
+IMPORTS_ROOT = Path(os.getenv("DJANGO_IMPORTS_ROOT", BASE_DIR / "imports"))
+IMPORT_CHUNK_SIZE = 1000
+# Uploads are deleted when their import finishes or finally fails; `manage.py
+# purge_import_uploads` deletes any left over after this many days.
+IMPORT_UPLOAD_RETENTION_DAYS = 7
+
+# Delta sync (`/api/albums/changes/`): changes returned per page, and how long
+# the tombstones of deleted albums are kept (see `manage.py compact_tombstones`).
+# Clients that do not sync within the retention window have to sync all albums.
+SYNC_PAGE_SIZE = 500
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# Live album events (server-sent events at /albumz/events/, served by the ASGI
+# processes, see albumz_app/live/). Between processes the events go through
+# PostgreSQL's LISTEN/NOTIFY; the local backend only reaches the streams of the
+# writing process. A stream queues at most LIVE_QUEUE_SIZE events, a client
+# reading slower is told to resync instead. Streams send a keepalive comment
+# every LIVE_KEEPALIVE_SECONDS and end after LIVE_STREAM_MAX_SECONDS.
+if DEBUG:
+    LIVE_EVENTS_BACKEND = "albumz_app.live.backends.LocalBackend"
+else:
+    LIVE_EVENTS_BACKEND = "albumz_app.live.backends.PostgresBackend"
+LIVE_QUEUE_SIZE = 100
+LIVE_KEEPALIVE_SECONDS = 15
+LIVE_STREAM_MAX_SECONDS = 15 * 60
+
+# Album covers: the largest upload accepted, the largest image (in pixels) the
+# thumbnail job decodes, and the edge length of each square thumbnail size.
+# The uploaded originals are kept outside of MEDIA_ROOT, only the thumbnails
+# are served.
+COVER_ORIGINALS_ROOT = Path(
+    os.getenv("DJANGO_COVER_ORIGINALS_ROOT", BASE_DIR / "cover_originals")
+)
+COVER_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+COVER_MAX_PIXELS = 40_000_000
+COVER_THUMBNAIL_SIZES = {"small": 96, "large": 440}
+
+# Search bar autocomplete: completions per kind, and how long clients may reuse
+# a response (new albums show up in completions after at most that long).
+AUTOCOMPLETE_MAX_RESULTS = 10
+AUTOCOMPLETE_CACHE_SECONDS = 60
+
+# Fuzzy search: minimal trigram similarity of a match (pg_trgm word similarity
+# on PostgreSQL, share of the query's trigrams elsewhere), and how many albums
+# containing the query, and how many other candidates, are re-ranked by edit
+# distance when pg_trgm is not available.
+FUZZY_SEARCH_THRESHOLD = 0.3
+FUZZY_SEARCH_CANDIDATES = 50
@@ -15,9 +15,13 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
+from albumz_app.observability.views import memory_view, metrics_view, profile_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("accounts.urls")),
@@ -25,4 +29,10 @@ urlpatterns = [
     path("albumz/", include("albumz_app.urls")),
     path("api/", include("albumz_app.api.urls")),
     path("api-accounts/", include("rest_framework.urls")),
+    path("metrics", metrics_view, name="metrics"),
+    path("profiles/<slug:name>", profile_view, name="profile"),
+    path("memory", memory_view, name="memory"),
 ]
+
+# In production nginx serves the covers from MEDIA_ROOT itself.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,22 +1,72 @@
 from django.contrib import admin
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import format_html
 
-from .domain.models import Album, User
-
-
-class AlbumInline(admin.TabularInline):
-    model = Album
-    extra = 3
+from .domain.models import Album, Artist, User
+from .observability.models import SlowQuery
+from .paginators import EstimatedCountPaginator
 
 
 class UserAdmin(admin.ModelAdmin):
-    inlines = [AlbumInline]
+    list_display = ["username"]
+    list_select_related = ["auth_user"]
+    raw_id_fields = ["auth_user"]
+    readonly_fields = ["albums_link"]
+    search_fields = ["auth_user__username"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description="Albums")
+    def albums_link(self, user):
+        # A link instead of an inline, which would render every album at once.
+        url = reverse("admin:albumz_app_album_changelist")
+        return format_html(
+            '<a href="{}?user__id__exact={}">Albums of {}</a>', url, user.pk, user
+        )
 
 
 class AlbumAdmin(admin.ModelAdmin):
     list_display = ["title", "artist", "add_date", "user"]
     list_filter = ["add_date"]
-    search_fields = ["title", "artist"]
+    list_select_related = ["user__auth_user", "artist_ref"]
+    search_fields = ["^title", "^artist_spelling", "^artist_ref__name"]
+    search_help_text = "Titles or artist names starting with the search text."
+    raw_id_fields = ["user", "artist_ref"]
+    ordering = ["-pk"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Matching artists through a subquery (instead of a join) lets the
+        # title, own spelling and artist name prefixes use their own indexes.
+        term = search_term.strip()
+        if term:
+            queryset = queryset.filter(
+                Q(title__istartswith=term)
+                | Q(artist_spelling__istartswith=term)
+                | Q(artist_ref__in=Artist.objects.filter(name__istartswith=term))
+            )
+        return queryset, False
+
+
+class ArtistAdmin(admin.ModelAdmin):
+    list_display = ["name"]
+    search_fields = ["^name"]
+    ordering = ["-pk"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ["created_at", "duration_ms", "view", "user_id", "database"]
+    list_filter = ["view", "database"]
+    search_fields = ["=fingerprint"]
+    ordering = ["-created_at"]
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
 
 
 admin.site.register(User, UserAdmin)
 admin.site.register(Album, AlbumAdmin)
+admin.site.register(Artist, ArtistAdmin)
+admin.site.register(SlowQuery, SlowQueryAdmin)
@@ -0,0 +1,35 @@
+from django.db import models
+
+from ..domain.models import Rating
+from .models import MonthlyRollup
+
+
+def collection_analytics(user):
+    """Chart series of the collection of a user, summed from their rollups."""
+    rollups = MonthlyRollup.objects.for_user(user)
+    total = models.Sum("albums")
+    ratings = dict(
+        rollups.values("rating").annotate(albums=total).values_list("rating", "albums")
+    )
+    genres_per_month = {}
+    for entry in rollups.values("month", "genre").annotate(albums=total):
+        genres = genres_per_month.setdefault(entry["month"], {})
+        genres[entry["genre"]] = entry["albums"]
+    return {
+        "added_per_month": list(
+            rollups.values("month").annotate(albums=total).order_by("month")
+        ),
+        "genres_per_month": [
+            {"month": month, "genres": genres}
+            for month, genres in sorted(genres_per_month.items())
+        ],
+        "ratings": [
+            {"rating": rating, "albums": ratings.get(rating, 0)}
+            for rating in Rating.values
+        ],
+        "decades": list(
+            rollups.values("decade")
+            .annotate(albums=total)
+            .order_by(models.F("decade").asc(nulls_first=True))
+        ),
+    }
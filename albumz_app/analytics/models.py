@@ -0,0 +1,137 @@
+from django.db import IntegrityError, connections, models, transaction
+
+from ..domain.models import Genre, Rating, User
+
+
+def month_of(day):
+    return day.replace(day=1)
+
+
+def decade_of(day):
+    return None if day is None else day.year // 10 * 10
+
+
+class MonthlyRollupQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(user=user, albums__gt=0)
+
+
+class MonthlyRollupManager(models.Manager.from_queryset(MonthlyRollupQuerySet)):
+    def lock_users(self, user_ids, exclusive=False):
+        """Locks the users whose rollups change until the transaction ends.
+
+        Writers share the lock and never wait for each other, `rebuild_rollups`
+        takes it exclusively, so no write is lost between its read of the
+        albums and its rewrite of the rollups.
+        """
+        connection = connections[self.db]
+        if not user_ids or not connection.features.has_select_for_update:
+            return
+        table = connection.ops.quote_name(User._meta.db_table)
+        pk = connection.ops.quote_name(User._meta.pk.column)
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {pk} FROM {table} WHERE {pk} IN ({placeholders}) "
+                f"ORDER BY {pk} FOR {'UPDATE' if exclusive else 'SHARE'}",
+                list(user_ids),
+            )
+
+    def apply(self, changes):
+        """Adds the deltas of `RollupChanges` with atomic updates, in key order.
+
+        Call it in the transaction of the album write, which holds the lock.
+        """
+        self.lock_users({key[0] for key, delta in changes.deltas.items() if delta})
+        for key, delta in sorted(changes.deltas.items(), key=rollup_sort_key):
+            if not delta:
+                continue
+            rollup = dict(zip(ROLLUP_KEY, key))
+            if not self.filter(**rollup).update(albums=models.F("albums") + delta):
+                if delta < 0:
+                    continue
+                try:
+                    with transaction.atomic(using=self.db):
+                        self.create(**rollup, albums=delta)
+                        continue
+                except IntegrityError:
+                    pass  # Created by a concurrent writer meanwhile.
+                self.filter(**rollup).update(albums=models.F("albums") + delta)
+
+
+class MonthlyRollup(models.Model):
+    """Albums of a collection added in a month, by genre, rating and decade.
+
+    The dashboard charts are sums over the few rollup rows of a user. Album
+    writes keep them up to date, see `RollupChanges`; `manage.py
+    rebuild_rollups` recomputes them.
+    """
+
+    objects = MonthlyRollupManager()
+    user = models.ForeignKey(User, models.CASCADE, related_name="monthly_rollups")
+    month = models.DateField("First day of the month the albums were added in.")
+    genre = models.CharField(max_length=30, choices=Genre.choices)
+    rating = models.SmallIntegerField(choices=Rating.choices)
+    decade = models.SmallIntegerField(
+        "First year of the decade of publication.", null=True, blank=True
+    )
+    albums = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "month", "genre", "rating", "decade"],
+                condition=models.Q(decade__isnull=False),
+                name="monthly_rollup_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "month", "genre", "rating"],
+                condition=models.Q(decade__isnull=True),
+                name="monthly_rollup_no_decade_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "month"], name="monthly_rollup_user_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.albums} albums of {self.user} in {self.month:%Y-%m}"
+
+
+ROLLUP_KEY = ["user_id", "month", "genre", "rating", "decade"]
+
+
+def rollup_sort_key(item):
+    # Albums without a publication date sort before the decades.
+    *key, decade = item[0]
+    return (*key, decade is not None, decade or 0)
+
+
+class RollupChanges:
+    """Rollup deltas of albums added to and removed from collections.
+
+    Only albums in the collection are counted, wishlist albums once moved.
+    """
+
+    def __init__(self):
+        self.deltas = {}
+
+    def add(self, albums, sign=1):
+        for album in albums:
+            if not album.owned:
+                continue
+            key = (
+                album.user_id,
+                month_of(album.add_date),
+                album.genre,
+                album.user_rating,
+                decade_of(album.pub_date),
+            )
+            self.deltas[key] = self.deltas.get(key, 0) + sign
+        return self
+
+    def remove(self, albums):
+        return self.add(albums, sign=-1)
+
+    def apply(self):
+        MonthlyRollup.objects.apply(self)
@@ -0,0 +1,46 @@
+"""Recomputes the monthly rollups of users from their albums."""
+
+from django.db import transaction
+
+from ..domain.models import Album, User
+from .models import ROLLUP_KEY, MonthlyRollup, RollupChanges
+
+BATCH_SIZE = 100
+ROLLUP_FIELDS = ["user", "add_date", "genre", "user_rating", "pub_date", "owned"]
+
+
+def rebuild_batch(user_ids):
+    with transaction.atomic():
+        # Writes of these users wait until the rewrite commits, and the albums
+        # are read once the writes in flight have committed.
+        MonthlyRollup.objects.lock_users(user_ids, exclusive=True)
+        changes = RollupChanges().add(
+            Album.albums.select_related(None)
+            .filter(user_id__in=user_ids, owned=True)
+            .only(*ROLLUP_FIELDS)
+            .iterator(chunk_size=10_000)
+        )
+        MonthlyRollup.objects.filter(user_id__in=user_ids).delete()
+        MonthlyRollup.objects.bulk_create(
+            [
+                MonthlyRollup(**dict(zip(ROLLUP_KEY, key)), albums=albums)
+                for key, albums in changes.deltas.items()
+            ],
+            batch_size=1000,
+        )
+    return len(changes.deltas)
+
+
+def rebuild_rollups(users=None, batch_size=BATCH_SIZE):
+    """Rebuilds the rollups of `users` (all by default) a batch at a time,
+    returning the number of rollup rows written."""
+    users = User.objects.all() if users is None else users
+    written, last_pk = 0, 0
+    while user_ids := list(
+        users.filter(pk__gt=last_pk)
+        .order_by("pk")
+        .values_list("pk", flat=True)[:batch_size]
+    ):
+        written += rebuild_batch(user_ids)
+        last_pk = user_ids[-1]
+    return written
@@ -0,0 +1,21 @@
+from rest_framework import filters
+
+from ..domain.facets import album_conditions
+from .serializers import AlbumFilterSerializer
+
+
+class AlbumFilterBackend(filters.BaseFilterBackend):
+    """Filters albums by genre, rating, ownership, decade and pub_date range.
+
+    The conditions are kept on the request (as `album_conditions`), so that
+    facet counts can be computed for the same selection when `facets` is set.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        serializer = AlbumFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = dict(serializer.validated_data)
+        request.include_facets = filters.pop("facets")
+        conditions = album_conditions(**filters)
+        request.album_conditions = conditions
+        return queryset.filter(*conditions.values())
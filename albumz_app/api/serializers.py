@@ -1,8 +1,15 @@
+from django.conf import settings
 from django.utils import timezone
 from rest_framework import serializers
 
 from ..constants import ResponseStrings, ReverseURLNames
-from ..domain.models import Album, Genre
+from ..covers.uploads import validate_cover
+from ..domain.facets import MAX_DECADE, MIN_DECADE
+from ..domain.models import Album, Artist, Genre, Rating
+from ..jobs.models import Job
+from ..leaderboards.models import AlbumPopularity
+from ..observability.timing import server_timing_phase
+from ..recommendations.models import Recommendation, SimilarCollector
 
 
 def validate_pub_date(value):
@@ -13,7 +20,14 @@ def validate_pub_date(value):
     return value
 
 
-class AlbumListSerializer(serializers.HyperlinkedModelSerializer):
+class ServerTimingMixin:
+    def to_representation(self, instance):
+        with server_timing_phase("render"):
+            return super().to_representation(instance)
+
+
+class AlbumListSerializer(ServerTimingMixin, serializers.HyperlinkedModelSerializer):
+    artist = serializers.CharField(max_length=100)
     details = serializers.HyperlinkedIdentityField(
         view_name=ReverseURLNames.API.DETAIL, read_only=True
     )
@@ -35,18 +49,171 @@ class AlbumListSerializer(serializers.HyperlinkedModelSerializer):
         return validate_pub_date(value)
 
 
-class AlbumDetailSerializer(serializers.ModelSerializer):
+class AlbumDetailSerializer(ServerTimingMixin, serializers.ModelSerializer):
+    artist = serializers.CharField(max_length=100)
+    cover_urls = serializers.DictField(read_only=True)
+
     class Meta:
         model = Album
-        fields = ["id", "title", "artist", "pub_date", "genre", "user_rating", "owned"]
+        fields = [
+            "id",
+            "title",
+            "artist",
+            "pub_date",
+            "genre",
+            "user_rating",
+            "owned",
+            "cover_urls",
+        ]
         read_only_fields = ["owned"]
 
     def validate_pub_date(self, value):
         return validate_pub_date(value)
 
 
+class ArtistSerializer(serializers.HyperlinkedModelSerializer):
+    details = serializers.HyperlinkedIdentityField(
+        view_name=ReverseURLNames.API.ARTIST_DETAIL, read_only=True
+    )
+    name = serializers.CharField(source="user_name", read_only=True)
+    album_count = serializers.IntegerField(read_only=True)
+    owned_count = serializers.IntegerField(read_only=True)
+    average_rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Artist
+        fields = [
+            "id",
+            "name",
+            "album_count",
+            "owned_count",
+            "average_rating",
+            "details",
+        ]
+
+
+class ArtistDetailSerializer(ArtistSerializer):
+    albums = serializers.SerializerMethodField()
+
+    class Meta(ArtistSerializer.Meta):
+        fields = ArtistSerializer.Meta.fields + ["albums"]
+
+    def get_albums(self, artist):
+        albums = artist.albums.filter(user=self.context["request"].user.albumz_user)
+        return AlbumListSerializer(
+            albums.order_by("pub_date", "title"), many=True, context=self.context
+        ).data
+
+
 class GenreFilterSerializer(serializers.Serializer):
     genre = serializers.ChoiceField(choices=Genre.choices, required=False)
 
     def validate_genre(self, value):
         return value.upper()
+
+
+class AlbumFilterSerializer(serializers.Serializer):
+    genre = serializers.MultipleChoiceField(choices=Genre.choices, required=False)
+    rating = serializers.MultipleChoiceField(choices=Rating.choices, required=False)
+    owned = serializers.BooleanField(required=False, allow_null=True)
+    decade = serializers.IntegerField(
+        min_value=MIN_DECADE, max_value=MAX_DECADE, required=False
+    )
+    pub_date_after = serializers.DateField(required=False)
+    pub_date_before = serializers.DateField(required=False)
+    facets = serializers.BooleanField(required=False)
+
+    def validate_decade(self, value):
+        if value % 10:
+            raise serializers.ValidationError(ResponseStrings.DECADE_ERROR)
+        return value
+
+
+class RecommendationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Recommendation
+        fields = ["rank", "title", "artist", "score"]
+
+
+class SimilarCollectorSerializer(serializers.ModelSerializer):
+    collector = serializers.CharField(source="public_collector_id", read_only=True)
+
+    class Meta:
+        model = SimilarCollector
+        fields = ["rank", "collector", "score"]
+
+
+class LeaderboardQuerySerializer(GenreFilterSerializer):
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.LEADERBOARD_MAX_SIZE, required=False
+    )
+
+
+class AlbumPopularitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AlbumPopularity
+        fields = [
+            "title",
+            "artist",
+            "owners",
+            "wishlisters",
+            "ratings",
+            "average_rating",
+        ]
+
+
+class AutocompleteSerializer(serializers.Serializer):
+    prefix = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_limit(self, value):
+        return min(value, settings.AUTOCOMPLETE_MAX_RESULTS)
+
+
+class BulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+
+
+class AlbumImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=["csv", "json"], required=False)
+    owned = serializers.BooleanField(default=True)
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0)
+
+
+class ChangesSerializer(serializers.Serializer):
+    albums = AlbumDetailSerializer(many=True)
+    deleted = serializers.ListField(child=serializers.IntegerField())
+    token = serializers.IntegerField()
+    has_more = serializers.BooleanField()
+
+
+class CoverUploadSerializer(serializers.Serializer):
+    file = serializers.FileField(validators=[validate_cover])
+
+
+class JobSerializer(serializers.HyperlinkedModelSerializer):
+    details = serializers.HyperlinkedIdentityField(
+        view_name=ReverseURLNames.API.JOB_DETAIL, read_only=True
+    )
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "name",
+            "status",
+            "attempts",
+            "max_attempts",
+            "progress_done",
+            "progress_total",
+            "result",
+            "created_at",
+            "finished_at",
+            "details",
+        ]
@@ -0,0 +1,44 @@
+from datetime import date
+
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ReverseURLNames
+from ...domain.models import Album, Genre, Rating
+
+
+class TestAnalyticsAPI:
+    def test_analytics_require_login(self, api_client):
+        response = api_client.get(reverse(ReverseURLNames.API.ANALYTICS))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_analytics_of_the_users_collection(
+        self, auth_api_client, domain_user, user_factory
+    ):
+        # Given
+        domain_user.add_to_collection(
+            Album(
+                title="A",
+                artist="X",
+                genre=Genre.POP,
+                user_rating=Rating.BAD,
+                pub_date=date(1984, 1, 1),
+            )
+        )
+        user_factory(username="otheruser").albumz_user.add_to_collection(
+            Album(title="B", artist="X")
+        )
+        month = date.today().replace(day=1).isoformat()
+        # When
+        response = auth_api_client.get(reverse(ReverseURLNames.API.ANALYTICS))
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "added_per_month": [{"month": month, "albums": 1}],
+            "genres_per_month": [{"month": month, "genres": {"POP": 1}}],
+            "ratings": [
+                {"rating": rating, "albums": int(rating == Rating.BAD)}
+                for rating in Rating.values
+            ],
+            "decades": [{"decade": 1980, "albums": 1}],
+        }
@@ -0,0 +1,96 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ReverseURLNames
+from ...domain.models import Artist, Rating
+
+
+class TestArtistsAPI:
+    def test_artist_list_view_requires_login(self, api_client):
+        response = api_client.get(reverse(ReverseURLNames.API.ARTISTS))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_artist_list_view_aggregates_users_albums(
+        self, auth_api_client, domain_user, user_factory
+    ):
+        # Given
+        domain_user.albums.create(
+            title="Kind of Blue", artist="Miles Davis", owned=True, user_rating=6
+        )
+        domain_user.albums.create(
+            title="Bitches Brew",
+            artist="miles davis",
+            owned=False,
+            user_rating=Rating.NO_OPINION_YET,
+        )
+        domain_user.albums.create(
+            title="Blue Train", artist="John Coltrane", owned=True, user_rating=4
+        )
+        other_user = user_factory(username="otheruser").albumz_user
+        other_user.albums.create(
+            title="In a Silent Way", artist="Miles Davis", owned=True
+        )
+        other_user.albums.create(title="Homogenic", artist="Björk", owned=True)
+        # When
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.ARTISTS), format="json"
+        )
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert [
+            (
+                artist["name"],
+                artist["album_count"],
+                artist["owned_count"],
+                artist["average_rating"],
+            )
+            for artist in response.data["results"]
+        ] == [("John Coltrane", 1, 1, 4.0), ("Miles Davis", 2, 1, 6.0)]
+
+    def test_artist_list_view_names_artists_as_the_user_spells_them(
+        self, auth_api_client, domain_user, user_factory
+    ):
+        # Given
+        other_user = user_factory(username="otheruser").albumz_user
+        other_user.albums.create(title="Homogenic", artist="Björk", owned=True)
+        domain_user.albums.create(title="Debut", artist="bjork", owned=True)
+        # When
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.ARTISTS), format="json"
+        )
+        # Then
+        assert [artist["name"] for artist in response.data["results"]] == ["bjork"]
+
+    def test_artist_detail_view_lists_only_users_albums(
+        self, auth_api_client, domain_user, user_factory
+    ):
+        # Given
+        album = domain_user.albums.create(
+            title="Kind of Blue", artist="Miles Davis", owned=True
+        )
+        other_user = user_factory(username="otheruser").albumz_user
+        other_user.albums.create(
+            title="In a Silent Way", artist="Miles Davis", owned=True
+        )
+        # When
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.ARTIST_DETAIL, args=[album.artist_ref_id]),
+            format="json",
+        )
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["album_count"] == 1
+        assert [a["title"] for a in response.data["albums"]] == ["Kind of Blue"]
+
+    def test_artist_detail_view_hides_artists_without_users_albums(
+        self, auth_api_client, db
+    ):
+        # Given
+        artist = Artist.objects.get_for_name("Björk")
+        # When
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.ARTIST_DETAIL, args=[artist.pk]),
+            format="json",
+        )
+        # Then
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ReverseURLNames
+
+
+class TestAutocompleteAPI:
+    @pytest.fixture
+    def albums(self, domain_user, user_factory):
+        for title, artist in [
+            ("Abbey Road", "The Beatles"),
+            ("Abbey Road", "Beatles"),
+            ("Let It Be", "The Beatles"),
+            ("Abraxas", "Santana"),
+            ("Bad", "Michael Jackson"),
+        ]:
+            domain_user.albums.create(title=title, artist=artist, owned=True)
+        other_user = user_factory(username="otheruser").albumz_user
+        other_user.albums.create(title="Absolution", artist="Muse", owned=True)
+        other_user.albums.create(title="Abc", artist="Abba", owned=True)
+
+    def get(self, client, **params):
+        return client.get(
+            reverse(ReverseURLNames.API.AUTOCOMPLETE), params, format="json"
+        )
+
+    def test_autocomplete_requires_login(self, api_client):
+        response = self.get(api_client, prefix="ab")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_autocomplete_returns_distinct_users_completions(
+        self, auth_api_client, albums
+    ):
+        # When
+        response = self.get(auth_api_client, prefix="AB")
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"artists": [], "titles": ["Abbey Road", "Abraxas"]}
+        assert "private" in response["Cache-Control"]
+        assert "max-age=" in response["Cache-Control"]
+
+    def test_autocomplete_artists(self, auth_api_client, albums):
+        response = self.get(auth_api_client, prefix="the b")
+        assert response.data == {"artists": ["The Beatles"], "titles": []}
+
+    def test_autocomplete_caps_limit(self, auth_api_client, albums, settings):
+        # Given
+        settings.AUTOCOMPLETE_MAX_RESULTS = 1
+        # When
+        response = self.get(auth_api_client, prefix="ab", limit=50)
+        # Then
+        assert response.data["titles"] == ["Abbey Road"]
+
+    def test_autocomplete_requires_prefix(self, auth_api_client):
+        response = self.get(auth_api_client)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "prefix" in response.data
+
+    @pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite query plan")
+    def test_title_completions_use_prefix_index(self, domain_user, albums):
+        # Given
+        with CaptureQueriesContext(connection) as captured:
+            list(domain_user.albums.title_completions("ab")[:5])
+        # When
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + captured[0]["sql"])
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        # Then
+        assert "album_user_title_prefix_idx" in plan
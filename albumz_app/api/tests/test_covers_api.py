@@ -0,0 +1,84 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ResponseStrings, ReverseURLNames
+from ...covers.models import Cover
+from ...jobs.models import Job
+from ...jobs.queue import claim_next, run_job
+
+
+def image_file(name="cover.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (300, 300), "green").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class TestCoverAPI:
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path / "media"
+        settings.COVER_ORIGINALS_ROOT = tmp_path / "originals"
+
+    @pytest.fixture
+    def album(self, domain_user):
+        return domain_user.albums.create(title="Blue Train", artist="X", owned=True)
+
+    def upload(self, client, album, file):
+        return client.post(
+            reverse(ReverseURLNames.API.COVER, args=[album.pk]),
+            {"file": file},
+            format="multipart",
+        )
+
+    def test_cover_upload_requires_login(self, api_client, album):
+        response = self.upload(api_client, album, image_file())
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_new_cover_queues_thumbnails(self, auth_api_client, album):
+        # When
+        response = self.upload(auth_api_client, album, image_file())
+        # Then
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job = Job.objects.get(pk=response.data["job"]["id"])
+        assert job.payload == {"cover_id": Cover.objects.get().pk}
+
+    def test_known_cover_returns_thumbnail_urls(
+        self, auth_api_client, album, domain_user
+    ):
+        # Given
+        other = domain_user.albums.create(title="Giant Steps", artist="X", owned=True)
+        self.upload(auth_api_client, other, image_file())
+        run_job(claim_next("test-worker"))
+        # When
+        response = self.upload(auth_api_client, album, image_file("same.jpg"))
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data["cover_urls"]) == {"small", "large"}
+        detail = auth_api_client.get(
+            reverse(ReverseURLNames.API.DETAIL, args=[album.pk])
+        )
+        assert detail.data["cover_urls"] == response.data["cover_urls"]
+
+    def test_invalid_file_is_rejected(self, auth_api_client, album):
+        # When
+        response = self.upload(
+            auth_api_client, album, SimpleUploadedFile("cover.jpg", b"not an image")
+        )
+        # Then
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["file"] == [ResponseStrings.COVER_FORMAT_ERROR]
+        assert Job.objects.count() == 0
+
+    def test_cover_of_other_user_album_not_found(self, auth_api_client, user_factory):
+        # Given
+        other_user = user_factory(username="other").albumz_user
+        album = other_user.albums.create(title="A", artist="X", owned=True)
+        # When
+        response = self.upload(auth_api_client, album, image_file())
+        # Then
+        assert response.status_code == status.HTTP_404_NOT_FOUND
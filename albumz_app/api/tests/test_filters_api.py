@@ -0,0 +1,100 @@
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ResponseStrings, ReverseURLNames
+from ...domain.models import Genre, Rating
+
+
+class TestAlbumFiltersAPI:
+    @pytest.fixture
+    def albums(self, domain_user):
+        rows = [
+            ("Revolver", Genre.ROCK, Rating.BEST, True, date(1966, 8, 5)),
+            ("Nevermind", Genre.ROCK, Rating.GOOD, False, date(1991, 9, 24)),
+            ("Blue Train", Genre.JAZZ, Rating.BEST, True, date(1958, 1, 1)),
+            ("Thriller", Genre.POP, Rating.AVERAGE, True, date(1982, 11, 30)),
+            ("Untitled", Genre.OTHER, Rating.NO_OPINION_YET, False, None),
+        ]
+        return {
+            title: domain_user.albums.create(
+                title=title,
+                artist=f"Artist of {title}",
+                genre=genre,
+                user_rating=rating,
+                owned=owned,
+                pub_date=pub_date,
+            )
+            for title, genre, rating, owned, pub_date in rows
+        }
+
+    def get(self, client, **params):
+        return client.get(reverse(ReverseURLNames.API.ALBUMS), params, format="json")
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            ({"genre": ["ROCK", "JAZZ"]}, {"Revolver", "Nevermind", "Blue Train"}),
+            ({"rating": Rating.BEST}, {"Revolver", "Blue Train"}),
+            ({"owned": "false"}, {"Nevermind", "Untitled"}),
+            ({"decade": 1960}, {"Revolver"}),
+            ({"decade": 10}, set()),
+            ({"decade": 9980}, set()),
+            (
+                {"pub_date_after": "1960-01-01", "pub_date_before": "1990-01-01"},
+                {"Revolver", "Thriller"},
+            ),
+            ({"genre": "ROCK", "owned": "true"}, {"Revolver"}),
+        ],
+    )
+    def test_album_list_view_filters(self, auth_api_client, albums, params, expected):
+        # When
+        response = self.get(auth_api_client, **params)
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert {album["title"] for album in response.data["results"]} == expected
+        assert "facets" not in response.data
+
+    @pytest.mark.parametrize(
+        "params, field",
+        [
+            ({"genre": "POLKA"}, "genre"),
+            ({"decade": 1995}, "decade"),
+            ({"decade": 0}, "decade"),
+            ({"decade": 9990}, "decade"),
+        ],
+    )
+    def test_album_list_view_invalid_filter(self, auth_api_client, params, field):
+        # When
+        response = self.get(auth_api_client, **params)
+        # Then
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert field in response.data
+        if params.get("decade") == 1995:
+            assert response.data["decade"] == [ResponseStrings.DECADE_ERROR]
+
+    def test_album_list_view_facet_counts(self, auth_api_client, albums):
+        # When
+        with CaptureQueriesContext(connection) as without_facets:
+            self.get(auth_api_client, genre="ROCK")
+        with CaptureQueriesContext(connection) as with_facets:
+            response = self.get(auth_api_client, genre="ROCK", facets="true")
+        # Then
+        assert len(with_facets) == len(without_facets) + 1
+        facets = response.data["facets"]
+        # Counts of a dimension ignore its own filter but apply the others.
+        assert facets["genre"] == {
+            Genre.ROCK: 2,
+            Genre.POP: 1,
+            Genre.JAZZ: 1,
+            Genre.HIPHOP: 0,
+            Genre.OTHER: 1,
+        }
+        assert facets["owned"] == {True: 1, False: 1}
+        assert facets["rating"][Rating.BEST] == 1
+        assert facets["rating"][Rating.GOOD] == 1
+        assert facets["decade"] == {1960: 1, 1990: 1}
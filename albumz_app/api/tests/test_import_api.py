@@ -0,0 +1,70 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ReverseURLNames
+from ...importers.models import ImportRun
+from ...jobs.models import Job, JobStatus
+from ...jobs.queue import claim_next, run_job
+
+
+class TestImportAPI:
+    def upload(self, client, content, name="export.csv", **data):
+        return client.post(
+            reverse(ReverseURLNames.API.IMPORT),
+            {"file": SimpleUploadedFile(name, content), **data},
+            format="multipart",
+        )
+
+    def test_import_requires_login(self, api_client):
+        response = self.upload(api_client, b"title,artist\n")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_import_upload_queues_job(
+        self, auth_api_client, domain_user, settings, tmp_path
+    ):
+        # Given
+        settings.IMPORTS_ROOT = tmp_path
+        content = b'[{"title": "Giant Steps", "artist": "John Coltrane"}]'
+        # When
+        response = self.upload(auth_api_client, content, "export.json", owned=False)
+        # Then
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job = Job.objects.get(pk=response.data["job"]["id"])
+        run = ImportRun.objects.get(pk=job.payload["import_run_id"])
+        assert run.user == domain_user
+        assert run.file_format == "json"
+        assert run.default_owned is False
+        assert open(run.source, "rb").read() == content
+
+    def test_import_job_imports_uploaded_file(
+        self, auth_api_client, domain_user, settings, tmp_path
+    ):
+        # Given
+        settings.IMPORTS_ROOT = tmp_path
+        self.upload(auth_api_client, b"title,artist\nGiant Steps,John Coltrane\n")
+        # When
+        run_job(claim_next("test-worker"))
+        # Then
+        job = Job.objects.get()
+        assert job.result["created"] == 1
+        assert job.progress_done == 1
+        assert domain_user.albums.in_collection().get().title == "Giant Steps"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_upload_is_kept_for_retries_and_deleted_after_the_last(
+        self, auth_api_client, settings, tmp_path
+    ):
+        # Given
+        settings.IMPORTS_ROOT = tmp_path
+        settings.JOB_RETRY_BACKOFF = 0
+        self.upload(auth_api_client, b'[{"title": "Giant Steps"', "export.json")
+        job = Job.objects.get()
+        # When / Then
+        for _ in range(job.max_attempts - 1):
+            run_job(claim_next("test-worker"))
+            assert len(list(tmp_path.iterdir())) == 1
+        run_job(claim_next("test-worker"))
+        job.refresh_from_db()
+        assert job.status == JobStatus.FAILED
+        assert list(tmp_path.iterdir()) == []
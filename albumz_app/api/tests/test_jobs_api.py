@@ -0,0 +1,75 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ResponseStrings, ReverseURLNames
+from ...jobs.models import Job, JobStatus
+from ...jobs.queue import enqueue
+from ...test_utils.utils import random_positive_number
+
+
+class TestJobsAPI:
+    def test_job_list_view_requires_login(self, api_client):
+        response = api_client.get(reverse(ReverseURLNames.API.JOBS))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_bulk_delete_queues_job(self, auth_api_client, albums_factory, domain_user):
+        # Given
+        albums = albums_factory(mix=True)
+        ids = [album.pk for album in albums]
+        # When
+        response = auth_api_client.post(
+            reverse(ReverseURLNames.API.BULK_DELETE), {"ids": ids}, format="json"
+        )
+        # Then
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["detail"] == ResponseStrings.JOB_QUEUED
+        job = Job.objects.get(pk=response.data["job"]["id"])
+        assert job.name == "albums.bulk_delete"
+        assert job.user == domain_user
+        assert job.payload == {"album_ids": ids}
+        assert response["Location"] == response.data["job"]["details"]
+
+    def test_bulk_delete_requires_ids(self, auth_api_client):
+        # When
+        response = auth_api_client.post(
+            reverse(ReverseURLNames.API.BULK_DELETE), {"ids": []}, format="json"
+        )
+        # Then
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "ids" in response.data
+
+    def test_job_detail_view_reports_progress(self, auth_api_client, domain_user):
+        # Given
+        job = enqueue(
+            "albums.bulk_delete", user=domain_user, payload={"album_ids": [1]}
+        )
+        job.report_progress(3, 10)
+        # When
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.JOB_DETAIL, args=[job.pk]), format="json"
+        )
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["status"] == JobStatus.QUEUED
+        assert response.data["progress_done"] == 3
+        assert response.data["progress_total"] == 10
+
+    def test_job_detail_view_hides_other_users_jobs(
+        self, auth_api_client, user_factory
+    ):
+        # Given
+        other_user = user_factory(username="otheruser").albumz_user
+        job = enqueue("albums.bulk_delete", user=other_user, payload={"album_ids": [1]})
+        # When
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.JOB_DETAIL, args=[job.pk]), format="json"
+        )
+        # Then
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_job_detail_view_not_found(self, auth_api_client):
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.JOB_DETAIL, args=[random_positive_number()]),
+            format="json",
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
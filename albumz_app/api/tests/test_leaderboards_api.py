@@ -0,0 +1,77 @@
+import pytest
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ReverseURLNames
+from ...domain.models import Album, Genre, Rating
+
+
+@pytest.fixture
+def popular_albums(domain_user, user_factory, settings):
+    settings.LEADERBOARD_MIN_RATINGS = 2
+    other_user = user_factory(username="otheruser").albumz_user
+    for user in (domain_user, other_user):
+        user.add_to_collection(
+            Album(title="Both", artist="A", genre=Genre.ROCK, user_rating=Rating.GOOD)
+        )
+    domain_user.add_to_collection(
+        Album(title="Mine", artist="A", genre=Genre.POP, user_rating=Rating.BEST)
+    )
+    other_user.add_to_wishlist(Album(title="Mine", artist="A", genre=Genre.POP))
+
+
+class TestLeaderboardsAPI:
+    def test_leaderboards_require_login(self, api_client):
+        response = api_client.get(reverse(ReverseURLNames.API.MOST_OWNED))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_most_owned(self, auth_api_client, popular_albums):
+        # When
+        response = auth_api_client.get(reverse(ReverseURLNames.API.MOST_OWNED))
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [
+            {
+                "title": "Both",
+                "artist": "A",
+                "owners": 2,
+                "wishlisters": 0,
+                "ratings": 2,
+                "average_rating": 4.0,
+            },
+            {
+                "title": "Mine",
+                "artist": "A",
+                "owners": 1,
+                "wishlisters": 1,
+                "ratings": 1,
+                "average_rating": 6.0,
+            },
+        ]
+
+    def test_most_owned_of_a_genre_with_limit(self, auth_api_client, popular_albums):
+        # When
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.MOST_OWNED), {"genre": "POP", "limit": 1}
+        )
+        # Then
+        assert [album["title"] for album in response.data] == ["Mine"]
+
+    def test_most_wishlisted(self, auth_api_client, popular_albums):
+        # When
+        response = auth_api_client.get(reverse(ReverseURLNames.API.MOST_WISHLISTED))
+        # Then
+        assert [album["title"] for album in response.data] == ["Mine"]
+
+    def test_highest_rated_needs_min_ratings(self, auth_api_client, popular_albums):
+        # When
+        response = auth_api_client.get(reverse(ReverseURLNames.API.HIGHEST_RATED))
+        # Then
+        assert [album["title"] for album in response.data] == ["Both"]
+
+    @pytest.mark.parametrize(
+        "params", [{"genre": "polka"}, {"limit": 0}, {"limit": 1000}]
+    )
+    def test_invalid_query(self, auth_api_client, params):
+        response = auth_api_client.get(reverse(ReverseURLNames.API.MOST_OWNED), params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
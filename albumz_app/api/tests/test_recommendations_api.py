@@ -0,0 +1,94 @@
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ReverseURLNames
+from ...recommendations.models import Recommendation, SimilarCollector
+
+
+class TestRecommendationsAPI:
+    def test_recommendations_require_login(self, api_client):
+        response = api_client.get(reverse(ReverseURLNames.API.RECOMMENDATIONS))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_recommendations_of_the_user_by_rank(
+        self, auth_api_client, domain_user, user_factory
+    ):
+        # Given
+        for rank, title in [(2, "Second"), (1, "First")]:
+            Recommendation.objects.create(
+                user=domain_user,
+                rank=rank,
+                match_key=title.lower(),
+                title=title,
+                artist="Artist",
+                score=1 / rank,
+            )
+        Recommendation.objects.create(
+            user=user_factory(username="otheruser").albumz_user,
+            rank=1,
+            match_key="other",
+            title="Other",
+            artist="Artist",
+            score=1,
+        )
+        # When
+        response = auth_api_client.get(reverse(ReverseURLNames.API.RECOMMENDATIONS))
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [
+            {"rank": 1, "title": "First", "artist": "Artist", "score": 1.0},
+            {"rank": 2, "title": "Second", "artist": "Artist", "score": 0.5},
+        ]
+
+    def test_no_recommendations_yet(self, auth_api_client):
+        response = auth_api_client.get(reverse(ReverseURLNames.API.RECOMMENDATIONS))
+        assert response.data == []
+
+
+class TestSimilarCollectorsAPI:
+    def test_similar_collectors_require_login(self, api_client):
+        response = api_client.get(reverse(ReverseURLNames.API.SIMILAR_COLLECTORS))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_similar_collectors_of_the_user_by_rank(
+        self, auth_api_client, domain_user, user_factory
+    ):
+        # Given
+        first, second = (
+            user_factory(username=name).albumz_user for name in ["first", "second"]
+        )
+        SimilarCollector.objects.create(
+            user=domain_user, collector=second, rank=2, score=0.5
+        )
+        SimilarCollector.objects.create(
+            user=domain_user, collector=first, rank=1, score=0.75
+        )
+        SimilarCollector.objects.create(
+            user=first, collector=domain_user, rank=1, score=0.75
+        )
+        # When
+        response = auth_api_client.get(reverse(ReverseURLNames.API.SIMILAR_COLLECTORS))
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert [(c["rank"], c["score"]) for c in response.data] == [
+            (1, 0.75),
+            (2, 0.5),
+        ]
+        ids = [collector["collector"] for collector in response.data]
+        assert len(set(ids)) == 2
+        assert not {"first", "second"} & set(ids)
+        assert all("username" not in collector for collector in response.data)
+
+    def test_similar_collector_ids_are_stable(self, domain_user, user_factory):
+        # Given
+        collector = user_factory(username="first").albumz_user
+        # When
+        ids = [
+            SimilarCollector(
+                user=domain_user, collector=collector, rank=rank, score=1.0
+            ).public_collector_id
+            for rank in (1, 2)
+        ]
+        # Then
+        assert ids[0] == ids[1]
+        assert str(collector.pk) != ids[0]
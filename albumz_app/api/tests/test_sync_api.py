@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ResponseStrings, ReverseURLNames
+from ...domain.models import Album
+from ...sync.changes import compact_tombstones
+from ...sync.models import AlbumTombstone
+
+
+class TestChangesAPI:
+    def get(self, client, **params):
+        return client.get(reverse(ReverseURLNames.API.CHANGES), params)
+
+    def test_changes_require_login(self, api_client):
+        response = self.get(api_client)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_changes_are_paged(self, auth_api_client, domain_user, settings):
+        # Given
+        settings.SYNC_PAGE_SIZE = 2
+        for title in ("A", "B", "C"):
+            domain_user.add_to_collection(Album(title=title, artist="X"))
+        # When
+        first = self.get(auth_api_client)
+        second = self.get(auth_api_client, since=first.data["token"])
+        # Then
+        assert [album["title"] for album in first.data["albums"]] == ["A", "B"]
+        assert first.data["has_more"] is True
+        assert [album["title"] for album in second.data["albums"]] == ["C"]
+        assert second.data["deleted"] == []
+        assert second.data["token"] == 3
+        assert second.data["has_more"] is False
+
+    def test_deletes_are_listed(self, auth_api_client, domain_user):
+        # Given
+        album = Album(title="A", artist="X")
+        domain_user.add_to_collection(album)
+        album_id = album.pk
+        album.delete()
+        # When
+        response = self.get(auth_api_client, since=1)
+        # Then
+        assert response.data["albums"] == []
+        assert response.data["deleted"] == [album_id]
+        assert response.data["token"] == 2
+
+    def test_expired_token_is_gone(self, auth_api_client, domain_user):
+        # Given
+        for title in ("A", "B"):
+            domain_user.add_to_collection(Album(title=title, artist="X"))
+        domain_user.albums.get(title="A").delete()
+        AlbumTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=90))
+        compact_tombstones(retention_days=30)
+        # When
+        response = self.get(auth_api_client, since=1)
+        # Then
+        assert response.status_code == status.HTTP_410_GONE
+        assert response.data["detail"] == ResponseStrings.SYNC_TOKEN_EXPIRED
+
+    def test_invalid_token_is_rejected(self, auth_api_client):
+        response = self.get(auth_api_client, since="abc")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "since" in response.data
+
+    def test_changes_of_other_users_are_not_listed(self, auth_api_client, user_factory):
+        # Given
+        other_user = user_factory(username="otheruser").albumz_user
+        other_user.add_to_collection(Album(title="A", artist="X"))
+        # When
+        response = self.get(auth_api_client)
+        # Then
+        assert response.data["albums"] == []
+        assert response.data["token"] == 0
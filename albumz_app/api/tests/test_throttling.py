@@ -0,0 +1,205 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...constants import ReverseURLNames
+from ..throttling import TokenBucketThrottle
+
+BUCKETS = {
+    "default": {"burst": 5, "refill": 1.0},
+    "list": {"burst": 2, "refill": 0.5},
+    "average_rating": {"burst": 3, "refill": 1.0},
+}
+
+
+class FrozenTokenBucketThrottle(TokenBucketThrottle):
+    now = 1000.0
+
+    def timer(self):
+        return self.now
+
+
+@pytest.fixture
+def throttle_buckets(settings):
+    settings.API_THROTTLE_BUCKETS = BUCKETS
+    return BUCKETS
+
+
+class TestTokenBucketThrottle:
+    def make_request(self, auth_user):
+        return SimpleNamespace(user=auth_user, META={"REMOTE_ADDR": "127.0.0.1"})
+
+    def make_view(self, action):
+        return SimpleNamespace(action=action, basename="album")
+
+    def test_allows_burst_then_throttles(self, throttle_buckets, auth_user):
+        # Given
+        request = self.make_request(auth_user)
+        view = self.make_view("list")
+        # When
+        results = [
+            FrozenTokenBucketThrottle().allow_request(request, view) for _ in range(3)
+        ]
+        # Then
+        assert results == [True, True, False]
+
+    def test_bucket_refills_over_time(self, throttle_buckets, auth_user):
+        # Given
+        request = self.make_request(auth_user)
+        view = self.make_view("list")
+        for _ in range(2):
+            FrozenTokenBucketThrottle().allow_request(request, view)
+        throttle = FrozenTokenBucketThrottle()
+        throttle.now = FrozenTokenBucketThrottle.now + 2
+        # When/Then
+        assert throttle.allow_request(request, view)
+
+    def test_wait_reports_time_until_next_token(self, throttle_buckets, auth_user):
+        # Given
+        request = self.make_request(auth_user)
+        view = self.make_view("list")
+        for _ in range(2):
+            FrozenTokenBucketThrottle().allow_request(request, view)
+        throttle = FrozenTokenBucketThrottle()
+        # When
+        allowed = throttle.allow_request(request, view)
+        # Then
+        assert not allowed
+        assert throttle.wait() == pytest.approx(2.0)
+
+    def test_buckets_are_per_action(self, throttle_buckets, auth_user):
+        # Given
+        request = self.make_request(auth_user)
+        for _ in range(2):
+            FrozenTokenBucketThrottle().allow_request(request, self.make_view("list"))
+        # When/Then
+        assert FrozenTokenBucketThrottle().allow_request(
+            request, self.make_view("average_rating")
+        )
+
+    def test_buckets_are_per_user(self, throttle_buckets, auth_user, user_factory):
+        # Given
+        other_user = user_factory(username="otheruser")
+        view = self.make_view("list")
+        for _ in range(2):
+            FrozenTokenBucketThrottle().allow_request(
+                self.make_request(auth_user), view
+            )
+        # When/Then
+        assert FrozenTokenBucketThrottle().allow_request(
+            self.make_request(other_user), view
+        )
+
+    def test_unknown_action_uses_default_bucket(self, throttle_buckets, auth_user):
+        # Given
+        request = self.make_request(auth_user)
+        throttle = FrozenTokenBucketThrottle()
+        # When
+        throttle.allow_request(request, self.make_view("destroy"))
+        # Then
+        assert throttle.state.limit == BUCKETS["default"]["burst"]
+        assert throttle.state.remaining == BUCKETS["default"]["burst"] - 1
+
+    def test_bucket_check_runs_no_queries(
+        self, throttle_buckets, auth_user, django_assert_num_queries
+    ):
+        # Given
+        request = self.make_request(auth_user)
+        view = self.make_view("list")
+        # When/Then
+        with django_assert_num_queries(0):
+            FrozenTokenBucketThrottle().allow_request(request, view)
+
+    def test_concurrent_requests_never_share_a_token(self, throttle_buckets, auth_user):
+        # Given
+        class SlowCache:
+            # Widens the window between reading and writing the bucket.
+            def __init__(self, cache):
+                self.cache = cache
+
+            def get(self, *args, **kwargs):
+                value = self.cache.get(*args, **kwargs)
+                time.sleep(0.01)
+                return value
+
+            def __getattr__(self, name):
+                return getattr(self.cache, name)
+
+        class SlowTokenBucketThrottle(FrozenTokenBucketThrottle):
+            def __init__(self):
+                super().__init__()
+                self.cache = SlowCache(self.cache)
+
+        request = self.make_request(auth_user)
+        view = self.make_view("list")
+        # When
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda _: SlowTokenBucketThrottle().allow_request(request, view),
+                    range(8),
+                )
+            )
+        # Then
+        assert results.count(True) == BUCKETS["list"]["burst"]
+
+    def test_expired_lock_taken_over_is_not_released(self, auth_user):
+        # Given
+        throttle = TokenBucketThrottle()
+        key = "throttle:album:list:test"
+        # When
+        with throttle.locked(key):
+            # The lock expires and another request takes it.
+            throttle.cache.delete(f"{key}:lock")
+            assert throttle.cache.add(f"{key}:lock", "other")
+        # Then
+        assert throttle.cache.get(f"{key}:lock") == "other"
+
+    def test_buckets_use_their_own_cache(self, throttle_buckets, auth_user):
+        # Given
+        request = self.make_request(auth_user)
+        view = self.make_view("list")
+        throttle = FrozenTokenBucketThrottle()
+        # When
+        throttle.allow_request(request, view)
+        # Then
+        key = throttle.get_cache_key(request, view, "list")
+        assert caches["throttle"].get(key) is not None
+        assert caches["default"].get(key) is None
+
+
+class TestAlbumsAPIThrottling:
+    def test_response_carries_rate_limit_headers(
+        self, throttle_buckets, auth_api_client
+    ):
+        # When
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.ALBUMS), format="json"
+        )
+        # Then
+        assert response.status_code == status.HTTP_200_OK
+        assert response["X-RateLimit-Limit"] == str(BUCKETS["list"]["burst"])
+        assert response["X-RateLimit-Remaining"] == str(BUCKETS["list"]["burst"] - 1)
+        assert "X-RateLimit-Reset" in response
+
+    def test_exhausted_bucket_returns_429_with_retry_after(
+        self, throttle_buckets, auth_api_client
+    ):
+        # Given
+        for _ in range(BUCKETS["average_rating"]["burst"]):
+            auth_api_client.get(
+                reverse(ReverseURLNames.API.AVERAGE_RATING), format="json"
+            )
+        # When
+        response = auth_api_client.get(
+            reverse(ReverseURLNames.API.AVERAGE_RATING), format="json"
+        )
+        # Then
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response["Retry-After"]) >= 1
+        assert response["X-RateLimit-Remaining"] == "0"
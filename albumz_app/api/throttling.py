@@ -0,0 +1,119 @@
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import throttling
+
+
+@dataclass(frozen=True)
+class RateLimitState:
+    limit: int
+    remaining: int
+    reset: int
+
+    def as_headers(self):
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset),
+        }
+
+
+class TokenBucketThrottle(throttling.BaseThrottle):
+    """
+    Per-user, per-action token bucket kept in the shared cache.
+
+    Every action of the view gets its own bucket holding at most `burst` tokens,
+    refilled at `refill` tokens per second (see `API_THROTTLE_BUCKETS`). A request
+    takes one token; an empty bucket throttles the request until a token is back.
+    The bucket state lives only in the cache, so checking it never touches the
+    database. Concurrent requests of a user (in any Gunicorn worker) update the
+    bucket one at a time, under a lock taken with the atomic `cache.add`, so
+    they never spend the same token twice.
+    """
+
+    cache_alias = "throttle"
+    timer = time.time
+    # Seconds after which the lock of a crashed request expires, and between
+    # attempts to take a held lock.
+    lock_timeout = 1
+    lock_retry_interval = 0.005
+
+    def __init__(self):
+        self.cache = caches[self.cache_alias]
+        self.state = None
+        self.wait_seconds = None
+
+    def get_scope(self, view):
+        return getattr(view, "action", None) or "default"
+
+    def get_bucket(self, scope):
+        buckets = settings.API_THROTTLE_BUCKETS
+        config = buckets.get(scope, buckets["default"])
+        return int(config["burst"]), float(config["refill"])
+
+    def get_cache_key(self, request, view, scope):
+        if request.user and request.user.is_authenticated:
+            ident = f"user-{request.user.pk}"
+        else:
+            ident = f"anon-{self.get_ident(request)}"
+        return f"throttle:{getattr(view, 'basename', 'api')}:{scope}:{ident}"
+
+    @contextmanager
+    def locked(self, key):
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        while not self.cache.add(lock_key, token, timeout=self.lock_timeout):
+            time.sleep(self.lock_retry_interval)
+        try:
+            yield
+        finally:
+            # A slow request may find its lock expired and taken by another
+            # request, which has to keep it.
+            if self.cache.get(lock_key) == token:
+                self.cache.delete(lock_key)
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        burst, refill = self.get_bucket(scope)
+        key = self.get_cache_key(request, view, scope)
+
+        with self.locked(key):
+            now = self.timer()
+            tokens, updated_at = self.cache.get(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - updated_at) * refill)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            seconds_to_full = (burst - tokens) / refill
+            self.cache.set(key, (tokens, now), timeout=int(seconds_to_full) + 1)
+
+        self.wait_seconds = None if allowed else (1 - tokens) / refill
+        self.state = RateLimitState(
+            limit=burst,
+            remaining=int(tokens),
+            reset=int(now + seconds_to_full),
+        )
+        request.rate_limit = self.state
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class RateLimitHeadersMixin:
+    """
+    Adds the rate limit headers of the last throttle check to every response,
+    throttled (HTTP 429 with `Retry-After`) or not.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        state = getattr(request, "rate_limit", None)
+        if state is not None:
+            for header, value in state.as_headers().items():
+                response[header] = value
+        return response
@@ -7,6 +7,9 @@ from . import views
 
 router = DefaultRouter()
 router.register(r"albums", views.AlbumsViewSet, basename="album")
+router.register(r"jobs", views.JobsViewSet, basename="job")
+router.register(r"artists", views.ArtistsViewSet, basename="artist")
+router.register(r"leaderboards", views.LeaderboardsViewSet, basename="leaderboard")
 
 app_name = API_APP_NAME
 urlpatterns = [
@@ -1,20 +1,48 @@
+from django.conf import settings
+from django.db.models import Avg, Count, Min, Q, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.utils.cache import patch_cache_control
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action, api_view
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from ..analytics.dashboard import collection_analytics
 from ..constants import ResponseStrings, ReverseURLNames
+from ..covers.uploads import attach_cover
 from ..domain.exceptions import (
     AlbumAlreadyInCollectionError,
     AlbumAlreadyOnWishlistError,
 )
-from ..domain.models import Album
+from ..domain.facets import facet_counts
+from ..domain.models import Album, Artist, shown_artist
+from ..importers.importer import start_import, store_upload
+from ..jobs.models import Job
+from ..jobs.queue import enqueue
+from ..leaderboards.models import AlbumPopularity
+from ..recommendations.models import Recommendation, SimilarCollector
+from ..sync.changes import SyncTokenExpiredError, changes_since
+from .filters import AlbumFilterBackend
 from .serializers import (
     AlbumDetailSerializer,
+    AlbumImportSerializer,
     AlbumListSerializer,
+    AlbumPopularitySerializer,
+    ArtistDetailSerializer,
+    ArtistSerializer,
+    AutocompleteSerializer,
+    BulkDeleteSerializer,
+    ChangesQuerySerializer,
+    ChangesSerializer,
+    CoverUploadSerializer,
     GenreFilterSerializer,
+    JobSerializer,
+    LeaderboardQuerySerializer,
+    RecommendationSerializer,
+    SimilarCollectorSerializer,
 )
+from .throttling import RateLimitHeadersMixin, TokenBucketThrottle
 
 
 @api_view(["GET"])
@@ -28,17 +56,27 @@ def api_root(request, format=None):
     )
 
 
-class AlbumsViewSet(viewsets.ModelViewSet):
+class AlbumsViewSet(RateLimitHeadersMixin, viewsets.ModelViewSet):
     """
     This ViewSet automatically provides `list`, `create`, `retrieve`,
     `update` and `destroy` actions.
     """
 
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    filter_backends = [AlbumFilterBackend]
 
     def get_queryset(self):
         domain_user = self.request.user.albumz_user
-        return domain_user.albums.order_by("artist", "title")
+        return domain_user.albums.order_by(shown_artist(), "title")
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.include_facets:
+            response.data["facets"] = facet_counts(
+                self.get_queryset(), request.album_conditions
+            )
+        return response
 
     def get_serializer_class(self):
         if self.action in ("list", "create"):
@@ -73,6 +111,9 @@ class AlbumsViewSet(viewsets.ModelViewSet):
         else:
             serializer.instance = self.get_object()
 
+    def perform_destroy(self, instance):
+        self.request.user.albumz_user.delete_album(instance)
+
     @action(detail=True, methods=["get"], url_path="move-to-collection")
     def move_to_collection(self, request, pk=None):
         domain_user = request.user.albumz_user
@@ -86,6 +127,21 @@ class AlbumsViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_200_OK,
             )
 
+    @action(detail=True, methods=["post"])
+    def cover(self, request, pk=None):
+        """Uploads the cover image of the album (multipart, as `file`).
+
+        A new image is answered with 202 and the job generating its thumbnails,
+        an image uploaded before with 200 and the URLs of its thumbnails.
+        """
+        serializer = CoverUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        album = self.get_object()
+        job = attach_cover(album, serializer.validated_data["file"])
+        if job is not None:
+            return job_accepted_response(job, request)
+        return Response({"cover_urls": album.cover_urls}, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=["get"], url_path="average-rating")
     def average_rating(self, request):
         serializer = GenreFilterSerializer(data=request.query_params)
@@ -98,3 +154,206 @@ class AlbumsViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_200_OK,
             )
         return Response({"average_rating": average_rating}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        serializer = AutocompleteSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        prefix = serializer.validated_data["prefix"]
+        limit = serializer.validated_data.get(
+            "limit", settings.AUTOCOMPLETE_MAX_RESULTS
+        )
+        albums = request.user.albumz_user.albums
+        response = Response(
+            {
+                "artists": list(albums.artist_completions(prefix)[:limit]),
+                "titles": list(albums.title_completions(prefix)[:limit]),
+            },
+            status=status.HTTP_200_OK,
+        )
+        patch_cache_control(
+            response, private=True, max_age=settings.AUTOCOMPLETE_CACHE_SECONDS
+        )
+        return response
+
+    @action(detail=False, methods=["get"])
+    def recommendations(self, request):
+        """Albums owned by collectors with similar collections, best first.
+
+        Recommendations are computed offline by `manage.py
+        refresh_recommendations`, serving them is a single indexed lookup.
+        """
+        recommendations = Recommendation.objects.filter(
+            user=request.user.albumz_user
+        ).order_by("rank")
+        return Response(
+            RecommendationSerializer(recommendations, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get"])
+    def analytics(self, request):
+        """Chart series of the user's collection: albums added per month and
+        their genres, the rating histogram and the decades of publication.
+
+        Summed from the user's monthly rollups, whatever the collection size.
+        """
+        return Response(
+            collection_analytics(request.user.albumz_user), status=status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        """Albums changed and deleted since `?since=<token>`, oldest first.
+
+        Pass the returned `token` as `since` to get the next page (while
+        `has_more`) and, later, the next changes. Without a token all albums
+        are listed. 410 means that deletes since the token were forgotten, so
+        all albums have to be synced again.
+        """
+        serializer = ChangesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        try:
+            changes = changes_since(
+                request.user.albumz_user, serializer.validated_data["since"]
+            )
+        except SyncTokenExpiredError:
+            return Response(
+                {"detail": ResponseStrings.SYNC_TOKEN_EXPIRED},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(ChangesSerializer(changes).data)
+
+    @action(detail=False, methods=["get"], url_path="similar-collectors")
+    def similar_collectors(self, request):
+        """Collectors whose genres and rated artists are most like the user's.
+
+        Computed offline by `manage.py refresh_similar_collectors`. Collectors
+        are named by an opaque id, not by their username.
+        """
+        collectors = SimilarCollector.objects.filter(
+            user=request.user.albumz_user
+        ).order_by("rank")
+        return Response(
+            SimilarCollectorSerializer(collectors, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"], url_path="bulk-delete")
+    def bulk_delete(self, request):
+        serializer = BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue(
+            "albums.bulk_delete",
+            user=request.user.albumz_user,
+            payload={"album_ids": serializer.validated_data["ids"]},
+        )
+        return job_accepted_response(job, request)
+
+    @action(detail=False, methods=["post"], url_path="import", url_name="import")
+    def import_albums(self, request):
+        serializer = AlbumImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        domain_user = request.user.albumz_user
+        run = start_import(
+            domain_user,
+            store_upload(serializer.validated_data["file"]),
+            file_format=serializer.validated_data.get("format"),
+            default_owned=serializer.validated_data["owned"],
+        )
+        job = enqueue(
+            "albums.import", user=domain_user, payload={"import_run_id": run.pk}
+        )
+        return job_accepted_response(job, request)
+
+
+def job_accepted_response(job, request):
+    data = JobSerializer(job, context={"request": request}).data
+    return Response(
+        {"detail": ResponseStrings.JOB_QUEUED, "job": data},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": data["details"]},
+    )
+
+
+class JobsViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status and progress of the background jobs started by the user.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        domain_user = self.request.user.albumz_user
+        return Job.objects.for_user(domain_user).order_by("-created_at", "-pk")
+
+
+class ArtistsViewSet(RateLimitHeadersMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Artists of the user's albums, with per-artist album counts and ratings.
+    Artists are named as the user spells them on their albums.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+
+    def get_queryset(self):
+        domain_user = self.request.user.albumz_user
+        return (
+            Artist.objects.filter(albums__user=domain_user)
+            .annotate(
+                user_name=Min(
+                    Coalesce(NullIf("albums__artist_spelling", Value("")), "name")
+                ),
+                album_count=Count("albums"),
+                owned_count=Count("albums", filter=Q(albums__owned=True)),
+                average_rating=Avg(
+                    "albums__user_rating", filter=Q(albums__user_rating__gt=0)
+                ),
+            )
+            .order_by("user_name", "pk")
+        )
+
+    def get_serializer_class(self):
+        if self.action == "retrieve":
+            return ArtistDetailSerializer
+        return ArtistSerializer
+
+
+class LeaderboardsViewSet(RateLimitHeadersMixin, viewsets.GenericViewSet):
+    """
+    Site-wide most owned, most wishlisted and highest rated albums, overall or
+    of a `?genre=<GENRE>`. Each is read in order from an index of counters the
+    album writes keep up to date.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    serializer_class = AlbumPopularitySerializer
+
+    def leaderboard(self, request, ranking, **kwargs):
+        serializer = LeaderboardQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        limit = serializer.validated_data.get("limit", settings.LEADERBOARD_SIZE)
+        albums = ranking(serializer.validated_data.get("genre"), **kwargs)
+        return Response(
+            self.get_serializer(albums[:limit], many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get"], url_path="most-owned")
+    def most_owned(self, request):
+        return self.leaderboard(request, AlbumPopularity.objects.most_owned)
+
+    @action(detail=False, methods=["get"], url_path="most-wishlisted")
+    def most_wishlisted(self, request):
+        return self.leaderboard(request, AlbumPopularity.objects.most_wishlisted)
+
+    @action(detail=False, methods=["get"], url_path="highest-rated")
+    def highest_rated(self, request):
+        return self.leaderboard(
+            request,
+            AlbumPopularity.objects.highest_rated,
+            min_ratings=settings.LEADERBOARD_MIN_RATINGS,
+        )
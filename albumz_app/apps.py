@@ -6,4 +6,8 @@ class AlbumzAppConfig(AppConfig):
     name = "albumz_app"
 
     def ready(self):
+        import albumz_app.jobs.handlers  # noqa: F401
+        import albumz_app.live.receivers  # noqa: F401
+        import albumz_app.observability.metrics  # noqa: F401
+        import albumz_app.observability.models  # noqa: F401
         import albumz_app.signals  # noqa: F401
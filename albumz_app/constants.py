@@ -20,12 +20,29 @@ class URLNames(BaseEnum):
     MOVE_TO_COLLECTION = "move"
     ADD_TO_COLLECTION = "add_collection"
     ADD_TO_WISHLIST = "add_wishlist"
+    ANALYTICS = "analytics"
+    EVENTS = "events"
 
     class API(BaseEnum):
         ALBUMS = "album-list"
         DETAIL = "album-detail"
         MOVE_TO_COLLECTION = "album-move-to-collection"
+        COVER = "album-cover"
         AVERAGE_RATING = "album-average-rating"
+        BULK_DELETE = "album-bulk-delete"
+        IMPORT = "album-import"
+        AUTOCOMPLETE = "album-autocomplete"
+        RECOMMENDATIONS = "album-recommendations"
+        SIMILAR_COLLECTORS = "album-similar-collectors"
+        MOST_OWNED = "leaderboard-most-owned"
+        MOST_WISHLISTED = "leaderboard-most-wishlisted"
+        HIGHEST_RATED = "leaderboard-highest-rated"
+        ANALYTICS = "album-analytics"
+        CHANGES = "album-changes"
+        JOBS = "job-list"
+        JOB_DETAIL = "job-detail"
+        ARTISTS = "artist-list"
+        ARTIST_DETAIL = "artist-detail"
 
 
 class ReverseURLNames(BaseEnum):
@@ -37,12 +54,29 @@ class ReverseURLNames(BaseEnum):
     MOVE_TO_COLLECTION = f"{APP_NAME}:{URLNames.MOVE_TO_COLLECTION.value}"
     ADD_TO_COLLECTION = f"{APP_NAME}:{URLNames.ADD_TO_COLLECTION.value}"
     ADD_TO_WISHLIST = f"{APP_NAME}:{URLNames.ADD_TO_WISHLIST.value}"
+    ANALYTICS = f"{APP_NAME}:{URLNames.ANALYTICS.value}"
+    EVENTS = f"{APP_NAME}:{URLNames.EVENTS.value}"
 
     class API(BaseEnum):
         ALBUMS = f"{API_APP_NAME}:{URLNames.API.ALBUMS.value}"
         DETAIL = f"{API_APP_NAME}:{URLNames.API.DETAIL.value}"
         MOVE_TO_COLLECTION = f"{API_APP_NAME}:{URLNames.API.MOVE_TO_COLLECTION.value}"
+        COVER = f"{API_APP_NAME}:{URLNames.API.COVER.value}"
         AVERAGE_RATING = f"{API_APP_NAME}:{URLNames.API.AVERAGE_RATING.value}"
+        BULK_DELETE = f"{API_APP_NAME}:{URLNames.API.BULK_DELETE.value}"
+        IMPORT = f"{API_APP_NAME}:{URLNames.API.IMPORT.value}"
+        AUTOCOMPLETE = f"{API_APP_NAME}:{URLNames.API.AUTOCOMPLETE.value}"
+        RECOMMENDATIONS = f"{API_APP_NAME}:{URLNames.API.RECOMMENDATIONS.value}"
+        SIMILAR_COLLECTORS = f"{API_APP_NAME}:{URLNames.API.SIMILAR_COLLECTORS.value}"
+        MOST_OWNED = f"{API_APP_NAME}:{URLNames.API.MOST_OWNED.value}"
+        MOST_WISHLISTED = f"{API_APP_NAME}:{URLNames.API.MOST_WISHLISTED.value}"
+        HIGHEST_RATED = f"{API_APP_NAME}:{URLNames.API.HIGHEST_RATED.value}"
+        ANALYTICS = f"{API_APP_NAME}:{URLNames.API.ANALYTICS.value}"
+        CHANGES = f"{API_APP_NAME}:{URLNames.API.CHANGES.value}"
+        JOBS = f"{API_APP_NAME}:{URLNames.API.JOBS.value}"
+        JOB_DETAIL = f"{API_APP_NAME}:{URLNames.API.JOB_DETAIL.value}"
+        ARTISTS = f"{API_APP_NAME}:{URLNames.API.ARTISTS.value}"
+        ARTIST_DETAIL = f"{API_APP_NAME}:{URLNames.API.ARTIST_DETAIL.value}"
 
 
 class ResponseStrings(BaseEnum):
@@ -54,6 +88,14 @@ class ResponseStrings(BaseEnum):
     ALBUM_DOES_NOT_EXIST_ERROR = "Album does not exist."
     MOVED_TO_COLLECTION = "Album has been moved to collection."
     NO_RATINGS = "No ratings available."
+    JOB_QUEUED = "Job has been queued."
+    COVER_TOO_LARGE_ERROR = "The cover image is too large."
+    COVER_FORMAT_ERROR = "The cover has to be a JPEG, PNG or WebP image."
+    SYNC_TOKEN_EXPIRED = (
+        "The changes since this token are not available anymore, "
+        "sync all albums again."
+    )
+    DECADE_ERROR = "Decade has to be a year divisible by 10, e.g. 1990."
 
 
 class TemplateContextVariables(BaseEnum):
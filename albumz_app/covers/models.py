@@ -0,0 +1,90 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import IntegrityError, models
+
+
+class CoverStatus(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    READY = "READY", "Ready"
+    FAILED = "FAILED", "Failed"
+
+
+THUMBNAIL_FORMATS = ["webp", "jpeg"]
+
+
+def cover_directory(sha256):
+    return f"covers/{sha256[:2]}/{sha256}"
+
+
+def thumbnail_name(sha256, size, image_format):
+    return f"{cover_directory(sha256)}/{size}.{image_format}"
+
+
+def original_storage():
+    """Storage of the uploaded originals, which the web server never serves."""
+    return FileSystemStorage(location=settings.COVER_ORIGINALS_ROOT)
+
+
+class CoverManager(models.Manager):
+    def store(self, uploaded_file, storage=None):
+        """Stores an uploaded cover once per content, returning the cover and
+        whether it is new (and its thumbnails have to be generated)."""
+        storage = storage or original_storage()
+        digest = hashlib.sha256()
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+        sha256 = digest.hexdigest()
+        cover = self.filter(sha256=sha256).first()
+        if cover is not None:
+            return cover, False
+        original = f"{cover_directory(sha256)}/original"
+        name = original
+        if not storage.exists(original):
+            uploaded_file.seek(0)
+            name = storage.save(original, uploaded_file)
+        try:
+            return self.create(sha256=sha256, original=name), True
+        except IntegrityError:
+            # Stored by a concurrent upload of the same image meanwhile.
+            if name != original:
+                storage.delete(name)
+            return self.get(sha256=sha256), False
+
+
+class Cover(models.Model):
+    """An uploaded cover image, addressed by the SHA-256 of its content.
+
+    Albums with identical covers share a single `Cover` and its files. The
+    original is kept in COVER_ORIGINALS_ROOT; the thumbnails are generated by
+    the `covers.thumbnails` job and served by the web server from MEDIA_ROOT.
+    """
+
+    objects = CoverManager()
+    sha256 = models.CharField(max_length=64, unique=True)
+    original = models.CharField(max_length=200)
+    status = models.CharField(
+        max_length=10, choices=CoverStatus.choices, default=CoverStatus.PENDING
+    )
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+    @property
+    def urls(self):
+        """{size: {format: URL}} of the thumbnails, empty until they exist."""
+        if self.status != CoverStatus.READY:
+            return {}
+        return {
+            size: {
+                image_format: default_storage.url(
+                    thumbnail_name(self.sha256, size, image_format)
+                )
+                for image_format in THUMBNAIL_FORMATS
+            }
+            for size in settings.COVER_THUMBNAIL_SIZES
+        }
@@ -0,0 +1,61 @@
+"""Thumbnails of the uploaded covers, generated by the `covers.thumbnails` job.
+
+Each size is a square crop of the cover, encoded as WebP and as JPEG for
+browsers without WebP support. The names only depend on the content hash,
+so a retried job overwrites its own partial output.
+"""
+
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import CoverStatus, original_storage, thumbnail_name
+
+ENCODINGS = {
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+
+def load_image(cover, storage):
+    with storage.open(cover.original) as file, Image.open(file) as image:
+        if image.width * image.height > settings.COVER_MAX_PIXELS:
+            raise Image.DecompressionBombError("The cover has too many pixels.")
+        size = image.size
+        # Lets JPEG decoding downscale, thumbnails need no more than this.
+        largest = max(settings.COVER_THUMBNAIL_SIZES.values())
+        image.draft("RGB", (largest, largest))
+        return ImageOps.exif_transpose(image).convert("RGB"), size
+
+
+def save_file(storage, name, content):
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def generate_thumbnails(cover, storage=default_storage, originals=None):
+    try:
+        image, (cover.width, cover.height) = load_image(
+            cover, originals or original_storage()
+        )
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        cover.status = CoverStatus.FAILED
+        cover.save(update_fields=["status"])
+        return {"status": cover.status}
+    for size, pixels in settings.COVER_THUMBNAIL_SIZES.items():
+        thumbnail = ImageOps.fit(image, (pixels, pixels), Image.Resampling.LANCZOS)
+        for image_format, (encoder, options) in ENCODINGS.items():
+            buffer = BytesIO()
+            thumbnail.save(buffer, encoder, **options)
+            save_file(
+                storage,
+                thumbnail_name(cover.sha256, size, image_format),
+                buffer.getvalue(),
+            )
+    cover.status = CoverStatus.READY
+    cover.save(update_fields=["status", "width", "height"])
+    return {"status": cover.status, "sizes": list(settings.COVER_THUMBNAIL_SIZES)}
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from .. import constants
+from ..jobs.queue import enqueue
+from .models import Cover
+
+# Leading bytes of the accepted image formats. The upload is only sniffed,
+# decoding it is left to the thumbnail job.
+SIGNATURES = [b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"RIFF"]
+
+
+def validate_cover(uploaded_file):
+    if uploaded_file.size > settings.COVER_MAX_UPLOAD_SIZE:
+        raise ValidationError(constants.ResponseStrings.COVER_TOO_LARGE_ERROR)
+    uploaded_file.seek(0)
+    header = uploaded_file.read(12)
+    uploaded_file.seek(0)
+    if not any(header.startswith(signature) for signature in SIGNATURES) or (
+        header.startswith(b"RIFF") and header[8:12] != b"WEBP"
+    ):
+        raise ValidationError(constants.ResponseStrings.COVER_FORMAT_ERROR)
+
+
+def attach_cover(album, uploaded_file, save=True):
+    """Sets the cover of `album`, queueing the thumbnails of a new image.
+
+    With `save=False` the album is left for the caller to save, e.g. together
+    with an edit, since every album save updates its counters and change feed.
+    Returns the thumbnail job, or None when the image was stored already.
+    """
+    cover, created = Cover.objects.store(uploaded_file)
+    album.cover = cover
+    if save:
+        album.save(update_fields=["cover"])
+    if created:
+        return enqueue(
+            "covers.thumbnails", user=album.user, payload={"cover_id": cover.pk}
+        )
+    return None
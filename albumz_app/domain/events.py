@@ -0,0 +1,18 @@
+"""Signals sent by the domain model after the collection of a user changed.
+
+Receivers get the domain `user` and the `album` as keyword arguments, except
+for `albums_deleted`, which sends the `album_ids` asked to be deleted.
+"""
+
+from django.dispatch import Signal
+
+# Sent after a new album was saved, with `owned` telling where it went.
+album_added = Signal()
+# Sent after an album on the wishlist was moved to the collection.
+album_moved_to_collection = Signal()
+# Sent after the fields of an album were edited.
+album_edited = Signal()
+# Sent after albums were deleted.
+albums_deleted = Signal()
+# Sent when an album was rejected as a duplicate of `existing`.
+duplicate_rejected = Signal()
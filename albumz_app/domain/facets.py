@@ -0,0 +1,77 @@
+from datetime import date
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Genre, Rating
+
+FIRST_DECADE = 1900
+# Decades that `decade_condition` can bound with dates: it starts at the
+# decade's first year and ends at the first year of the next one.
+MIN_DECADE = 10
+MAX_DECADE = 9980
+
+
+def decade_condition(decade):
+    return Q(pub_date__gte=date(decade, 1, 1), pub_date__lt=date(decade + 10, 1, 1))
+
+
+def album_conditions(
+    genre=None,
+    rating=None,
+    owned=None,
+    decade=None,
+    pub_date_after=None,
+    pub_date_before=None,
+):
+    """Translates album filters into one condition per filtered dimension."""
+    conditions = {}
+    if genre:
+        conditions["genre"] = Q(genre__in=genre)
+    if rating:
+        conditions["rating"] = Q(user_rating__in=rating)
+    if owned is not None:
+        conditions["owned"] = Q(owned=owned)
+    if decade is not None:
+        conditions["decade"] = decade_condition(decade)
+    if pub_date_after is not None:
+        conditions["pub_date_after"] = Q(pub_date__gte=pub_date_after)
+    if pub_date_before is not None:
+        conditions["pub_date_before"] = Q(pub_date__lte=pub_date_before)
+    return conditions
+
+
+def facet_buckets():
+    last_decade = timezone.now().year // 10 * 10
+    return {
+        "genre": [(genre, Q(genre=genre)) for genre in Genre.values],
+        "rating": [(rating, Q(user_rating=rating)) for rating in Rating.values],
+        "owned": [(owned, Q(owned=owned)) for owned in (True, False)],
+        "decade": [
+            (decade, decade_condition(decade))
+            for decade in range(FIRST_DECADE, last_decade + 10, 10)
+        ],
+    }
+
+
+def facet_counts(albums, conditions):
+    """Counts the albums in every bucket of every facet in a single query.
+
+    The count of a bucket applies the filters of all the other dimensions, so
+    that the alternatives to the current selection of a dimension stay
+    visible, as in a usual filter sidebar. Empty decades are left out.
+    """
+    facets = facet_buckets()
+    aggregates, buckets_by_alias = {}, {}
+    for dimension, buckets in facets.items():
+        others = Q(*(q for name, q in conditions.items() if name != dimension))
+        for index, (value, condition) in enumerate(buckets):
+            alias = f"{dimension}_{index}"
+            aggregates[alias] = Count("pk", filter=others & condition)
+            buckets_by_alias[alias] = (dimension, value)
+    counts = {dimension: {} for dimension in facets}
+    for alias, count in albums.aggregate(**aggregates).items():
+        dimension, value = buckets_by_alias[alias]
+        if count or dimension != "decade":
+            counts[dimension][value] = count
+    return counts
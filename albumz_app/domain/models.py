@@ -1,14 +1,23 @@
+import math
+
+from django.conf import settings
 from django.contrib.auth.models import User as AuthUser
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models.functions import Length
 from django.utils import timezone
 
 from .. import constants
+from ..covers.models import Cover
+from ..sync.models import SyncState
+from . import events
 from .exceptions import (
     AlbumAlreadyInCollectionError,
     AlbumAlreadyOnWishlistError,
     AlbumDoesNotExistError,
 )
+from .normalization import album_match_key, normalize_text
+from .search import album_grams, similarity, trigrams
 
 
 class Genre(models.TextChoices):
@@ -29,6 +38,60 @@ class Rating(models.IntegerChoices):
     BEST = 6
 
 
+class ArtistManager(models.Manager):
+    def resolve(self, names):
+        """Bulk get-or-create of artists, returned by their normalized names.
+
+        Spelling variants of a name share a single artist, named after the
+        first spelling seen. Albums spelling it otherwise keep their owner's
+        spelling in `Album.artist_spelling`.
+        """
+        names_by_key = {}
+        for name in names:
+            names_by_key.setdefault(normalize_text(name), name)
+        artists = {
+            artist.match_key: artist
+            for artist in self.filter(match_key__in=names_by_key)
+        }
+        missing = [key for key in names_by_key if key not in artists]
+        if missing:
+            # Conflicts come from concurrent writers creating the same artist.
+            self.bulk_create(
+                [Artist(name=names_by_key[key], match_key=key) for key in missing],
+                ignore_conflicts=True,
+            )
+            artists.update(
+                (artist.match_key, artist)
+                for artist in self.filter(match_key__in=missing)
+            )
+        return artists
+
+    def get_for_name(self, name):
+        return self.resolve([name])[normalize_text(name)]
+
+
+def spelling_of(artist, name):
+    """What `Album.artist_spelling` stores for an album of `artist` named `name`."""
+    return "" if name == artist.name else name
+
+
+def shown_artist():
+    """Expression of the artist name shown for an album, e.g. to order by."""
+    return models.functions.Coalesce(
+        models.functions.NullIf("artist_spelling", models.Value("")),
+        "artist_ref__name",
+    )
+
+
+class Artist(models.Model):
+    objects = ArtistManager()
+    name = models.CharField(max_length=100)
+    match_key = models.CharField(max_length=255, unique=True, editable=False)
+
+    def __str__(self):
+        return self.name
+
+
 class User(models.Model):
     auth_user = models.OneToOneField(
         AuthUser, models.CASCADE, related_name="albumz_user"
@@ -41,54 +104,60 @@ class User(models.Model):
     def __str__(self) -> str:
         return f"{self.username}"
 
+    def find_duplicate(self, unsaved_album):
+        return self.albums.filter(match_key=unsaved_album.compute_match_key()).first()
+
+    def reject_duplicate(self, unsaved_album, existing_album):
+        events.duplicate_rejected.send(
+            sender=type(self), user=self, album=unsaved_album, existing=existing_album
+        )
+        raise (
+            AlbumAlreadyInCollectionError
+            if existing_album.owned
+            else AlbumAlreadyOnWishlistError
+        )
+
     def add_to_collection(self, unsaved_album):
-        existing_album = self.albums.filter(
-            title=unsaved_album.title,
-            artist=unsaved_album.artist,
-        ).first()
+        existing_album = self.find_duplicate(unsaved_album)
         if existing_album:
             if existing_album.owned:
-                raise AlbumAlreadyInCollectionError
+                self.reject_duplicate(unsaved_album, existing_album)
             else:
                 existing_album.owned = True
                 existing_album.save()
+                events.album_moved_to_collection.send(
+                    sender=type(self), user=self, album=existing_album
+                )
         else:
             unsaved_album.user = self
             unsaved_album.owned = True
             unsaved_album.save()
+            events.album_added.send(
+                sender=type(self), user=self, album=unsaved_album, owned=True
+            )
 
     def add_to_wishlist(self, unsaved_album):
-        existing_album = self.albums.filter(
-            title=unsaved_album.title,
-            artist=unsaved_album.artist,
-        ).first()
+        existing_album = self.find_duplicate(unsaved_album)
         if existing_album:
-            raise (
-                AlbumAlreadyInCollectionError
-                if existing_album.owned
-                else AlbumAlreadyOnWishlistError
-            )
+            self.reject_duplicate(unsaved_album, existing_album)
         else:
             unsaved_album.user = self
             unsaved_album.owned = False
             unsaved_album.save()
+            events.album_added.send(
+                sender=type(self), user=self, album=unsaved_album, owned=False
+            )
 
     def edit_album(self, album_from_db, unsaved_album):
-        existing_album = self.albums.filter(
-            title=unsaved_album.title,
-            artist=unsaved_album.artist,
-        ).first()
+        existing_album = self.find_duplicate(unsaved_album)
         if existing_album and existing_album.pk != album_from_db.pk:
-            raise (
-                AlbumAlreadyInCollectionError
-                if existing_album.owned
-                else AlbumAlreadyOnWishlistError
-            )
+            self.reject_duplicate(unsaved_album, existing_album)
         else:
             fields_to_update = ["title", "artist", "pub_date", "genre", "user_rating"]
             for field in fields_to_update:
                 setattr(album_from_db, field, getattr(unsaved_album, field))
             album_from_db.save()
+            events.album_edited.send(sender=type(self), user=self, album=album_from_db)
 
     def move_to_collection(self, album_id):
         try:
@@ -99,6 +168,19 @@ class User(models.Model):
             raise AlbumAlreadyInCollectionError
         album.owned = True
         album.save()
+        events.album_moved_to_collection.send(sender=type(self), user=self, album=album)
+
+    def delete_album(self, album):
+        album_id = album.pk
+        album.delete()
+        events.albums_deleted.send(sender=type(self), user=self, album_ids=[album_id])
+
+    def delete_albums(self, album_ids):
+        """Deletes the albums of the user among `album_ids`, returning how many."""
+        # Cascaded rows (such as search postings) are counted separately.
+        _, deleted = self.albums.filter(pk__in=album_ids).delete()
+        events.albums_deleted.send(sender=type(self), user=self, album_ids=album_ids)
+        return deleted.get(Album._meta.label, 0)
 
 
 class AlbumQuerySet(models.QuerySet):
@@ -120,15 +202,132 @@ class AlbumQuerySet(models.QuerySet):
             average_rating=models.Avg("user_rating")
         )
 
+    def title_completions(self, prefix):
+        return (
+            self.filter(title__istartswith=prefix)
+            .order_by("title")
+            .values_list("title", flat=True)
+            .distinct()
+        )
+
+    def artist_completions(self, prefix):
+        # Own spellings and artist names are matched by their own prefix indexes.
+        spellings = (
+            self.filter(artist_spelling__istartswith=prefix)
+            .exclude(artist_spelling="")
+            .values_list("artist_spelling", flat=True)
+        )
+        names = (
+            Artist.objects.filter(name__istartswith=prefix)
+            .filter(
+                models.Exists(
+                    self.filter(artist_ref=models.OuterRef("pk"), artist_spelling="")
+                )
+            )
+            .values_list("name", flat=True)
+        )
+        return spellings.union(names).order_by("artist_spelling")
+
+    def fuzzy_search(self, query):
+        """Albums whose title or artist resembles the query, most similar first.
+
+        Albums containing the query always match, like with `search_query`.
+        PostgreSQL ranks by pg_trgm word similarity, which its trigram indexes
+        serve. Elsewhere, at most FUZZY_SEARCH_CANDIDATES albums containing the
+        query (the shortest matching texts first) and as many others sharing
+        the most trigrams with it, looked up in the `AlbumSearchGram` index,
+        are re-ranked by edit distance.
+        """
+        if not normalize_text(query):
+            return self
+        if connections[self.db].vendor == "postgresql":
+            return self._trigram_search(query)
+        return self._gram_index_search(query)
+
+    def _trigram_search(self, query):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return (
+            # The trigram indexes serve the ILIKE of the substring matches too.
+            self.filter(
+                models.Q(title__trigram_word_similar=query)
+                | models.Q(artist_spelling__trigram_word_similar=query)
+                | models.Q(artist_ref__name__trigram_word_similar=query)
+                | models.Q(title__icontains=query)
+                | models.Q(artist_spelling__icontains=query)
+                | models.Q(artist_ref__name__icontains=query)
+            )
+            .annotate(
+                similarity=models.functions.Greatest(
+                    TrigramWordSimilarity(query, "title"),
+                    TrigramWordSimilarity(query, "artist_spelling"),
+                    TrigramWordSimilarity(query, "artist_ref__name"),
+                )
+            )
+            .order_by("-similarity", "title")
+        )
+
+    def _gram_index_search(self, query):
+        grams = trigrams(query)
+        limit = settings.FUZZY_SEARCH_CANDIDATES
+        # Capped separately, so that lookalikes never crowd out the albums
+        # containing the query.
+        matches = list(
+            self.search_query(query)
+            .annotate(
+                matched_length=models.Case(
+                    models.When(title__icontains=query, then=Length("title")),
+                    default=Length(shown_artist()),
+                )
+            )
+            .order_by("matched_length", "pk")
+            .values_list("pk", flat=True)[:limit]
+        )
+        candidates = (
+            AlbumSearchGram.objects.filter(
+                user__in=self.values("user"), gram__in=grams, album__in=self
+            )
+            .exclude(album__in=matches)
+            .values("album")
+            .annotate(shared=models.Count("pk"))
+            .filter(shared__gte=math.ceil(len(grams) * settings.FUZZY_SEARCH_THRESHOLD))
+            .order_by("-shared")
+            .values_list("album", flat=True)[:limit]
+        )
+        scores = {
+            album.pk: max(
+                similarity(query, album.title),
+                similarity(query, album.artist),
+                similarity(query, f"{album.artist} {album.title}"),
+            )
+            for album in self.filter(pk__in=[*matches, *candidates]).only(
+                "id", "title", "artist_spelling", "artist_ref__name"
+            )
+        }
+        return (
+            self.filter(pk__in=scores)
+            .annotate(
+                similarity=models.Case(
+                    *(
+                        models.When(pk=pk, then=models.Value(score))
+                        for pk, score in scores.items()
+                    ),
+                    output_field=models.FloatField(),
+                )
+            )
+            .order_by("-similarity", "title")
+        )
+
     def search_query(self, query):
-        return self.filter(
-            models.Q(artist__icontains=query) | models.Q(title__icontains=query)
+        return self.alias(artist_shown=shown_artist()).filter(
+            models.Q(artist_shown__icontains=query) | models.Q(title__icontains=query)
         )
 
 
 class AlbumManager(models.Manager):
     def get_queryset(self):
-        return AlbumQuerySet(self.model, using=self._db)
+        # `Album.artist` reads the artist's name, fetch it in the same query.
+        return AlbumQuerySet(self.model, using=self._db).select_related("artist_ref")
 
     def average_rating(self, genre=None):
         return self.get_queryset().average_rating(genre)
@@ -142,6 +341,15 @@ class AlbumManager(models.Manager):
     def on_wishlist(self):
         return self.get_queryset().on_wishlist()
 
+    def title_completions(self, prefix):
+        return self.get_queryset().title_completions(prefix)
+
+    def artist_completions(self, prefix):
+        return self.get_queryset().artist_completions(prefix)
+
+    def fuzzy_search(self, query):
+        return self.get_queryset().fuzzy_search(query)
+
     def search_query(self, query):
         if query:
             return self.get_queryset().search_query(query)
@@ -152,7 +360,15 @@ class Album(models.Model):
     albums = AlbumManager()
     user = models.ForeignKey(User, models.CASCADE, related_name="albums")
     title = models.CharField(max_length=250)
-    artist = models.CharField(max_length=100)
+    artist_ref = models.ForeignKey(
+        Artist, models.PROTECT, related_name="albums", verbose_name="artist"
+    )
+    artist_spelling = models.CharField(
+        "Spelling of the artist by the owner, if not the artist's name.",
+        max_length=100,
+        blank=True,
+        default="",
+    )
     pub_date = models.DateField("Date of publication.", null=True, blank=True)
     genre = models.CharField(max_length=30, choices=Genre.choices, default=Genre.OTHER)
     user_rating = models.IntegerField(
@@ -166,6 +382,60 @@ class Album(models.Model):
     owned = models.BooleanField(
         "True if owned, False if on wishlist"
     )  # None as default
+    cover = models.ForeignKey(
+        Cover, models.SET_NULL, null=True, blank=True, related_name="albums"
+    )
+    match_key = models.CharField(
+        "Normalized artist and title, used to detect duplicates.",
+        max_length=360,
+        editable=False,
+    )
+    sync_seq = models.BigIntegerField(
+        "Number of the last change in the sequence of the user.",
+        default=0,
+        editable=False,
+    )
+
+    _artist_name = None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "match_key"], name="album_user_match_key_idx"),
+            models.Index(fields=["user", "artist_ref"], name="album_user_artist_idx"),
+            models.Index(
+                fields=["user", "owned", "genre"], name="album_user_owned_genre_idx"
+            ),
+            models.Index(fields=["user", "pub_date"], name="album_user_pub_date_idx"),
+            models.Index(fields=["add_date"], name="album_add_date_idx"),
+            # Looks up albums across users, e.g. for recommendations.
+            models.Index(fields=["match_key"], name="album_match_key_idx"),
+            # Serves the change feed of a user, see albumz_app/sync.
+            models.Index(fields=["user", "sync_seq"], name="album_user_sync_seq_idx"),
+        ]
+
+    @property
+    def artist(self):
+        """Name of the artist; assigning a name links the artist on save."""
+        if self._artist_name is not None:
+            return self._artist_name
+        if self.artist_spelling:
+            return self.artist_spelling
+        if self.artist_ref_id is None:
+            return None
+        return self.artist_ref.name
+
+    @artist.setter
+    def artist(self, name):
+        self._artist_name = name
+
+    @property
+    def cover_urls(self):
+        """{size: {format: URL}} of the cover thumbnails, once generated."""
+        return self.cover.urls if self.cover_id is not None else {}
+
+    @property
+    def cover_url(self):
+        return self.cover_urls.get("large", {}).get("jpeg")
 
     def __str__(self):
         return f"{self.title} by {self.artist}"
@@ -173,10 +443,56 @@ class Album(models.Model):
     def __eq__(self, value) -> bool:  # default behaviour is comparison by primary keys
         if not isinstance(value, Album):
             return False
-        return self.title == value.title and self.artist == value.artist
+        return self.compute_match_key() == value.compute_match_key()
 
     def __hash__(self):
-        return hash((self.title, self.artist))
+        return hash(self.compute_match_key())
+
+    def save(self, *args, **kwargs):
+        match_key = self.match_key
+        self.match_key = self.compute_match_key()
+        reindex = self._state.adding or self.match_key != match_key
+        if self._artist_name is not None:
+            self.artist_ref = Artist.objects.get_for_name(self._artist_name)
+            self.artist_spelling = spelling_of(self.artist_ref, self._artist_name)
+            self._artist_name = None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"title", "artist"} & set(update_fields):
+            kwargs["update_fields"] = {
+                *(field for field in update_fields if field != "artist"),
+                "artist_ref",
+                "artist_spelling",
+                "match_key",
+            }
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "sync_seq"}
+        with transaction.atomic():
+            SyncState.objects.sequence(self.user_id, [self])
+            super().save(*args, **kwargs)
+            if reindex:
+                AlbumSearchGram.objects.index([self])
+        self._saved_user_id = self.user_id
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        album = super().from_db(db, field_names, values)
+        album._saved_user_id = album.__dict__.get("user_id")
+        return album
+
+    def _do_update(self, base_qs, *args, **kwargs):
+        # The table may be hash partitioned by user (see partitioning.py), the
+        # user of the stored row lets PostgreSQL prune the update.
+        saved_user_id = getattr(self, "_saved_user_id", None)
+        if saved_user_id is not None:
+            base_qs = base_qs.filter(user_id=saved_user_id)
+        return super()._do_update(base_qs, *args, **kwargs)
+
+    def refresh_from_db(self, *args, **kwargs):
+        self._artist_name = None
+        super().refresh_from_db(*args, **kwargs)
+
+    def compute_match_key(self):
+        return album_match_key(self.title, self.artist)
 
     def clean(self):
         super().clean()
@@ -193,3 +509,36 @@ class Album(models.Model):
 
     def is_pub_date_valid(self):
         return self.pub_date is None or self.pub_date <= timezone.now().date()
+
+
+class AlbumSearchGramManager(models.Manager):
+    def index(self, albums):
+        """(Re)builds the trigram postings of saved albums.
+
+        PostgreSQL searches with pg_trgm indexes instead, so nothing is stored.
+        """
+        if connections[self.db].vendor == "postgresql":
+            return
+        self.filter(album__in=[album.pk for album in albums]).delete()
+        self.bulk_create(
+            [
+                AlbumSearchGram(user_id=album.user_id, album_id=album.pk, gram=gram)
+                for album in albums
+                for gram in album_grams(album.title, album.artist)
+            ],
+            batch_size=1000,
+        )
+
+
+class AlbumSearchGram(models.Model):
+    """Trigram posting of an album, for fuzzy search without pg_trgm."""
+
+    objects = AlbumSearchGramManager()
+    user = models.ForeignKey(User, models.CASCADE, related_name="+")
+    album = models.ForeignKey(Album, models.CASCADE, related_name="search_grams")
+    gram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "gram"], name="search_gram_user_gram_idx"),
+        ]
@@ -0,0 +1,29 @@
+import re
+import unicodedata
+
+from django.conf import settings
+
+LEADING_ARTICLES = {"the", "a", "an"}
+KEY_SEPARATOR = "|"
+
+
+def normalize_text(value, strip_articles=None):
+    """Folds a title or an artist name so that spelling variants compare equal.
+
+    Accents are removed, case is folded, punctuation and runs of whitespace
+    become single spaces and, optionally, a leading article is dropped, so
+    "The Beatles", "the beatles " and "Beatles" all normalize to "beatles".
+    """
+    if strip_articles is None:
+        strip_articles = settings.ALBUM_MATCH_KEY_STRIP_ARTICLES
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    words = re.sub(r"[\W_]+", " ", folded).split()
+    if strip_articles and len(words) > 1 and words[0] in LEADING_ARTICLES:
+        words = words[1:]
+    # Names made of punctuation only ("...", "!!!") must not collapse to "".
+    return " ".join(words) or folded.strip()
+
+
+def album_match_key(title, artist):
+    return f"{normalize_text(artist)}{KEY_SEPARATOR}{normalize_text(title)}"
@@ -0,0 +1,50 @@
+from .normalization import normalize_text
+
+GRAM_SIZE = 3
+
+
+def trigrams(value):
+    """Trigrams of the words of a text, padded like PostgreSQL's pg_trgm does."""
+    grams = set()
+    for word in normalize_text(value, strip_articles=False).split():
+        padded = f"  {word} "
+        grams.update(
+            padded[i : i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)
+        )
+    return grams
+
+
+def album_grams(title, artist):
+    return trigrams(title) | trigrams(artist)
+
+
+def edit_distance(a, b):
+    """Optimal string alignment distance (Levenshtein plus transpositions)."""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def similarity(query, text):
+    """Similarity (0-1) of the query to its best matching run of words in text."""
+    query_words = normalize_text(query, strip_articles=False).split()
+    words = normalize_text(text, strip_articles=False).split()
+    if not query_words or not words:
+        return 0.0
+    size = min(len(query_words), len(words))
+    query = " ".join(query_words)
+    best = 0.0
+    for start in range(len(words) - size + 1):
+        window = " ".join(words[start : start + size])
+        distance = edit_distance(query, window)
+        best = max(best, 1 - distance / max(len(query), len(window)))
+    return best
@@ -2,6 +2,7 @@ from django import forms
 from django.utils import timezone
 
 from .. import constants
+from ..covers.uploads import validate_cover
 from ..domain.models import Album
 
 
@@ -10,10 +11,23 @@ class AlbumSearchForm(forms.Form):
 
 
 class BaseAlbumForm(forms.ModelForm):
+    artist = forms.CharField(max_length=100)
+
     class Meta:
         model = Album
         fields = ["title", "artist", "pub_date", "genre", "user_rating"]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.artist_ref_id is not None:
+            self.initial.setdefault("artist", self.instance.artist)
+
+    def _post_clean(self):
+        # `artist` is not a model field, so it is not copied to the instance.
+        if "artist" in self.cleaned_data:
+            self.instance.artist = self.cleaned_data["artist"]
+        super()._post_clean()
+
     def clean_pub_date(self):
         pub_date = self.cleaned_data["pub_date"]
         if pub_date is None:
@@ -32,4 +46,7 @@ class AlbumCollectionForm(BaseAlbumForm): ...
 class AlbumWishlistForm(BaseAlbumForm): ...
 
 
-class AlbumUpdateForm(BaseAlbumForm): ...
+class AlbumUpdateForm(BaseAlbumForm):
+    cover_image = forms.FileField(
+        required=False, label="Cover", validators=[validate_cover]
+    )
@@ -0,0 +1,174 @@
+import time
+import uuid
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models, transaction
+from django.utils import timezone
+
+from ..analytics.models import RollupChanges
+from ..domain.models import Album, AlbumSearchGram, Artist, spelling_of
+from ..domain.normalization import album_match_key, normalize_text
+from ..leaderboards.models import PopularityChanges
+from ..recommendations.models import RecommendationStatus
+from ..sync.models import SyncState
+from .mapping import InvalidRecordError, map_record
+from .models import ImportRun
+from .readers import guess_format, iter_records
+
+
+def store_upload(uploaded_file):
+    """Streams an uploaded file to the (private) imports directory."""
+    storage = FileSystemStorage(location=settings.IMPORTS_ROOT)
+    extension = uploaded_file.name.rsplit(".", 1)[-1].lower()
+    name = storage.save(f"{uuid.uuid4().hex}.{extension}", uploaded_file)
+    return storage.path(name)
+
+
+def delete_upload(path):
+    """Deletes a stored upload; files imported from elsewhere are left alone."""
+    path = Path(path).resolve()
+    if path.is_relative_to(Path(settings.IMPORTS_ROOT).resolve()):
+        path.unlink(missing_ok=True)
+
+
+def purge_uploads(retention_days=None):
+    """Deletes the uploads stored more than `retention_days` ago.
+
+    Finished imports delete their upload themselves; this catches the uploads
+    of imports whose worker died on every attempt. Returns how many it deleted.
+    """
+    if retention_days is None:
+        retention_days = settings.IMPORT_UPLOAD_RETENTION_DAYS
+    cutoff = time.time() - retention_days * 24 * 60 * 60
+    root = Path(settings.IMPORTS_ROOT)
+    deleted = 0
+    for path in root.iterdir() if root.is_dir() else ():
+        if path.is_file() and path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+            deleted += 1
+    return deleted
+
+
+def start_import(user, path, file_format=None, default_owned=True):
+    return ImportRun.objects.create(
+        user=user,
+        source=str(path),
+        file_format=file_format or guess_format(str(path)),
+        default_owned=default_owned,
+    )
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class AlbumImporter:
+    """Imports the albums of an `ImportRun` chunk by chunk.
+
+    Records are streamed from the source file and each chunk is deduplicated
+    against the user's albums with a single query and committed in its own
+    transaction, together with the progress of the run.
+    """
+
+    def __init__(self, run, chunk_size=None, progress=None):
+        self.run = run
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self.progress = progress
+
+    def import_all(self):
+        with open(self.run.source, "rb") as source:
+            # Records up to the last committed chunk were imported already.
+            records = iter_records(
+                source, self.run.file_format, start=self.run.source_offset
+            )
+            for chunk in _chunks(records, self.chunk_size):
+                self.import_chunk([record for record, _ in chunk], chunk[-1][1])
+                if self.progress:
+                    self.progress(self.run)
+        self.run.finished_at = timezone.now()
+        self.run.save(update_fields=["finished_at"])
+        delete_upload(self.run.source)
+        return self.run.summary()
+
+    def map_chunk(self, records):
+        albums, duplicates, invalid = {}, 0, 0
+        for record in records:
+            try:
+                data = map_record(record, self.run.default_owned)
+            except InvalidRecordError:
+                invalid += 1
+                continue
+            key = album_match_key(data["title"], data["artist"])
+            if key in albums:
+                duplicates += 1
+                albums[key]["owned"] = albums[key]["owned"] or data["owned"]
+            else:
+                albums[key] = data
+        return albums, duplicates, invalid
+
+    def import_chunk(self, records, source_offset):
+        user = self.run.user
+        albums, duplicates, invalid = self.map_chunk(records)
+        with transaction.atomic():
+            existing = {
+                album.match_key: album
+                for album in user.albums.filter(match_key__in=albums)
+                .select_related(None)
+                .only(
+                    "id",
+                    "user",
+                    "match_key",
+                    "owned",
+                    "genre",
+                    "user_rating",
+                    "add_date",
+                    "pub_date",
+                )
+            }
+            new_albums, to_move = [], []
+            for key, data in albums.items():
+                album = existing.get(key)
+                if album is None:
+                    new_albums.append((key, data))
+                elif data["owned"] and not album.owned:
+                    to_move.append(album)
+                else:
+                    duplicates += 1
+            artists = Artist.objects.resolve(data["artist"] for _, data in new_albums)
+            to_create = []
+            for key, data in new_albums:
+                name = data.pop("artist")
+                artist = artists[normalize_text(name)]
+                to_create.append(
+                    Album(
+                        user=user,
+                        match_key=key,
+                        artist_ref=artist,
+                        artist_spelling=spelling_of(artist, name),
+                        **data,
+                    )
+                )
+            SyncState.objects.sequence(user.pk, [*to_create, *to_move])
+            Album.albums.bulk_create(to_create)
+            AlbumSearchGram.objects.index(to_create)
+            popularity = PopularityChanges().add(to_create).remove(to_move)
+            for album in to_move:
+                album.owned = True
+            user.albums.bulk_update(to_move, ["owned", "sync_seq"])
+            popularity.add(to_move).apply()
+            RollupChanges().add(to_create).add(to_move).apply()
+            RecommendationStatus.mark_changed([user.pk])
+            ImportRun.objects.filter(pk=self.run.pk).update(
+                records_processed=models.F("records_processed") + len(records),
+                source_offset=source_offset,
+                created=models.F("created") + len(to_create),
+                moved_to_collection=models.F("moved_to_collection") + len(to_move),
+                duplicates=models.F("duplicates") + duplicates,
+                invalid=models.F("invalid") + invalid,
+            )
+        self.run.refresh_from_db()
@@ -0,0 +1,140 @@
+import re
+from datetime import datetime
+
+from django.utils import timezone
+
+from ..domain.models import Album, Artist, Genre, Rating
+
+
+class InvalidRecordError(Exception):
+    """Raised when a source record cannot be mapped onto an album."""
+
+    pass
+
+
+def _simplify(value):
+    return re.sub(r"[^a-z0-9]", "", str(value).casefold())
+
+
+COLUMN_ALIASES = {
+    "title": {"title", "album", "albumtitle", "albumname", "name", "release"},
+    "artist": {"artist", "artists", "artistname", "albumartist", "band", "performer"},
+    "pub_date": {
+        "pubdate",
+        "date",
+        "released",
+        "releasedate",
+        "releaseyear",
+        "year",
+        "originalreleasedate",
+    },
+    "genre": {"genre", "genres", "style"},
+    "user_rating": {"userrating", "rating", "myrating", "stars", "score"},
+    "owned": {"owned", "status", "collection", "incollection"},
+    "wishlist": {"wishlist", "onwishlist", "inwishlist", "wanted"},
+}
+FIELD_BY_COLUMN = {
+    alias: field for field, aliases in COLUMN_ALIASES.items() for alias in aliases
+}
+
+GENRE_SYNONYMS = {
+    _simplify(Genre.HIPHOP.label): Genre.HIPHOP,
+    "rap": Genre.HIPHOP,
+    "rnb": Genre.HIPHOP,
+    "rockandroll": Genre.ROCK,
+    "rocknroll": Genre.ROCK,
+    "metal": Genre.ROCK,
+    "heavymetal": Genre.ROCK,
+    "punk": Genre.ROCK,
+    "bebop": Genre.JAZZ,
+    "swing": Genre.JAZZ,
+}
+OWNED_VALUES = {"1", "true", "yes", "y", "owned", "own", "have", "collection"}
+WISHLIST_VALUES = {"0", "false", "no", "n", "wishlist", "want", "wanted"}
+DATE_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%d.%m.%Y", "%Y-%m", "%Y"]
+
+
+def normalize_genre(value):
+    key = _simplify(re.split(r"[;,/|]", str(value or ""))[0])
+    for genre in Genre:
+        if key in (_simplify(genre.value), _simplify(genre.label)):
+            return genre.value
+    return GENRE_SYNONYMS.get(key, Genre.OTHER).value
+
+
+def normalize_rating(value):
+    """Maps ratings on 0-6, 0-10 or 0-100 scales (or rating labels) to `Rating`."""
+    if value in (None, ""):
+        return Rating.NO_OPINION_YET.value
+    for rating in Rating:
+        if _simplify(value) == _simplify(rating.label):
+            return rating.value
+    try:
+        number = float(str(value).split("/")[0])
+    except ValueError:
+        return Rating.NO_OPINION_YET.value
+    best = max(Rating.values)
+    for scale in (best, 10, 100):
+        if 0 <= number <= scale:
+            return round(number * best / scale)
+    return Rating.NO_OPINION_YET.value
+
+
+def parse_pub_date(value):
+    if value in (None, ""):
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            pub_date = datetime.strptime(str(value).strip(), date_format).date()
+        except ValueError:
+            continue
+        if pub_date > timezone.now().date():
+            raise InvalidRecordError(f"Publication date {value} is in the future.")
+        return pub_date
+    raise InvalidRecordError(f"Unrecognized publication date {value}.")
+
+
+def parse_owned(value, default):
+    if value in (None, ""):
+        return default
+    if isinstance(value, bool):
+        return value
+    simplified = _simplify(value)
+    if simplified in OWNED_VALUES:
+        return True
+    if simplified in WISHLIST_VALUES:
+        return False
+    return default
+
+
+def _required_text(fields, name, model=Album, field_name=None):
+    field_name = field_name or name
+    value = str(fields.get(name) or "").strip()
+    max_length = model._meta.get_field(field_name).max_length
+    if not value:
+        raise InvalidRecordError(f"Missing {name}.")
+    if len(value) > max_length:
+        raise InvalidRecordError(f"{name} longer than {max_length} characters.")
+    return value
+
+
+def map_record(record, default_owned=True):
+    """Maps one source record (a dict of columns) onto `Album` field values."""
+    if not isinstance(record, dict):
+        raise InvalidRecordError("Record is not an object.")
+    fields = {}
+    for column, value in record.items():
+        field = FIELD_BY_COLUMN.get(_simplify(column or ""))
+        if field and field not in fields:
+            fields[field] = value
+    owned = parse_owned(fields.get("owned"), default_owned)
+    if fields.get("wishlist") not in (None, ""):
+        owned = not parse_owned(fields["wishlist"], not owned)
+    return {
+        "title": _required_text(fields, "title"),
+        "artist": _required_text(fields, "artist", Artist, "name"),
+        "pub_date": parse_pub_date(fields.get("pub_date")),
+        "genre": normalize_genre(fields.get("genre")),
+        "user_rating": normalize_rating(fields.get("user_rating")),
+        "owned": owned,
+    }
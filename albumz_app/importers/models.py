@@ -0,0 +1,37 @@
+from django.db import models
+
+from ..domain.models import User
+
+
+class ImportRun(models.Model):
+    """Progress of one import, committed together with every chunk of albums.
+
+    `source_offset` is the byte position in the source right after the last
+    committed chunk, so a crashed import seeks there and resumes with the next
+    record instead of reading the handled ones again.
+    """
+
+    user = models.ForeignKey(User, models.CASCADE, related_name="import_runs")
+    source = models.CharField(max_length=255)
+    file_format = models.CharField(max_length=10)
+    default_owned = models.BooleanField(default=True)
+    records_processed = models.PositiveIntegerField(default=0)
+    source_offset = models.PositiveBigIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    moved_to_collection = models.PositiveIntegerField(default=0)
+    duplicates = models.PositiveIntegerField(default=0)
+    invalid = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Import of {self.source} by {self.user}"
+
+    def summary(self):
+        return {
+            "records_processed": self.records_processed,
+            "created": self.created,
+            "moved_to_collection": self.moved_to_collection,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+        }
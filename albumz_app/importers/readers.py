@@ -0,0 +1,105 @@
+import codecs
+import csv
+import json
+
+READ_SIZE = 64 * 1024
+# A record that is still incomplete after this many characters is malformed
+# (say, an unterminated string), reading stops instead of buffering the file.
+MAX_RECORD_SIZE = 1024 * 1024
+
+
+class RecordTooLargeError(ValueError):
+    """Raised when a source record exceeds `MAX_RECORD_SIZE`."""
+
+    def __init__(self, position):
+        super().__init__(
+            f"The record at byte {position} is longer than {MAX_RECORD_SIZE} "
+            "characters."
+        )
+
+
+def _lines(stream):
+    while line := stream.readline(MAX_RECORD_SIZE + 1):
+        if len(line) > MAX_RECORD_SIZE:
+            raise RecordTooLargeError(stream.tell() - len(line))
+        yield line.decode("utf-8")
+
+
+def iter_csv_records(stream, start=0):
+    lines = _lines(stream)
+    fieldnames = next(csv.reader(lines), None)
+    if fieldnames is None:
+        return
+    if start:
+        stream.seek(start)
+    # The csv reader pulls one line at a time, so `tell` is the record's end.
+    for record in csv.DictReader(lines, fieldnames):
+        yield record, stream.tell()
+
+
+def iter_json_records(stream, start=0):
+    """Yields the objects of a top-level JSON array, or of JSON Lines, one by one.
+
+    Only the record being decoded is held in memory, never the whole document.
+    """
+    if start:
+        stream.seek(start)
+    text = codecs.getincrementaldecoder("utf-8")()
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = stream.tell()
+    in_array = None
+    eof = False
+    while True:
+        stripped = buffer.lstrip(" \t\n\r")
+        position += len(buffer) - len(stripped)
+        buffer = stripped
+        if in_array and buffer.startswith(","):
+            buffer, position = buffer[1:], position + 1
+            continue
+        if in_array is None and buffer:
+            # A resumed array continues after a record, with "," or "]".
+            in_array = buffer[0] in "[,]"
+            if buffer[0] in "[,":
+                buffer, position = buffer[1:], position + 1
+            continue
+        if in_array and buffer.startswith("]"):
+            return
+        try:
+            if not buffer:
+                raise ValueError
+            record, end = decoder.raw_decode(buffer)
+        except ValueError:
+            if eof:
+                if buffer:
+                    raise
+                return
+            if len(buffer) > MAX_RECORD_SIZE:
+                raise RecordTooLargeError(position) from None
+            chunk = stream.read(READ_SIZE)
+            eof = not chunk
+            buffer += text.decode(chunk, final=eof)
+            continue
+        position += len(buffer[:end].encode())
+        buffer = buffer[end:]
+        yield record, position
+
+
+READERS = {"csv": iter_csv_records, "json": iter_json_records}
+
+
+def iter_records(binary_stream, file_format, start=0):
+    """Yields `(record, offset)` pairs, `offset` being the byte position right
+    after the record: passed as `start`, reading resumes with the next record.
+    """
+    binary_stream.seek(0)
+    if binary_stream.read(len(codecs.BOM_UTF8)) != codecs.BOM_UTF8:
+        binary_stream.seek(0)
+    return READERS[file_format](binary_stream, start)
+
+
+def guess_format(filename):
+    extension = filename.rsplit(".", 1)[-1].lower()
+    if extension in ("json", "jsonl", "ndjson"):
+        return "json"
+    return "csv"
@@ -0,0 +1,40 @@
+from ..covers.models import Cover
+from ..covers.thumbnails import generate_thumbnails
+from ..importers.importer import AlbumImporter, delete_upload
+from ..importers.models import ImportRun
+from ..recommendations.models import RecommendationStatus
+from .queue import register
+
+BULK_DELETE_BATCH_SIZE = 500
+
+
+@register("albums.bulk_delete")
+def bulk_delete_albums(job):
+    album_ids = job.payload["album_ids"]
+    deleted = 0
+    for start in range(0, len(album_ids), BULK_DELETE_BATCH_SIZE):
+        batch = album_ids[start : start + BULK_DELETE_BATCH_SIZE]
+        deleted += job.user.delete_albums(batch)
+        job.report_progress(start + len(batch), len(album_ids))
+    RecommendationStatus.mark_changed([job.user_id])
+    return {"deleted": deleted}
+
+
+@register("albums.import")
+def import_albums(job):
+    run = ImportRun.objects.get(pk=job.payload["import_run_id"])
+    importer = AlbumImporter(
+        run, progress=lambda run: job.report_progress(run.records_processed)
+    )
+    try:
+        return importer.import_all()
+    except Exception:
+        # A retry resumes from the stored upload, the last attempt removes it.
+        if job.attempts >= job.max_attempts:
+            delete_upload(run.source)
+        raise
+
+
+@register("covers.thumbnails")
+def generate_cover_thumbnails(job):
+    return generate_thumbnails(Cover.objects.get(pk=job.payload["cover_id"]))
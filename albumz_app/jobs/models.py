@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from ..domain.models import User
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "QUEUED", "Queued"
+    RUNNING = "RUNNING", "Running"
+    SUCCEEDED = "SUCCEEDED", "Succeeded"
+    FAILED = "FAILED", "Failed"
+
+
+class JobQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(user=user)
+
+    def due(self):
+        return self.filter(status=JobStatus.QUEUED, run_after__lte=timezone.now())
+
+    def stale(self):
+        lock_expiry = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+        return self.filter(status=JobStatus.RUNNING, locked_at__lt=lock_expiry)
+
+
+class Job(models.Model):
+    objects = JobQuerySet.as_manager()
+    name = models.CharField(max_length=100)
+    user = models.ForeignKey(
+        User, models.CASCADE, related_name="jobs", null=True, blank=True
+    )
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10, choices=JobStatus.choices, default=JobStatus.QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    def report_progress(self, done, total=None):
+        """Persists progress right away, so it is visible while the job runs.
+
+        Reporting progress refreshes the lock as well, the job is alive.
+        """
+        self.progress_done = done
+        if total is not None:
+            self.progress_total = total
+        self.locked_at = timezone.now()
+        Job.objects.filter(pk=self.pk).update(
+            progress_done=self.progress_done,
+            progress_total=self.progress_total,
+            locked_at=self.locked_at,
+        )
+
+    def mark_succeeded(self, result=None):
+        self.status = JobStatus.SUCCEEDED
+        self.result = result
+        self.error = ""
+        self.finished_at = timezone.now()
+        self.save(update_fields=["status", "result", "error", "finished_at"])
+
+    def mark_failed(self, error):
+        """Schedules a retry with exponential backoff until attempts run out."""
+        self.error = error
+        if self.attempts < self.max_attempts:
+            backoff = settings.JOB_RETRY_BACKOFF * 2 ** (self.attempts - 1)
+            self.status = JobStatus.QUEUED
+            self.run_after = timezone.now() + timedelta(seconds=backoff)
+        else:
+            self.status = JobStatus.FAILED
+            self.finished_at = timezone.now()
+        self.locked_by = ""
+        self.locked_at = None
+        self.save(
+            update_fields=[
+                "error",
+                "status",
+                "run_after",
+                "finished_at",
+                "locked_by",
+                "locked_at",
+            ]
+        )
+
+    def is_finished(self):
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
@@ -0,0 +1,174 @@
+import logging
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import django
+from django.conf import settings
+from django.db import connection, connections, models
+from django.utils import timezone
+
+from .models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def register(name):
+    """Registers the decorated callable as the handler of jobs called `name`.
+
+    The handler receives the `Job` and returns a JSON-serializable result.
+    """
+
+    def decorator(handler):
+        _handlers[name] = handler
+        return handler
+
+    return decorator
+
+
+def get_handler(name):
+    return _handlers[name]
+
+
+def enqueue(name, user=None, payload=None, max_attempts=3):
+    if name not in _handlers:
+        raise KeyError(f"No job handler registered for '{name}'.")
+    return Job.objects.create(
+        name=name, user=user, payload=payload or {}, max_attempts=max_attempts
+    )
+
+
+def claim_next(worker_id):
+    """Atomically moves the oldest due job to RUNNING and returns it.
+
+    The claim is a conditional UPDATE, so concurrent workers never pick up
+    the same job, on SQLite as well as on PostgreSQL.
+    """
+    candidates = Job.objects.due().order_by("run_after", "pk")
+    for pk in candidates.values_list("pk", flat=True)[:10]:
+        claimed = Job.objects.filter(pk=pk, status=JobStatus.QUEUED).update(
+            status=JobStatus.RUNNING,
+            locked_by=worker_id,
+            locked_at=timezone.now(),
+            attempts=models.F("attempts") + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+STALE_JOB_ERROR = "The worker running the job died."
+
+
+def requeue_stale():
+    """Puts back jobs whose worker died mid-run, returning how many.
+
+    Live workers keep refreshing the locks of their jobs (see
+    `Worker.heartbeat`), so only jobs of dead workers ever go stale.
+
+    A job that killed its worker on every attempt (say, it ran out of memory)
+    fails once its attempts run out, instead of being retried forever.
+    """
+    stale = Job.objects.stale()
+    failed = stale.filter(attempts__gte=models.F("max_attempts")).update(
+        status=JobStatus.FAILED,
+        error=STALE_JOB_ERROR,
+        finished_at=timezone.now(),
+        locked_by="",
+        locked_at=None,
+    )
+    if failed:
+        logger.error("Failed %s jobs whose worker died on every attempt.", failed)
+    return stale.update(status=JobStatus.QUEUED, locked_by="", locked_at=None)
+
+
+def run_job(job):
+    try:
+        result = get_handler(job.name)(job)
+    except Exception:
+        logger.exception("Job %s failed (attempt %s).", job, job.attempts)
+        job.mark_failed(traceback.format_exc(limit=5))
+    else:
+        job.mark_succeeded(result)
+    return job.status
+
+
+def _run_pooled_job(job_id):
+    # Pool tasks get the id only, so they can be pickled into worker processes.
+    try:
+        return run_job(Job.objects.get(pk=job_id))
+    finally:
+        connection.close()
+
+
+def _init_worker_process():
+    django.setup()
+
+
+class Worker:
+    """Polls the job table and runs due jobs in a thread or process pool."""
+
+    def __init__(self, concurrency=1, pool="thread", poll_interval=1.0):
+        self.concurrency = concurrency
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def make_executor(self):
+        if self.pool == "process":
+            # Forked children must not share the parent's database connections.
+            connections.close_all()
+            return ProcessPoolExecutor(
+                self.concurrency, initializer=_init_worker_process
+            )
+        return ThreadPoolExecutor(self.concurrency)
+
+    def heartbeat(self, job_ids):
+        """Refreshes the locks of the jobs this worker is running, so that
+        long jobs are not requeued as abandoned while they still run."""
+        return Job.objects.filter(
+            pk__in=job_ids, status=JobStatus.RUNNING, locked_by=self.worker_id
+        ).update(locked_at=timezone.now())
+
+    def collect(self, future, job_id):
+        # `run_job` records the errors of the job itself, an exception here is
+        # the pool failing (e.g. a killed process). The lock of the job is no
+        # longer refreshed, so it is requeued once it expires.
+        error = future.exception()
+        if error is not None:
+            logger.error("Running job #%s crashed.", job_id, exc_info=error)
+
+    def run(self, once=False):
+        running = {}
+        last_heartbeat = time.monotonic()
+        with self.make_executor() as executor:
+            while True:
+                requeue_stale()
+                while len(running) < self.concurrency:
+                    job = claim_next(self.worker_id)
+                    if job is None:
+                        break
+                    logger.info("Running job %s.", job)
+                    running[executor.submit(_run_pooled_job, job.pk)] = job.pk
+                if once and not running:
+                    return
+                if running:
+                    done, _ = wait(
+                        running, timeout=self.poll_interval, return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        self.collect(future, running.pop(future))
+                else:
+                    time.sleep(self.poll_interval)
+                if time.monotonic() - last_heartbeat >= settings.JOB_HEARTBEAT_INTERVAL:
+                    self.heartbeat(list(running.values()))
+                    last_heartbeat = time.monotonic()
@@ -0,0 +1,145 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Cast, Greatest
+
+from ..domain.models import Genre
+
+# Genre of the counters of an album across all genres.
+ALL_GENRES = ""
+
+COUNTERS = ["owners", "wishlisters", "ratings", "rating_sum"]
+
+
+class AlbumPopularityQuerySet(models.QuerySet):
+    def for_genre(self, genre=None):
+        return self.filter(genre=genre or ALL_GENRES)
+
+    def most_owned(self, genre=None):
+        return self.for_genre(genre).filter(owners__gt=0).order_by("-owners", "key")
+
+    def most_wishlisted(self, genre=None):
+        return (
+            self.for_genre(genre)
+            .filter(wishlisters__gt=0)
+            .order_by("-wishlisters", "key")
+        )
+
+    def highest_rated(self, genre=None, min_ratings=1):
+        return (
+            self.for_genre(genre)
+            .filter(ratings__gte=max(min_ratings, 1))
+            .order_by("-average_rating", "key")
+        )
+
+
+class AlbumPopularityManager(models.Manager.from_queryset(AlbumPopularityQuerySet)):
+    def apply(self, changes):
+        """Adds the counter deltas of `PopularityChanges` with atomic updates.
+
+        Rows are updated in key order, so concurrent writers cannot deadlock.
+        """
+        for (key, genre), delta in sorted(changes.deltas.items()):
+            if not any(delta):
+                continue
+            if not self.increment(key, genre, delta) and any(
+                value > 0 for value in delta
+            ):
+                album = changes.albums[key]
+                try:
+                    with transaction.atomic(using=self.db):
+                        self.create(
+                            key=key, genre=genre, title=album.title, artist=album.artist
+                        )
+                except IntegrityError:
+                    pass  # Created by a concurrent writer meanwhile.
+                self.increment(key, genre, delta)
+
+    def increment(self, key, genre, delta):
+        owners, wishlisters, ratings, rating_sum = delta
+        return self.filter(key=key, genre=genre).update(
+            owners=models.F("owners") + owners,
+            wishlisters=models.F("wishlisters") + wishlisters,
+            ratings=models.F("ratings") + ratings,
+            rating_sum=models.F("rating_sum") + rating_sum,
+            # The right-hand sides of an UPDATE see the values before it.
+            average_rating=Cast(
+                models.F("rating_sum") + rating_sum, models.FloatField()
+            )
+            / Greatest(models.F("ratings") + ratings, 1),
+        )
+
+
+class AlbumPopularity(models.Model):
+    """Site-wide counters of an album, identified across users by its match key.
+
+    Kept per genre the users filed the album under and across all genres
+    (`ALL_GENRES`). The domain write paths update them incrementally, see
+    `PopularityChanges`; `manage.py reconcile_leaderboards` corrects drift.
+    """
+
+    objects = AlbumPopularityManager()
+    key = models.CharField(max_length=360)
+    genre = models.CharField(
+        max_length=30, choices=Genre.choices, blank=True, default=ALL_GENRES
+    )
+    title = models.CharField(max_length=250)
+    artist = models.CharField(max_length=100)
+    owners = models.IntegerField(default=0)
+    wishlisters = models.IntegerField(default=0)
+    ratings = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    average_rating = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name_plural = "album popularity"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key", "genre"], name="popularity_key_genre_uniq"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["genre", "-owners", "key"], name="popularity_owners_idx"
+            ),
+            models.Index(
+                fields=["genre", "-wishlisters", "key"],
+                name="popularity_wishlisters_idx",
+            ),
+            models.Index(
+                fields=["genre", "-average_rating", "key"],
+                name="popularity_rating_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title} by {self.artist}"
+
+
+class PopularityChanges:
+    """Counter deltas of albums added to and removed from collections."""
+
+    def __init__(self):
+        self.deltas = {}
+        # An added album of each key, labelling counters created for it.
+        self.albums = {}
+
+    def add(self, albums, sign=1):
+        for album in albums:
+            if sign > 0:
+                self.albums.setdefault(album.match_key, album)
+            delta = [
+                sign * album.owned,
+                sign * (not album.owned),
+                sign * (album.user_rating > 0),
+                sign * album.user_rating,
+            ]
+            for genre in (album.genre, ALL_GENRES):
+                totals = self.deltas.setdefault((album.match_key, genre), [0] * 4)
+                for index, value in enumerate(delta):
+                    totals[index] += value
+        return self
+
+    def remove(self, albums):
+        return self.add(albums, sign=-1)
+
+    def apply(self):
+        AlbumPopularity.objects.apply(self)
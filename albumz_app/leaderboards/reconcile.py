@@ -0,0 +1,123 @@
+"""Recomputes the popularity counters from the albums, correcting drift.
+
+Drift comes from writes that bypass the domain, e.g. `bulk_update` in
+`rebuild_match_keys` or changes made in the database shell. The albums are
+reconciled in batches of match keys; the counters of a batch are locked while
+it is recomputed, so concurrent increments wait for it instead of being lost.
+Missing counters cannot be locked, a concurrent write may create one first:
+those are recounted once the batch has locked them too.
+"""
+
+from django.db import models, transaction
+
+from ..domain.models import Album
+from ..recommendations.engine import representatives
+from .models import ALL_GENRES, COUNTERS, AlbumPopularity
+
+BATCH_SIZE = 1000
+
+AGGREGATES = {
+    "owners": models.Count("pk", filter=models.Q(owned=True)),
+    "wishlisters": models.Count("pk", filter=models.Q(owned=False)),
+    "ratings": models.Count("pk", filter=models.Q(user_rating__gt=0)),
+    "rating_sum": models.Sum("user_rating", default=0),
+}
+
+
+def in_range(queryset, field, after, upto):
+    queryset = queryset.filter(**{f"{field}__gt": after})
+    if upto is not None:
+        queryset = queryset.filter(**{f"{field}__lte": upto})
+    return queryset
+
+
+def expected_counters(albums):
+    """{(key, genre): counter values} of the albums."""
+    albums = albums.select_related(None).order_by()
+    expected = {}
+    for group, genre in [(["match_key", "genre"], None), (["match_key"], ALL_GENRES)]:
+        for row in albums.values(*group).annotate(**AGGREGATES):
+            key = (row["match_key"], row["genre"] if genre is None else genre)
+            expected[key] = [row[counter] for counter in COUNTERS]
+    return expected
+
+
+def average_rating(ratings, rating_sum):
+    return rating_sum / ratings if ratings else 0
+
+
+def set_counters(counter, values):
+    """Sets the counters, returning whether any of them changed."""
+    if [getattr(counter, name) for name in COUNTERS] == values:
+        return False
+    for name, value in zip(COUNTERS, values):
+        setattr(counter, name, value)
+    counter.average_rating = average_rating(counter.ratings, counter.rating_sum)
+    return True
+
+
+def recount_created(keys):
+    """Corrects the counters of `keys` a concurrent write created first.
+
+    That write only added its own delta. Locking the counters waits for it,
+    so the albums counted afterwards include its album.
+    """
+    if not keys:
+        return []
+    expected = expected_counters(Album.albums.filter(match_key__in=keys))
+    empty = [0] * len(COUNTERS)
+    return [
+        counter
+        for counter in AlbumPopularity.objects.select_for_update()
+        .filter(key__in=keys)
+        .order_by("key", "genre")
+        if set_counters(counter, expected.get((counter.key, counter.genre), empty))
+    ]
+
+
+def reconcile_batch(after, upto):
+    stored = {
+        (counter.key, counter.genre): counter
+        for counter in in_range(
+            AlbumPopularity.objects.select_for_update(), "key", after, upto
+        )
+    }
+    expected = expected_counters(in_range(Album.albums, "match_key", after, upto))
+    changed, created = [], []
+    for (key, genre), values in expected.items():
+        counter = stored.pop((key, genre), None)
+        if counter is None:
+            counter = AlbumPopularity(key=key, genre=genre)
+            set_counters(counter, values)
+            created.append(counter)
+        elif set_counters(counter, values):
+            changed.append(counter)
+    created_keys = {counter.key for counter in created}
+    labels = representatives(created_keys)
+    for counter in created:
+        counter.title, counter.artist = labels[counter.key]
+    AlbumPopularity.objects.bulk_create(created, ignore_conflicts=True)
+    changed += recount_created(created_keys)
+    AlbumPopularity.objects.bulk_update(changed, [*COUNTERS, "average_rating"])
+    AlbumPopularity.objects.filter(pk__in=[c.pk for c in stored.values()]).delete()
+    return len(created) + len(changed) + len(stored)
+
+
+def reconcile(batch_size=BATCH_SIZE):
+    """Corrects all counters, returning the number of counters fixed."""
+    keys = (
+        Album.albums.select_related(None)
+        .order_by("match_key")
+        .values_list("match_key", flat=True)
+        .distinct()
+    )
+    corrected, after = 0, ""
+    while True:
+        batch = list(keys.filter(match_key__gt=after)[:batch_size])
+        # The last batch also removes the counters past the last album.
+        upto = batch[-1] if len(batch) == batch_size else None
+        with transaction.atomic():
+            corrected += reconcile_batch(after, upto)
+        if upto is None:
+            return corrected
+        after = upto
@@ -0,0 +1,117 @@
+"""Delivery of the album events to the broker of every process.
+
+Albums are written by the Gunicorn workers and the job worker, while the
+streams are served by the ASGI processes, so the events have to cross
+processes. LIVE_EVENTS_BACKEND names the backend doing it.
+"""
+
+import functools
+import logging
+import select
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.module_loading import import_string
+
+from .broker import AlbumEvent, broker
+
+logger = logging.getLogger(__name__)
+
+
+@functools.cache
+def get_backend():
+    return import_string(settings.LIVE_EVENTS_BACKEND)()
+
+
+class LocalBackend:
+    """Delivers the events to the streams of the writing process only.
+
+    Enough when one process both writes and streams, as in development.
+    """
+
+    def publish(self, events):
+        def deliver():
+            for event in events:
+                broker.publish(event)
+
+        transaction.on_commit(deliver)
+
+    def listen(self):
+        pass
+
+
+class PostgresBackend:
+    """Sends the events through PostgreSQL's LISTEN/NOTIFY.
+
+    A NOTIFY is part of the transaction of the write, so its event is delivered
+    once the write commits, and never when it rolls back. Every process serving
+    streams listens on one connection of its own, in a thread handing the
+    notifications to the broker. Events notified while that connection is down
+    are lost, so after reconnecting every stream is told to resync.
+    """
+
+    channel = "albumz_album_events"
+    # Seconds between checks of the listening connection, and before reconnecting.
+    poll_timeout = 5
+    reconnect_delay = 1
+
+    def __init__(self):
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, events):
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+                [self.channel, [event.to_json() for event in events]],
+            )
+
+    def listen(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self.run, name="album-events-listener", daemon=True
+                )
+                self._listener.start()
+
+    def run(self):
+        connected = False
+        while True:
+            try:
+                with self.connect() as connection:
+                    if connected:
+                        broker.resync()
+                    connected = True
+                    self.receive(connection)
+            except Exception:
+                logger.exception("Listening for album events failed, reconnecting.")
+            time.sleep(self.reconnect_delay)
+
+    @contextmanager
+    def connect(self):
+        # A connection of its own: Django's connections belong to one thread
+        # and are closed at the end of every request.
+        database = connections[DEFAULT_DB_ALIAS]
+        connection = database.get_new_connection(database.get_connection_params())
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+            yield connection
+        finally:
+            connection.close()
+
+    def receive(self, connection):
+        while True:
+            readable, _, _ = select.select([connection], [], [], self.poll_timeout)
+            if not readable:
+                # Raises once the server is gone.
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            connection.poll()
+            while connection.notifies:
+                notify = connection.notifies.pop(0)
+                broker.publish(AlbumEvent.from_json(notify.payload))
@@ -0,0 +1,133 @@
+"""Live album events, pushed to the open streams of their user.
+
+The domain `User` write methods send signals (see `receivers`), which publish
+an `AlbumEvent` through the configured backend; the backend delivers it to the
+broker of every process serving streams (see `backends`), and the broker hands
+it to the streams of the user.
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from enum import StrEnum
+
+
+class AlbumEventType(StrEnum):
+    CREATED = "created"
+    UPDATED = "updated"
+    MOVED = "moved"
+    DELETED = "deleted"
+
+
+@dataclass(frozen=True)
+class AlbumEvent:
+    """A change of an album, numbered by the change sequence of its user.
+
+    The number is the `sync_seq` of the album (or the `seq` of its tombstone),
+    so a client catches up on missed events through the changes feed.
+    """
+
+    user_id: int
+    type: AlbumEventType
+    album_id: int
+    seq: int
+    owned: bool | None = None
+
+    def to_json(self):
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, payload):
+        return cls(**json.loads(payload))
+
+    def to_sse(self):
+        data = {"album": self.album_id, "seq": self.seq}
+        if self.owned is not None:
+            data["owned"] = self.owned
+        return f"id: {self.seq}\nevent: album.{self.type}\ndata: {json.dumps(data)}\n\n"
+
+
+# Queued instead of the events a stream could not keep up with.
+RESYNC = object()
+
+
+class Subscription:
+    """The events of a user waiting to be sent to one stream.
+
+    At most `max_size` events are queued. When a client reads slower than its
+    albums change, the queue fills up: its events are dropped and the stream
+    gets `RESYNC` instead, telling the client to catch up through the changes
+    feed. A slow client so never holds more than `max_size` events in memory.
+    """
+
+    def __init__(self, user_id, max_size):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_size)
+        self.overflowed = False
+
+    def put(self, event):
+        # Runs on the event loop of the stream.
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.resync()
+
+    def resync(self):
+        self.overflowed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout):
+        """The next event (or `RESYNC`), None after `timeout` seconds without."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class Broker:
+    """Fans the events out to the streams of this process."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, user_id, max_size):
+        """Subscribes to the events of a user, from the event loop of a stream."""
+        subscription = Subscription(user_id, max_size)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions[user_id].discard(subscription)
+                if not self._subscriptions[user_id]:
+                    del self._subscriptions[user_id]
+
+    def subscriptions(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                return [s for subs in self._subscriptions.values() for s in subs]
+            return list(self._subscriptions.get(user_id, ()))
+
+    def publish(self, event):
+        """Hands the event to the streams of its user, from any thread."""
+        for subscription in self.subscriptions(event.user_id):
+            subscription.loop.call_soon_threadsafe(subscription.put, event)
+
+    def resync(self):
+        """Tells every stream to resync, after events may have been lost."""
+        for subscription in self.subscriptions():
+            subscription.loop.call_soon_threadsafe(subscription.resync)
+
+
+broker = Broker()
@@ -0,0 +1,47 @@
+from django.dispatch import receiver
+
+from ..domain import events
+from ..domain.models import User
+from ..sync.models import AlbumTombstone
+from .backends import get_backend
+from .broker import AlbumEvent, AlbumEventType
+
+
+def publish(user, event_type, album):
+    event = AlbumEvent(
+        user_id=user.pk,
+        type=event_type,
+        album_id=album.pk,
+        seq=album.sync_seq,
+        owned=album.owned,
+    )
+    get_backend().publish([event])
+
+
+@receiver(events.album_added, sender=User)
+def publish_added_album(sender, user, album, **kwargs):
+    publish(user, AlbumEventType.CREATED, album)
+
+
+@receiver(events.album_edited, sender=User)
+def publish_edited_album(sender, user, album, **kwargs):
+    publish(user, AlbumEventType.UPDATED, album)
+
+
+@receiver(events.album_moved_to_collection, sender=User)
+def publish_moved_album(sender, user, album, **kwargs):
+    publish(user, AlbumEventType.MOVED, album)
+
+
+@receiver(events.albums_deleted, sender=User)
+def publish_deleted_albums(sender, user, album_ids, **kwargs):
+    # The tombstones number the deletes, and tell which albums were deleted.
+    tombstones = AlbumTombstone.objects.filter(user=user, album_id__in=album_ids)
+    deleted = [
+        AlbumEvent(
+            user_id=user.pk, type=AlbumEventType.DELETED, album_id=album_id, seq=seq
+        )
+        for album_id, seq in tombstones.order_by("seq").values_list("album_id", "seq")
+    ]
+    if deleted:
+        get_backend().publish(deleted)
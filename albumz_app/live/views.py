@@ -0,0 +1,67 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from ..domain.models import User
+from .backends import get_backend
+from .broker import RESYNC, broker
+
+# Milliseconds a browser waits before reconnecting a closed stream.
+RECONNECT_DELAY_MS = 3000
+
+
+@sync_to_async
+def release_connections():
+    # An idle stream must not keep the database connection of its request.
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+async def album_event_stream(user_id):
+    await release_connections()
+    get_backend().listen()
+    loop = asyncio.get_running_loop()
+    closes_at = loop.time() + settings.LIVE_STREAM_MAX_SECONDS
+    with broker.subscribe(user_id, settings.LIVE_QUEUE_SIZE) as subscription:
+        yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+        while (remaining := closes_at - loop.time()) > 0:
+            event = await subscription.get(
+                min(settings.LIVE_KEEPALIVE_SECONDS, remaining)
+            )
+            if event is None:
+                # Keeps proxies from closing the idle connection.
+                yield ": keepalive\n\n"
+            elif event is RESYNC:
+                yield "event: resync\ndata: {}\n\n"
+                return
+            else:
+                yield event.to_sse()
+
+
+@require_GET
+async def album_events_view(request):
+    """Server-sent events of the album changes of the signed-in user.
+
+    Streams end after LIVE_STREAM_MAX_SECONDS, browsers then reconnect and so
+    check the session again. After a `resync` event, and after reconnecting,
+    clients catch up through the changes feed of the API.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the response would be buffered until the stream ends,
+        # holding on to a worker meanwhile.
+        return HttpResponse(status=501)
+    auth_user = await request.auser()
+    if not auth_user.is_authenticated:
+        return HttpResponse(status=401)
+    user = await User.objects.aget(auth_user=auth_user)
+    response = StreamingHttpResponse(
+        album_event_stream(user.pk), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    return response
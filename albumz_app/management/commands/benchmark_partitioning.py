@@ -0,0 +1,150 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+PLAIN_TABLE = "bench_album_plain"
+PARTITIONED_TABLE = "bench_album_hash"
+
+COLUMNS = """
+    "id" bigint NOT NULL,
+    "user_id" bigint NOT NULL,
+    "title" varchar(250) NOT NULL,
+    "genre" varchar(30) NOT NULL,
+    "user_rating" integer NOT NULL,
+    "owned" boolean NOT NULL,
+    "pub_date" date NULL,
+    "add_date" date NOT NULL
+"""
+
+FILL = """
+    INSERT INTO "{table}"
+    SELECT g, 1 + (random() * (%(users)s - 1))::bigint, md5(g::text),
+           (ARRAY['ROCK', 'POP', 'JAZZ', 'HIPHOP', 'OTHER'])[1 + g %% 5],
+           g %% 7, g %% 3 > 0, DATE '1950-01-01' + (g %% 27000),
+           DATE '2020-01-01' + (g %% 2000)
+    FROM generate_series(1, %(rows)s) AS g
+"""
+
+INDEXES = [
+    '("user_id", "owned", "genre")',
+    '("user_id", "pub_date")',
+    '("user_id", "title")',
+]
+
+QUERIES = {
+    "page": 'SELECT * FROM "{table}" WHERE "user_id" = %s AND "owned" '
+    'ORDER BY "title" LIMIT 10',
+    "count": 'SELECT count(*) FROM "{table}" WHERE "user_id" = %s',
+    "average_rating": 'SELECT avg("user_rating") FROM "{table}" '
+    'WHERE "user_id" = %s AND "genre" = \'ROCK\' AND "user_rating" > 0',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares per-user album queries on a plain and on a hash partitioned "
+        "table filled with synthetic rows. PostgreSQL only; the benchmark "
+        "tables are dropped afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000_000)
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--partitions", type=int, default=16)
+        parser.add_argument(
+            "--queries", type=int, default=500, help="Timed queries per kind."
+        )
+        parser.add_argument("--keep", action="store_true")
+
+    def execute_sql(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else None
+
+    def create_tables(self, options):
+        self.execute_sql(f'CREATE TABLE "{PLAIN_TABLE}" ({COLUMNS})')
+        self.execute_sql(f'ALTER TABLE "{PLAIN_TABLE}" ADD PRIMARY KEY ("id")')
+        self.execute_sql(
+            f'CREATE TABLE "{PARTITIONED_TABLE}" ({COLUMNS}) '
+            f'PARTITION BY HASH ("user_id")'
+        )
+        self.execute_sql(
+            f'ALTER TABLE "{PARTITIONED_TABLE}" ADD PRIMARY KEY ("id", "user_id")'
+        )
+        for remainder in range(options["partitions"]):
+            self.execute_sql(
+                f'CREATE TABLE "{PARTITIONED_TABLE}_p{remainder}" '
+                f'PARTITION OF "{PARTITIONED_TABLE}" FOR VALUES '
+                f'WITH (MODULUS {options["partitions"]}, REMAINDER {remainder})'
+            )
+        for table in (PLAIN_TABLE, PARTITIONED_TABLE):
+            started = time.perf_counter()
+            self.execute_sql(
+                FILL.format(table=table),
+                {"rows": options["rows"], "users": options["users"]},
+            )
+            for number, columns in enumerate(INDEXES):
+                self.execute_sql(
+                    f'CREATE INDEX "{table}_idx{number}" ON "{table}" {columns}'
+                )
+            self.execute_sql(f'VACUUM ANALYZE "{table}"')
+            self.stdout.write(
+                f"{table}: filled and indexed in "
+                f"{time.perf_counter() - started:.1f}s, "
+                f"largest index {self.largest_index(table)}"
+            )
+
+    def largest_index(self, table):
+        return self.execute_sql(
+            "SELECT pg_size_pretty(max(pg_relation_size(indexrelid))) "
+            "FROM pg_index WHERE indrelid IN ("
+            "  SELECT %s::regclass UNION "
+            "  SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass"
+            ")",
+            [table, table],
+        )[0][0]
+
+    def scanned_partitions(self, sql, user_id):
+        plan = self.execute_sql(f"EXPLAIN {sql}", [user_id])
+        return sum(f"{PARTITIONED_TABLE}_p" in line for (line,) in plan)
+
+    def time_queries(self, table, options):
+        user_ids = [
+            random.randint(1, options["users"]) for _ in range(options["queries"])
+        ]
+        for name, sql in QUERIES.items():
+            sql = sql.format(table=table)
+            durations = []
+            for user_id in user_ids:
+                started = time.perf_counter()
+                self.execute_sql(sql, [user_id])
+                durations.append((time.perf_counter() - started) * 1000)
+            quantiles = statistics.quantiles(durations, n=100)
+            line = (
+                f"  {name:<15} p50 {quantiles[49]:7.2f}ms  "
+                f"p95 {quantiles[94]:7.2f}ms  p99 {quantiles[98]:7.2f}ms"
+            )
+            if table == PARTITIONED_TABLE:
+                partitions = self.scanned_partitions(sql, user_ids[0])
+                line += f"  ({partitions} partition(s) scanned)"
+            self.stdout.write(line)
+
+    def drop_tables(self):
+        for table in (PLAIN_TABLE, PARTITIONED_TABLE):
+            self.execute_sql(f'DROP TABLE IF EXISTS "{table}" CASCADE')
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The benchmark needs PostgreSQL.")
+        self.drop_tables()
+        try:
+            self.create_tables(options)
+            for table in (PLAIN_TABLE, PARTITIONED_TABLE):
+                self.stdout.write(f"{table}:")
+                self.time_queries(table, options)
+        finally:
+            if not options["keep"]:
+                self.drop_tables()
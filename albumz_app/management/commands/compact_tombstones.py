@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...sync.changes import compact_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the tombstones of albums deleted before the retention window. "
+        "Clients that last synced before it have to sync all albums again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help="Tombstones younger than this many days are kept.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Tombstones deleted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = compact_tombstones(
+            retention_days=options["days"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(f"{deleted} tombstones deleted.")
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importers.importer import AlbumImporter, start_import
+from ...importers.models import ImportRun
+from ...jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = "Imports albums from a CSV or JSON (array or JSON Lines) catalog export."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", nargs="?")
+        parser.add_argument("path", nargs="?")
+        parser.add_argument("--format", choices=["csv", "json"])
+        parser.add_argument(
+            "--wishlist",
+            action="store_true",
+            help="Put albums without an ownership column on the wishlist.",
+        )
+        parser.add_argument("--chunk-size", type=int)
+        parser.add_argument(
+            "--resume",
+            type=int,
+            metavar="IMPORT_RUN_ID",
+            help="Continue an interrupted import after its last committed chunk.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the import for the job worker instead of running it here.",
+        )
+
+    def get_run(self, options):
+        if options["resume"]:
+            try:
+                return ImportRun.objects.get(pk=options["resume"])
+            except ImportRun.DoesNotExist:
+                raise CommandError(f"Import run {options['resume']} does not exist.")
+        if not options["username"] or not options["path"]:
+            raise CommandError("Both username and path are required.")
+        try:
+            auth_user = get_user_model().objects.get(username=options["username"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist.")
+        return start_import(
+            auth_user.albumz_user,
+            options["path"],
+            file_format=options["format"],
+            default_owned=not options["wishlist"],
+        )
+
+    def report_progress(self, run):
+        self.stdout.write(f"{run.records_processed} records processed", ending="\r")
+        self.stdout.flush()
+
+    def handle(self, *args, **options):
+        run = self.get_run(options)
+        if options["background"]:
+            job = enqueue(
+                "albums.import", user=run.user, payload={"import_run_id": run.pk}
+            )
+            self.stdout.write(f"Import run {run.pk} queued as job {job.pk}.")
+            return
+        self.stdout.write(f"Import run {run.pk} of {run.source}.")
+        importer = AlbumImporter(
+            run, chunk_size=options["chunk_size"], progress=self.report_progress
+        )
+        summary = importer.import_all()
+        self.stdout.write("")
+        for key, value in summary.items():
+            self.stdout.write(f"{key.replace('_', ' ').capitalize()}: {value}")
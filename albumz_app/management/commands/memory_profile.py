@@ -0,0 +1,88 @@
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from ...observability.memory import rss_bytes, take_snapshot, top_allocations
+
+
+def megabytes(size):
+    return f"{size / 2**20:.2f} MiB"
+
+
+def request_host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host not in ("*", "")]
+    return hosts[0].lstrip(".") if hosts else "localhost"
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests a URL repeatedly in this process while tracing allocations, "
+        "and reports the peak memory per request and the call sites in "
+        "albumz_app whose memory grew. The requests go through the Django test "
+        "client of this new process, not through a Gunicorn worker: run it in "
+        "the web container to replay a view on the production data, and use "
+        "the /memory endpoint to trace the running workers themselves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="URL path, e.g. /albumz/collection/.")
+        parser.add_argument("--user", help="Username the requests are made as.")
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument(
+            "--limit", type=int, default=10, help="Number of call sites listed."
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="List call sites outside of albumz_app too.",
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=request_host())
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(username=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user {options['user']}.")
+            client.force_login(user)
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(settings.MEMORY_TRACING_FRAMES)
+        try:
+            # Warms up caches, lazy imports and the URL resolver.
+            self.request(client, options["path"])
+            before = take_snapshot()
+            current_before, _ = tracemalloc.get_traced_memory()
+            peaks = []
+            for _ in range(options["requests"]):
+                tracemalloc.reset_peak()
+                start, _ = tracemalloc.get_traced_memory()
+                self.request(client, options["path"])
+                peaks.append(tracemalloc.get_traced_memory()[1] - start)
+            after = take_snapshot()
+            current_after, _ = tracemalloc.get_traced_memory()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        self.stdout.write(
+            f"{options['requests']} requests: peak per request "
+            f"{megabytes(max(peaks, default=0))} max, "
+            f"{megabytes(sum(peaks) / max(len(peaks), 1))} average; "
+            f"retained {megabytes(current_after - current_before)}; "
+            f"RSS {megabytes(rss_bytes() or 0)}"
+        )
+        for site in top_allocations(
+            before, after, options["limit"], app_only=not options["all"]
+        ):
+            self.stdout.write(
+                f"{site['site']}: {site['size_diff']:+,} B "
+                f"({site['count_diff']:+,} blocks, {site['size']:,} B in total)"
+            )
+
+    def request(self, client, path):
+        response = client.get(path)
+        if response.status_code >= 400:
+            raise CommandError(f"{path} responded with {response.status_code}.")
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ...partitioning import AlbumPartitioner
+
+
+class Command(BaseCommand):
+    help = (
+        "Converts the album table into a hash partitioned table (by user) "
+        "while the application keeps running. PostgreSQL only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=settings.ALBUM_PARTITIONS,
+            help="Number of hash partitions.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50_000,
+            help="Rows copied per transaction.",
+        )
+        parser.add_argument(
+            "--step",
+            choices=["prepare", "copy", "swap", "all"],
+            default="all",
+            help="Run a single step of the conversion, e.g. to swap off-peak.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning is only supported on PostgreSQL.")
+        if options["partitions"] < 2:
+            raise CommandError("At least 2 partitions are required.")
+        partitioner = AlbumPartitioner(
+            connection,
+            options["partitions"],
+            batch_size=options["batch_size"],
+            log=self.stdout.write,
+        )
+        if options["step"] == "all":
+            partitioner.run()
+        else:
+            getattr(partitioner, options["step"])()
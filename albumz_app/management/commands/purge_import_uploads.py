@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...importers.importer import purge_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the uploaded import files left behind by imports whose worker "
+        "died, once they are older than the retention window."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.IMPORT_UPLOAD_RETENTION_DAYS,
+            help="Uploads younger than this many days are kept.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_uploads(retention_days=options["days"])
+        self.stdout.write(f"{deleted} uploads deleted.")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from ...domain.models import Album
+
+BATCH_SIZE = 1000
+
+
+def rebuild_match_keys(albums):
+    """Recomputes the stored match keys, e.g. after changing normalization rules."""
+    updated = 0
+    batch = []
+    albums = albums.only(
+        "id", "title", "artist_spelling", "artist_ref__name", "match_key"
+    )
+    for album in albums.iterator(chunk_size=BATCH_SIZE):
+        match_key = album.compute_match_key()
+        if album.match_key != match_key:
+            album.match_key = match_key
+            batch.append(album)
+        if len(batch) == BATCH_SIZE:
+            updated += Album.albums.bulk_update(batch, ["match_key"])
+            batch = []
+    return updated + Album.albums.bulk_update(batch, ["match_key"])
+
+
+class Command(BaseCommand):
+    help = "Recomputes the normalized artist/title keys used to detect duplicates."
+
+    def handle(self, *args, **options):
+        updated = rebuild_match_keys(Album.albums.all())
+        self.stdout.write(f"{updated} match keys updated.")
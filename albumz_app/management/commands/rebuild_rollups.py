@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from ...analytics.rebuild import BATCH_SIZE, rebuild_rollups
+from ...domain.models import User
+
+
+class Command(BaseCommand):
+    help = "Recomputes the monthly rollups of the analytics dashboard from the albums."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", help="Username of the only user to rebuild the rollups of."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Users rebuilt per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["user"]:
+            users = users.filter(auth_user__username=options["user"])
+        written = rebuild_rollups(users, batch_size=options["batch_size"])
+        self.stdout.write(f"{written} rollup rows written.")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from ...leaderboards.reconcile import BATCH_SIZE, reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the album popularity counters of the leaderboards from the "
+        "albums, correcting counters that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Albums (match keys) reconciled per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        corrected = reconcile(batch_size=options["batch_size"])
+        self.stdout.write(f"{corrected} popularity counters corrected.")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from ...recommendations.engine import full_refresh, incremental_refresh
+
+
+class Command(BaseCommand):
+    help = (
+        "Refreshes the album recommendations of the users whose albums changed "
+        "since their last refresh, or of all users with --full, which also "
+        "recomputes the similarities of all albums."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute the album similarities from all collections.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Processes computing the similarities (default: number of CPUs).",
+        )
+
+    def handle(self, *args, **options):
+        if options["full"]:
+            refreshed = full_refresh(processes=options["processes"])
+        else:
+            refreshed = incremental_refresh()
+        self.stdout.write(f"Refreshed the recommendations of {refreshed} users.")
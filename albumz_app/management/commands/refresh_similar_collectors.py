@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from ...recommendations.collectors import refresh_similar_collectors
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the collectors with the most similar rating profiles of all "
+        "users."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Processes computing the similarities (default: number of CPUs).",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_similar_collectors(processes=options["processes"])
+        self.stdout.write(f"Found the similar collectors of {refreshed} users.")
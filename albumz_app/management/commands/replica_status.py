@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...replicas import measure_lag
+
+
+class Command(BaseCommand):
+    help = "Reports the replication lag of the read replicas."
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            self.stdout.write("No read replicas configured.")
+        for alias in settings.DATABASE_REPLICAS:
+            lag = measure_lag(alias)
+            if lag is None:
+                status = "lag unknown"
+            elif lag > settings.REPLICA_MAX_LAG:
+                status = self.style.WARNING(f"{lag:.1f}s behind, not used")
+            else:
+                status = self.style.SUCCESS(f"{lag:.1f}s behind")
+            self.stdout.write(f"{alias}: {status}")
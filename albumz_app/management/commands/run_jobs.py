@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from ...jobs.queue import Worker
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs (imports, exports, bulk deletes...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=2, help="Number of jobs run at once."
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default="thread",
+            help="Run jobs in a thread pool or in a process pool.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds between polls of the job table.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no due jobs are left instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options["concurrency"],
+            pool=options["pool"],
+            poll_interval=options["poll_interval"],
+        )
+        self.stdout.write(
+            f"Worker {worker.worker_id} started "
+            f"({options['concurrency']} {options['pool']}s)."
+        )
+        worker.run(once=options["once"])
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...observability.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = "Summarizes the logged slow queries, the most total time first."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top", type=int, default=10, help="Number of statements listed."
+        )
+        parser.add_argument(
+            "--days", type=int, default=7, help="Only queries of the last N days."
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Delete the queries older than --days instead.",
+        )
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"])
+        if options["purge"]:
+            deleted, _ = SlowQuery.objects.filter(created_at__lt=since).delete()
+            self.stdout.write(f"Deleted {deleted} slow queries.")
+            return
+        offenders = SlowQuery.objects.filter(created_at__gte=since).top_offenders()
+        for offender in offenders[: options["top"]]:
+            latest = (
+                SlowQuery.objects.filter(fingerprint=offender["fingerprint"])
+                .exclude(plan="")
+                .order_by("-created_at")
+                .first()
+            )
+            self.stdout.write(
+                f"{offender['total_ms']:.0f}ms total, {offender['count']} times, "
+                f"{offender['total_ms'] / offender['count']:.0f}ms average, "
+                f"{offender['max_ms']:.0f}ms max"
+            )
+            self.stdout.write(f"  {offender['sql']}")
+            if latest:
+                for line in latest.plan.splitlines():
+                    self.stdout.write(f"    {line}")
+        if not offenders:
+            self.stdout.write("No slow queries logged.")
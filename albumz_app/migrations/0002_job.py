@@ -0,0 +1,97 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:37
+
+import django.db.models.deletion
+import django.db.models.manager
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="album",
+            managers=[
+                ("albums", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="album",
+            name="user_rating",
+            field=models.IntegerField(
+                choices=[
+                    (0, "No Opinion Yet"),
+                    (1, "Terrible"),
+                    (2, "Bad"),
+                    (3, "Average"),
+                    (4, "Good"),
+                    (5, "Excellent"),
+                    (6, "Best"),
+                ],
+                default=0,
+                verbose_name="Rating given by the owner of the album.",
+            ),
+        ),
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("QUEUED", "Queued"),
+                            ("RUNNING", "Running"),
+                            ("SUCCEEDED", "Succeeded"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="QUEUED",
+                        max_length=10,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("max_attempts", models.PositiveIntegerField(default=3)),
+                ("run_after", models.DateTimeField(default=django.utils.timezone.now)),
+                ("progress_done", models.PositiveIntegerField(default=0)),
+                ("progress_total", models.PositiveIntegerField(blank=True, null=True)),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("locked_by", models.CharField(blank=True, max_length=100)),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="jobs",
+                        to="albumz_app.user",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"],
+                        name="albumz_app__status_4d57cc_idx",
+                    )
+                ],
+            },
+        ),
+    ]
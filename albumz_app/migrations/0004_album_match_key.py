@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+from albumz_app.domain.normalization import album_match_key
+
+BATCH_SIZE = 1000
+
+
+def backfill_match_keys(apps, schema_editor):
+    Album = apps.get_model("albumz_app", "Album")
+    batch = []
+    for album in Album._default_manager.only("id", "title", "artist").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        album.match_key = album_match_key(album.title, album.artist)
+        batch.append(album)
+        if len(batch) == BATCH_SIZE:
+            Album._default_manager.bulk_update(batch, ["match_key"])
+            batch = []
+    Album._default_manager.bulk_update(batch, ["match_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0003_importrun"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="album",
+            name="match_key",
+            field=models.CharField(
+                default="",
+                editable=False,
+                max_length=360,
+                verbose_name="Normalized artist and title, used to detect duplicates.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_match_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(
+                fields=["user", "match_key"], name="album_user_match_key_idx"
+            ),
+        ),
+    ]
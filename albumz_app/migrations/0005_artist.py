@@ -0,0 +1,159 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+from albumz_app.domain.normalization import normalize_text
+
+BATCH_SIZE = 1000
+
+
+def link_artists(apps, schema_editor):
+    """Creates an artist per normalized name and links the albums to it.
+
+    Normalization happens in Python, so only the distinct spellings are read;
+    the albums are then linked by a single update joined on the spellings,
+    and keep their spelling only where it differs from the artist's name.
+    """
+    Album = apps.get_model("albumz_app", "Album")
+    Artist = apps.get_model("albumz_app", "Artist")
+    ArtistSpelling = apps.get_model("albumz_app", "ArtistSpelling")
+    names = Album._default_manager.values_list("artist", flat=True).distinct()
+    spellings_by_key = {}
+    for name in names.order_by("artist").iterator(chunk_size=BATCH_SIZE):
+        spellings_by_key.setdefault(normalize_text(name), []).append(name)
+    Artist._default_manager.bulk_create(
+        [
+            Artist(name=spellings[0], match_key=key)
+            for key, spellings in spellings_by_key.items()
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    ArtistSpelling._default_manager.bulk_create(
+        (
+            ArtistSpelling(name=name, artist_id=artist_id)
+            for key, artist_id in Artist._default_manager.values_list(
+                "match_key", "pk"
+            ).iterator(chunk_size=BATCH_SIZE)
+            for name in spellings_by_key[key]
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Album._default_manager.update(
+        artist_ref=models.Subquery(
+            ArtistSpelling._default_manager.filter(
+                name=models.OuterRef("artist")
+            ).values("artist_id")[:1]
+        )
+    )
+    Album._default_manager.filter(
+        models.Exists(
+            Artist._default_manager.filter(
+                pk=models.OuterRef("artist_ref"), name=models.OuterRef("artist")
+            )
+        )
+    ).update(artist="")
+
+
+def unlink_artists(apps, schema_editor):
+    Album = apps.get_model("albumz_app", "Album")
+    Artist = apps.get_model("albumz_app", "Artist")
+    Album._default_manager.filter(artist="").update(
+        artist=models.Subquery(
+            Artist._default_manager.filter(pk=models.OuterRef("artist_ref")).values(
+                "name"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0004_album_match_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Artist",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "match_key",
+                    models.CharField(editable=False, max_length=255, unique=True),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="album",
+            name="artist_ref",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="albums",
+                to="albumz_app.artist",
+                verbose_name="artist",
+            ),
+        ),
+        # Spellings of the artists, only used to link the albums in one update.
+        migrations.CreateModel(
+            name="ArtistSpelling",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("artist_id", models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(link_artists, unlink_artists),
+        migrations.DeleteModel(
+            name="ArtistSpelling",
+        ),
+        migrations.RenameField(
+            model_name="album",
+            old_name="artist",
+            new_name="artist_spelling",
+        ),
+        migrations.AlterField(
+            model_name="album",
+            name="artist_spelling",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=100,
+                verbose_name=(
+                    "Spelling of the artist by the owner, if not the artist's name."
+                ),
+            ),
+        ),
+        migrations.AlterField(
+            model_name="album",
+            name="artist_ref",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="albums",
+                to="albumz_app.artist",
+                verbose_name="artist",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(
+                fields=["user", "artist_ref"], name="album_user_artist_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0005_artist"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(
+                fields=["user", "owned", "genre"], name="album_user_owned_genre_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(
+                fields=["user", "pub_date"], name="album_user_pub_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Prefix (istartswith) lookups can only use an index that sorts like the
+# lookup compares: on PostgreSQL an UPPER() expression index with the pattern
+# operator class, on SQLite an index with the NOCASE collation.
+INDEXES = {
+    "postgresql": [
+        'CREATE INDEX "album_user_title_prefix_idx" ON "albumz_app_album" '
+        '("user_id", UPPER("title"::text) varchar_pattern_ops)',
+        'CREATE INDEX "artist_name_prefix_idx" ON "albumz_app_artist" '
+        '(UPPER("name"::text) varchar_pattern_ops)',
+        'CREATE INDEX "album_user_artist_prefix_idx" ON "albumz_app_album" '
+        '("user_id", UPPER("artist_spelling"::text) varchar_pattern_ops)',
+    ],
+    "sqlite": [
+        'CREATE INDEX "album_user_title_prefix_idx" ON "albumz_app_album" '
+        '("user_id", "title" COLLATE NOCASE)',
+        'CREATE INDEX "artist_name_prefix_idx" ON "albumz_app_artist" '
+        '("name" COLLATE NOCASE)',
+        'CREATE INDEX "album_user_artist_prefix_idx" ON "albumz_app_album" '
+        '("user_id", "artist_spelling" COLLATE NOCASE)',
+    ],
+}
+
+
+def create_prefix_indexes(apps, schema_editor):
+    for statement in INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS "album_user_title_prefix_idx"')
+        schema_editor.execute('DROP INDEX IF EXISTS "artist_name_prefix_idx"')
+        schema_editor.execute('DROP INDEX IF EXISTS "album_user_artist_prefix_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0006_album_facet_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from albumz_app.domain.search import album_grams
+
+BATCH_SIZE = 1000
+
+TRIGRAM_INDEXES = [
+    'CREATE INDEX "album_title_trgm_idx" ON "albumz_app_album" '
+    'USING gin ("title" gin_trgm_ops)',
+    'CREATE INDEX "artist_name_trgm_idx" ON "albumz_app_artist" '
+    'USING gin ("name" gin_trgm_ops)',
+    'CREATE INDEX "album_artist_spelling_trgm_idx" ON "albumz_app_album" '
+    'USING gin ("artist_spelling" gin_trgm_ops)',
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for statement in TRIGRAM_INDEXES:
+            schema_editor.execute(statement)
+        return
+    Album = apps.get_model("albumz_app", "Album")
+    AlbumSearchGram = apps.get_model("albumz_app", "AlbumSearchGram")
+    albums = Album._default_manager.values_list(
+        "id", "user_id", "title", "artist_spelling", "artist_ref__name"
+    )
+    batch = []
+    for album_id, user_id, title, spelling, name in albums.iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        batch.extend(
+            AlbumSearchGram(user_id=user_id, album_id=album_id, gram=gram)
+            for gram in album_grams(title, spelling or name)
+        )
+        if len(batch) >= BATCH_SIZE:
+            AlbumSearchGram._default_manager.bulk_create(batch)
+            batch = []
+    AlbumSearchGram._default_manager.bulk_create(batch)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute('DROP INDEX "album_title_trgm_idx"')
+        schema_editor.execute('DROP INDEX "artist_name_trgm_idx"')
+        schema_editor.execute('DROP INDEX "album_artist_spelling_trgm_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0007_album_prefix_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlbumSearchGram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("gram", models.CharField(max_length=3)),
+                (
+                    "album",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_grams",
+                        to="albumz_app.album",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="albumz_app.user",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "gram"], name="search_gram_user_gram_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
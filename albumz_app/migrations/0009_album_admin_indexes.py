@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+# Admin searches match title and artist spelling prefixes across all users,
+# see 0007 for the per-user variants used by autocomplete.
+INDEXES = {
+    "postgresql": [
+        'CREATE INDEX "album_title_prefix_idx" ON "albumz_app_album" '
+        '(UPPER("title"::text) varchar_pattern_ops)',
+        'CREATE INDEX "album_artist_spelling_prefix_idx" ON "albumz_app_album" '
+        '(UPPER("artist_spelling"::text) varchar_pattern_ops)',
+    ],
+    "sqlite": [
+        'CREATE INDEX "album_title_prefix_idx" ON "albumz_app_album" '
+        '("title" COLLATE NOCASE)',
+        'CREATE INDEX "album_artist_spelling_prefix_idx" ON "albumz_app_album" '
+        '("artist_spelling" COLLATE NOCASE)',
+    ],
+}
+
+
+def create_title_prefix_index(apps, schema_editor):
+    for statement in INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_title_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor in INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS "album_title_prefix_idx"')
+        schema_editor.execute('DROP INDEX IF EXISTS "album_artist_spelling_prefix_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0008_album_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(fields=["add_date"], name="album_add_date_idx"),
+        ),
+        migrations.RunPython(create_title_prefix_index, drop_title_prefix_index),
+    ]
@@ -0,0 +1,12 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Partitioning the album table used to run here. It copies every album, so
+    # it is only run explicitly now, by `manage.py partition_albums`.
+
+    dependencies = [
+        ("albumz_app", "0009_album_admin_indexes"),
+    ]
+
+    operations = []
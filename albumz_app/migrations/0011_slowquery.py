@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0010_album_partitioning"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=40)),
+                ("sql", models.TextField()),
+                ("params", models.TextField(blank=True)),
+                ("duration_ms", models.FloatField()),
+                ("database", models.CharField(max_length=100)),
+                ("view", models.CharField(blank=True, max_length=200)),
+                ("user_id", models.PositiveIntegerField(blank=True, null=True)),
+                ("plan", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "verbose_name_plural": "slow queries",
+                "indexes": [
+                    models.Index(
+                        fields=["fingerprint", "created_at"],
+                        name="slowquery_fingerprint_idx",
+                    )
+                ],
+            },
+        ),
+    ]
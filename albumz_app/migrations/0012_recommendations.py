@@ -0,0 +1,91 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0011_slowquery"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Recommendation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("match_key", models.CharField(max_length=360)),
+                ("title", models.CharField(max_length=250)),
+                ("artist", models.CharField(max_length=100)),
+                ("score", models.FloatField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="RecommendationStatus",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="recommendation_status",
+                        serialize=False,
+                        to="albumz_app.user",
+                    ),
+                ),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("refreshed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SimilarAlbum",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("album_key", models.CharField(max_length=360)),
+                ("similar_key", models.CharField(max_length=360)),
+                ("score", models.FloatField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(fields=["match_key"], name="album_match_key_idx"),
+        ),
+        migrations.AddField(
+            model_name="recommendation",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="recommendations",
+                to="albumz_app.user",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="similaralbum",
+            index=models.Index(fields=["album_key"], name="similar_album_key_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="recommendation",
+            constraint=models.UniqueConstraint(
+                fields=("user", "rank"), name="recommendation_user_rank_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0013_similarcollector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlbumPopularity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=360)),
+                (
+                    "genre",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("ROCK", "Rock"),
+                            ("POP", "Pop"),
+                            ("JAZZ", "Jazz"),
+                            ("HIPHOP", "Hip-Hop"),
+                            ("OTHER", "Other"),
+                        ],
+                        default="",
+                        max_length=30,
+                    ),
+                ),
+                ("title", models.CharField(max_length=250)),
+                ("artist", models.CharField(max_length=100)),
+                ("owners", models.IntegerField(default=0)),
+                ("wishlisters", models.IntegerField(default=0)),
+                ("ratings", models.IntegerField(default=0)),
+                ("rating_sum", models.IntegerField(default=0)),
+                ("average_rating", models.FloatField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "album popularity",
+                "indexes": [
+                    models.Index(
+                        fields=["genre", "-owners", "key"], name="popularity_owners_idx"
+                    ),
+                    models.Index(
+                        fields=["genre", "-wishlisters", "key"],
+                        name="popularity_wishlisters_idx",
+                    ),
+                    models.Index(
+                        fields=["genre", "-average_rating", "key"],
+                        name="popularity_rating_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("key", "genre"), name="popularity_key_genre_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0014_albumpopularity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "month",
+                    models.DateField(
+                        verbose_name="First day of the month the albums were added in."
+                    ),
+                ),
+                (
+                    "genre",
+                    models.CharField(
+                        choices=[
+                            ("ROCK", "Rock"),
+                            ("POP", "Pop"),
+                            ("JAZZ", "Jazz"),
+                            ("HIPHOP", "Hip-Hop"),
+                            ("OTHER", "Other"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "rating",
+                    models.SmallIntegerField(
+                        choices=[
+                            (0, "No Opinion Yet"),
+                            (1, "Terrible"),
+                            (2, "Bad"),
+                            (3, "Average"),
+                            (4, "Good"),
+                            (5, "Excellent"),
+                            (6, "Best"),
+                        ]
+                    ),
+                ),
+                (
+                    "decade",
+                    models.SmallIntegerField(
+                        blank=True,
+                        null=True,
+                        verbose_name="First year of the decade of publication.",
+                    ),
+                ),
+                ("albums", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_rollups",
+                        to="albumz_app.user",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "month"], name="monthly_rollup_user_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("decade__isnull", False)),
+                        fields=("user", "month", "genre", "rating", "decade"),
+                        name="monthly_rollup_uniq",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("decade__isnull", True)),
+                        fields=("user", "month", "genre", "rating"),
+                        name="monthly_rollup_no_decade_uniq",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,136 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# SQLite rebuilds the album table to add a NOT NULL column, which drops the
+# indexes created with raw SQL in 0007 and 0009.
+SQLITE_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS "album_user_title_prefix_idx" '
+    'ON "albumz_app_album" ("user_id", "title" COLLATE NOCASE)',
+    'CREATE INDEX IF NOT EXISTS "album_title_prefix_idx" '
+    'ON "albumz_app_album" ("title" COLLATE NOCASE)',
+    'CREATE INDEX IF NOT EXISTS "album_user_artist_prefix_idx" '
+    'ON "albumz_app_album" ("user_id", "artist_spelling" COLLATE NOCASE)',
+    'CREATE INDEX IF NOT EXISTS "album_artist_spelling_prefix_idx" '
+    'ON "albumz_app_album" ("artist_spelling" COLLATE NOCASE)',
+]
+
+
+def backfill_sync_seqs(apps, schema_editor):
+    """Numbers the existing albums of each user, so that a first sync with a
+    token lists them all."""
+    Album = apps.get_model("albumz_app", "Album")
+    SyncState = apps.get_model("albumz_app", "SyncState")
+    user_ids = (
+        Album._default_manager.order_by("user_id")
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    for user_id in user_ids.iterator():
+        batch, seq = [], 0
+        for album in (
+            Album._default_manager.filter(user_id=user_id)
+            .only("id")
+            .order_by("pk")
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            seq += 1
+            album.sync_seq = seq
+            batch.append(album)
+            if len(batch) == BATCH_SIZE:
+                Album._default_manager.bulk_update(batch, ["sync_seq"])
+                batch = []
+        Album._default_manager.bulk_update(batch, ["sync_seq"])
+        SyncState._default_manager.create(user_id=user_id, last_seq=seq)
+
+
+def restore_sqlite_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SQLITE_INDEXES:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0016_covers"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlbumTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("album_id", models.BigIntegerField()),
+                ("seq", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SyncState",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="sync_state",
+                        serialize=False,
+                        to="albumz_app.user",
+                    ),
+                ),
+                ("last_seq", models.BigIntegerField(default=0)),
+                ("compacted_seq", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="album",
+            name="sync_seq",
+            field=models.BigIntegerField(
+                default=0,
+                editable=False,
+                verbose_name="Number of the last change in the sequence of the user.",
+            ),
+        ),
+        migrations.RunPython(restore_sqlite_indexes, migrations.RunPython.noop),
+        migrations.RunPython(backfill_sync_seqs, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(
+                fields=["user", "sync_seq"], name="album_user_sync_seq_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="albumtombstone",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="albumz_app.user",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="albumtombstone",
+            index=models.Index(
+                fields=["deleted_at"], name="album_tombstone_deleted_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="albumtombstone",
+            constraint=models.UniqueConstraint(
+                fields=("user", "seq"), name="album_tombstone_user_seq_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0017_album_sync"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importrun",
+            name="source_offset",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,35 @@
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations
+
+
+def move_originals(apps, source, target):
+    Cover = apps.get_model("albumz_app", "Cover")
+    for name in Cover.objects.values_list("original", flat=True).iterator():
+        path = Path(source) / name
+        if path.is_file():
+            destination = Path(target) / name
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(path, destination)
+
+
+def move_out_of_media(apps, schema_editor):
+    # The originals used to be stored, and served, under MEDIA_ROOT.
+    move_originals(apps, settings.MEDIA_ROOT, settings.COVER_ORIGINALS_ROOT)
+
+
+def move_into_media(apps, schema_editor):
+    move_originals(apps, settings.COVER_ORIGINALS_ROOT, settings.MEDIA_ROOT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("albumz_app", "0018_importrun_source_offset"),
+    ]
+
+    operations = [
+        migrations.RunPython(move_out_of_media, move_into_media),
+    ]
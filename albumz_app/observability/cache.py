@@ -0,0 +1,50 @@
+"""Cache backends counting hits and misses for the cache hit ratio metric.
+
+`get_many` and `get_or_set` of these backends go through `get`.
+"""
+
+import os
+import tempfile
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .metrics import record_cache_lookups
+
+_MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            record_cache_lookups(hits=0, misses=1)
+            return default
+        record_cache_lookups(hits=1, misses=0)
+        return value
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedFileBasedCache(InstrumentedCacheMixin, FileBasedCache):
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """Unlike `FileBasedCache.add`, atomic across processes (and so usable
+        as a lock): the entry is linked into place, which fails when another
+        process added it first."""
+        # Also removes an expired entry.
+        if self.has_key(key, version):
+            return False
+        self._createdir()
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, "wb") as file:
+                self._write_content(file, timeout, value)
+            os.link(tmp_path, self._key_to_file(key, version))
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp_path)
+        return True
@@ -0,0 +1,123 @@
+"""Memory diagnostics of a worker process with `tracemalloc`.
+
+Tracing slows allocations down noticeably, so it only runs when enabled by
+MEMORY_TRACING or started on demand (see `memory_view`). While it runs, the
+peak memory of every request is recorded as well.
+"""
+
+import os
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+
+from .metrics import REQUEST_PEAK_MEMORY, view_label
+
+APP_DIR = str(Path(__file__).resolve().parent.parent) + os.sep
+
+# Baseline of the next diff taken in this process.
+_last_snapshot = None
+
+
+def start_tracing():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.MEMORY_TRACING_FRAMES)
+
+
+def stop_tracing():
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+
+
+def rss_bytes():
+    """Resident set size of this process, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+    )
+
+
+def call_site(traceback):
+    """The innermost frame of a traceback in albumz_app, else the innermost."""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(APP_DIR):
+            return frame
+    return traceback[-1]
+
+
+def top_allocations(old_snapshot, new_snapshot, limit=10, app_only=True):
+    """Call sites by how much their allocated memory grew between snapshots."""
+    sites = {}
+    for stat in new_snapshot.compare_to(old_snapshot, "traceback"):
+        if app_only and not any(f.filename.startswith(APP_DIR) for f in stat.traceback):
+            continue
+        frame = call_site(stat.traceback)
+        site = sites.setdefault(
+            (frame.filename, frame.lineno),
+            {"size_diff": 0, "count_diff": 0, "size": 0},
+        )
+        site["size_diff"] += stat.size_diff
+        site["count_diff"] += stat.count_diff
+        site["size"] += stat.size
+    ranked = sorted(sites.items(), key=lambda item: item[1]["size_diff"], reverse=True)
+    return [
+        {"site": f"{os.path.relpath(filename, settings.BASE_DIR)}:{lineno}", **site}
+        for (filename, lineno), site in ranked[:limit]
+    ]
+
+
+def diff_since_last_snapshot(limit=10, app_only=True):
+    """Top allocations since the previous call in this process.
+
+    The first call only takes the baseline and reports nothing.
+    """
+    global _last_snapshot
+    snapshot = take_snapshot()
+    previous, _last_snapshot = _last_snapshot, snapshot
+    if previous is None:
+        return []
+    return top_allocations(previous, snapshot, limit, app_only)
+
+
+def memory_report(limit=10, app_only=True):
+    report = {"pid": os.getpid(), "rss_bytes": rss_bytes(), "tracing": False}
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        report.update(
+            tracing=True,
+            traced_bytes=current,
+            traced_peak_bytes=peak,
+            top_allocations=diff_since_last_snapshot(limit, app_only),
+        )
+    return report
+
+
+class MemoryPeakMiddleware:
+    """Records the peak traced memory of each request, while tracing runs."""
+
+    def __init__(self, get_response):
+        if settings.MEMORY_TRACING:
+            start_tracing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not tracemalloc.is_tracing():
+            return self.get_response(request)
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        response = self.get_response(request)
+        if tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            REQUEST_PEAK_MEMORY.labels(view=view_label(request)).observe(peak - before)
+        return response
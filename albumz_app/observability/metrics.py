@@ -0,0 +1,119 @@
+"""Prometheus metrics of the application.
+
+Gunicorn runs several worker processes, each with its own copy of these
+metrics. When `PROMETHEUS_MULTIPROC_DIR` is set (see deploy.sh) every process
+writes its samples to memory mapped files in that directory, and the
+`/metrics` view sums them up across all workers.
+"""
+
+import os
+
+from django.dispatch import receiver
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from ..constants import URLNames
+from ..domain import events
+from ..domain.models import User
+
+# Labels are bounded to the views of the app, anything else is lumped together.
+VIEW_LABELS = {str(name) for name in URLNames} | {str(name) for name in URLNames.API}
+OTHER_VIEW = "other"
+UNMATCHED_VIEW = "unmatched"
+
+REQUEST_LATENCY = Histogram(
+    "albumz_http_request_duration_seconds",
+    "Latency of HTTP requests.",
+    ["view", "method"],
+)
+RESPONSES = Counter(
+    "albumz_http_responses",
+    "HTTP responses by status code.",
+    ["view", "method", "status"],
+)
+DB_QUERIES = Histogram(
+    "albumz_db_queries_per_request",
+    "SQL queries run while handling a request.",
+    ["view"],
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100, 200],
+)
+DB_QUERY_TIME = Counter(
+    "albumz_db_query_duration_seconds",
+    "Time spent running SQL queries while handling requests.",
+    ["view"],
+)
+REQUEST_PEAK_MEMORY = Histogram(
+    "albumz_http_request_peak_memory_bytes",
+    "Peak memory allocated while handling a request, while tracemalloc runs.",
+    ["view"],
+    buckets=[2**exponent for exponent in range(16, 31, 2)],
+)
+CACHE_REQUESTS = Counter(
+    "albumz_cache_requests",
+    "Cache lookups by result, hit or miss.",
+    ["result"],
+)
+ALBUMS_ADDED = Counter(
+    "albumz_albums_added",
+    "Albums added, to the collection or to the wishlist.",
+    ["destination"],
+)
+ALBUMS_MOVED = Counter(
+    "albumz_albums_moved_to_collection",
+    "Albums moved from the wishlist to the collection.",
+)
+DUPLICATES_REJECTED = Counter(
+    "albumz_duplicates_rejected",
+    "Albums rejected as duplicates, by where the existing album is.",
+    ["existing_in"],
+)
+
+
+def destination(owned):
+    return "collection" if owned else "wishlist"
+
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNMATCHED_VIEW
+    return match.url_name if match.url_name in VIEW_LABELS else OTHER_VIEW
+
+
+def record_cache_lookups(hits, misses):
+    if hits:
+        CACHE_REQUESTS.labels(result="hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(result="miss").inc(misses)
+
+
+def render_metrics():
+    """The metrics in the Prometheus text format, with their content type."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+@receiver(events.album_added, sender=User)
+def count_album_added(sender, album, owned, **kwargs):
+    ALBUMS_ADDED.labels(destination=destination(owned)).inc()
+
+
+@receiver(events.album_moved_to_collection, sender=User)
+def count_album_moved(sender, album, **kwargs):
+    ALBUMS_MOVED.inc()
+
+
+@receiver(events.duplicate_rejected, sender=User)
+def count_duplicate_rejected(sender, album, existing, **kwargs):
+    DUPLICATES_REJECTED.labels(existing_in=destination(existing.owned)).inc()
@@ -0,0 +1,46 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .metrics import DB_QUERIES, DB_QUERY_TIME, REQUEST_LATENCY, RESPONSES, view_label
+
+
+class QueryRecorder:
+    """Database execute wrapper counting the queries and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Records the latency, status code and SQL queries of every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        view = view_label(request)
+        REQUEST_LATENCY.labels(view=view, method=request.method).observe(duration)
+        RESPONSES.labels(
+            view=view, method=request.method, status=response.status_code
+        ).inc()
+        DB_QUERIES.labels(view=view).observe(queries.count)
+        DB_QUERY_TIME.labels(view=view).inc(queries.duration)
+        return response
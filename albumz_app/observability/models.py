@@ -0,0 +1,47 @@
+from django.db import models
+
+
+class SlowQueryQuerySet(models.QuerySet):
+    def top_offenders(self):
+        """Statements grouped by fingerprint, the most total time first."""
+        return (
+            self.values("fingerprint")
+            .annotate(
+                count=models.Count("id"),
+                total_ms=models.Sum("duration_ms"),
+                max_ms=models.Max("duration_ms"),
+                sql=models.Max("sql"),
+            )
+            .order_by("-total_ms")
+        )
+
+
+class SlowQuery(models.Model):
+    """A SQL statement that exceeded SLOW_QUERY_THRESHOLD_MS during a request.
+
+    `fingerprint` is equal for statements differing only in their parameters,
+    `plan` is only captured for a sample of the SELECT statements.
+    """
+
+    objects = SlowQueryQuerySet.as_manager()
+    fingerprint = models.CharField(max_length=40)
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    duration_ms = models.FloatField()
+    database = models.CharField(max_length=100)
+    view = models.CharField(max_length=200, blank=True)
+    # Not a foreign key, logged queries outlive deleted users.
+    user_id = models.PositiveIntegerField(null=True, blank=True)
+    plan = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name_plural = "slow queries"
+        indexes = [
+            models.Index(
+                fields=["fingerprint", "created_at"], name="slowquery_fingerprint_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f}ms in {self.view or 'unknown view'}"
@@ -0,0 +1,126 @@
+"""On-demand sampling profiler for single requests of staff users.
+
+A request with the `X-Profile` header or the `profile` query parameter is run
+while a background thread samples its stack. The samples are stored in the
+collapsed stack format ("outer;inner;leaf count" lines), which speedscope and
+flamegraph.pl open directly. Only the newest PROFILES_MAX_COUNT are kept.
+"""
+
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "profile"
+PROFILE_SUFFIX = ".collapsed"
+
+
+def frame_label(frame):
+    code = frame.f_code
+    path = Path(code.co_filename)
+    try:
+        path = path.relative_to(settings.BASE_DIR)
+    except ValueError:
+        # Django, DRF and the standard library are shortened to their package.
+        path = Path(*path.parts[-2:])
+    return f"{code.co_name} ({path}:{frame.f_lineno})"
+
+
+class StackSampler:
+    """Samples the stack of one thread from a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def profiles_dir():
+    path = Path(settings.PROFILES_ROOT)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def profile_path(name):
+    return profiles_dir() / f"{name}{PROFILE_SUFFIX}"
+
+
+def store_profile(collapsed, view):
+    name = "-".join(
+        [
+            timezone.now().strftime("%Y%m%dT%H%M%S"),
+            view.replace(":", "_"),
+            uuid.uuid4().hex[:8],
+        ]
+    )
+    profile_path(name).write_text(collapsed)
+    enforce_retention()
+    return name
+
+
+def enforce_retention():
+    profiles = sorted(
+        profiles_dir().glob(f"*{PROFILE_SUFFIX}"), key=os.path.getmtime, reverse=True
+    )
+    for profile in profiles[settings.PROFILES_MAX_COUNT :]:
+        profile.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Profiles the requests of staff users who ask for it.
+
+    The name of the stored profile is returned in the `X-Profile` header, the
+    `profile` URL serves it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def wants_profile(self, request):
+        # The user is only loaded for requests asking for a profile.
+        asked = PROFILE_HEADER in request.headers or PROFILE_PARAM in request.GET
+        return asked and request.user.is_staff
+
+    def __call__(self, request):
+        if not self.wants_profile(request):
+            return self.get_response(request)
+        with StackSampler(
+            threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL
+        ) as sampler:
+            # Covers template rendering, which happens before the response
+            # gets back here.
+            response = self.get_response(request)
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        name = store_profile(sampler.collapsed(), view)
+        response[PROFILE_HEADER] = name
+        return response
@@ -0,0 +1,147 @@
+"""Logging of the slow SQL statements of requests, with their query plans.
+
+Slow statements are only collected while the request runs. They are logged,
+explained and stored once the response is ready, so that neither the plan
+nor the stored row interferes with the queries of the request itself. Plans
+are estimates (plain `EXPLAIN`), the statement is never run again, and only
+the types of the parameters are kept, never their values.
+"""
+
+import hashlib
+import logging
+import random
+import re
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+MAX_PARAMS_LENGTH = 1000
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+def fingerprint(sql):
+    # `IN (%s, %s, ...)` lists vary in length with their parameters.
+    normalized = re.sub(r"\(\s*%s(\s*,\s*%s)*\s*\)", "(%s...)", sql)
+    normalized = " ".join(normalized.split())
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def redact(params):
+    """The types of the parameters; their values may be personal data."""
+    if params is None:
+        return ""
+    if isinstance(params, dict):
+        return repr({key: type(value).__name__ for key, value in params.items()})
+    return f"[{', '.join(type(value).__name__ for value in params)}]"
+
+
+@dataclass
+class ExecutedStatement:
+    sql: str
+    params: object
+    duration_ms: float
+    database: str
+
+
+class SlowQueryRecorder:
+    """Database execute wrapper collecting the statements over the threshold."""
+
+    def __init__(self, alias, threshold_ms):
+        self.alias = alias
+        self.threshold_ms = threshold_ms
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= self.threshold_ms and not many:
+                self.statements.append(
+                    ExecutedStatement(sql, params, duration_ms, self.alias)
+                )
+
+
+def explain(statement):
+    """The estimated plan of a SELECT statement, or "" if it cannot be explained.
+
+    Without `ANALYZE` the statement is only planned, not run again.
+    """
+    connection = connections[statement.database]
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None or not statement.sql.lstrip().upper().startswith("SELECT"):
+        return ""
+    try:
+        with transaction.atomic(using=statement.database):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + statement.sql, statement.params)
+                rows = cursor.fetchall()
+    except DatabaseError:
+        logger.exception("Could not explain a slow query.")
+        return ""
+    # SQLite rows are (id, parent, notused, detail), PostgreSQL ones one line.
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def store_slow_queries(statements, request):
+    match = getattr(request, "resolver_match", None)
+    view = match.view_name if match else ""
+    user = getattr(request, "user", None)
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    slow_queries = []
+    for statement in statements:
+        logger.warning(
+            "Slow query (%.0fms) in %s for user %s: %s; params %s",
+            statement.duration_ms,
+            view or request.path,
+            user_id,
+            statement.sql,
+            redact(statement.params),
+        )
+        sampled = random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        slow_queries.append(
+            SlowQuery(
+                fingerprint=fingerprint(statement.sql),
+                sql=statement.sql,
+                params=redact(statement.params)[:MAX_PARAMS_LENGTH],
+                duration_ms=statement.duration_ms,
+                database=statement.database,
+                view=view,
+                user_id=user_id,
+                plan=explain(statement) if sampled else "",
+            )
+        )
+    SlowQuery.objects.bulk_create(slow_queries)
+
+
+class SlowQueryMiddleware:
+    """Logs the statements of a request slower than SLOW_QUERY_THRESHOLD_MS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorders = [
+            SlowQueryRecorder(connection.alias, settings.SLOW_QUERY_THRESHOLD_MS)
+            for connection in connections.all()
+        ]
+        with ExitStack() as stack:
+            for recorder in recorders:
+                connection = connections[recorder.alias]
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        statements = [s for recorder in recorders for s in recorder.statements]
+        if statements:
+            store_slow_queries(statements, request)
+        return response
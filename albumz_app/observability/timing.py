@@ -0,0 +1,115 @@
+"""`Server-Timing` breakdown of where the time of a request goes.
+
+Phases are timed exclusively: a database query run while a template renders
+counts as "db" only, so the phases and the remainder add up to the total.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+PHASES = {
+    "auth": "Auth and session",
+    "db": "Database",
+    "render": "Serialization and rendering",
+    "app": "Everything else",
+}
+
+_current_timer = ContextVar("server_timer", default=None)
+
+
+class ServerTimer:
+    def __init__(self):
+        self.started = self.mark = time.perf_counter()
+        self.durations = defaultdict(float)
+        self.stack = []
+
+    def _switch(self):
+        now = time.perf_counter()
+        if self.stack:
+            self.durations[self.stack[-1]] += now - self.mark
+        self.mark = now
+
+    @contextmanager
+    def phase(self, name):
+        if self.stack and self.stack[-1] == name:
+            # Nested serializers or templates of a phase that is timed already.
+            yield
+            return
+        self._switch()
+        self.stack.append(name)
+        try:
+            yield
+        finally:
+            self._switch()
+            self.stack.pop()
+
+    def header(self):
+        total = time.perf_counter() - self.started
+        durations = dict(self.durations)
+        durations["app"] = max(total - sum(durations.values()), 0)
+        metrics = [
+            f'{name};dur={durations[name] * 1000:.1f};desc="{description}"'
+            for name, description in PHASES.items()
+            if name in durations
+        ]
+        return ", ".join(metrics + [f"total;dur={total * 1000:.1f}"])
+
+
+def server_timing_phase(name):
+    """Times a phase of the current request, if its timing is enabled."""
+    timer = _current_timer.get()
+    return timer.phase(name) if timer else nullcontext()
+
+
+def _timed_query(execute, sql, params, many, context):
+    with server_timing_phase("db"):
+        return execute(sql, params, many, context)
+
+
+class ServerTimingMiddleware:
+    """Adds a `Server-Timing` header to the responses.
+
+    Enabled for every request by SERVER_TIMING, or for staff users only by
+    SERVER_TIMING_FOR_STAFF. With both off the middleware is not used at all.
+    """
+
+    def __init__(self, get_response):
+        if not (settings.SERVER_TIMING or settings.SERVER_TIMING_FOR_STAFF):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = ServerTimer()
+        with timer.phase("auth"):
+            # Loads the session and the user, which most views do anyway.
+            enabled = settings.SERVER_TIMING or request.user.is_staff
+        if not enabled:
+            return self.get_response(request)
+        token = _current_timer.set(timer)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_timed_query))
+                response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        response["Server-Timing"] = timer.header()
+        return response
+
+    def process_template_response(self, request, response):
+        timer = _current_timer.get()
+        if timer is not None:
+            render = response.render
+
+            def timed_render():
+                with timer.phase("render"):
+                    return render()
+
+            response.render = timed_render
+        return response
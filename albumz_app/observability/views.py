@@ -0,0 +1,77 @@
+import hmac
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+)
+from django.views.decorators.http import require_http_methods
+
+from .memory import memory_report, start_tracing, stop_tracing
+from .metrics import render_metrics
+from .profiling import PROFILE_SUFFIX, profile_path
+
+
+def has_metrics_access(request):
+    if request.user.is_staff:
+        return True
+    authorization = request.headers.get("Authorization", "")
+    return bool(settings.METRICS_TOKEN) and hmac.compare_digest(
+        authorization, f"Bearer {settings.METRICS_TOKEN}"
+    )
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, for staff users or with the metrics token."""
+    if not has_metrics_access(request):
+        raise PermissionDenied
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
+
+
+def profile_view(request, name):
+    """Downloads a profile stored by `ProfilingMiddleware`, for staff users."""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    path = profile_path(name)
+    if not path.is_file():
+        raise Http404
+    return FileResponse(
+        path.open("rb"),
+        as_attachment=True,
+        filename=f"{name}{PROFILE_SUFFIX}",
+        content_type="text/plain",
+    )
+
+
+MAX_ALLOCATION_SITES = 100
+
+
+@require_http_methods(["GET", "POST"])
+def memory_view(request):
+    """Memory report of the worker that handles the request, for staff users.
+
+    POSTing `action=start` starts tracing allocations in that worker only (the
+    report names it by `pid`), and `action=stop` stops it. While tracing, each
+    GET reports the call sites in albumz_app whose memory grew the most since
+    the previous GET (`?all=1` includes other code too).
+    """
+    if not request.user.is_staff:
+        raise PermissionDenied
+    if request.method == "POST":
+        action = request.POST.get("action")
+        if action == "start":
+            start_tracing()
+        elif action == "stop":
+            stop_tracing()
+        else:
+            return HttpResponseBadRequest("action has to be start or stop.")
+    try:
+        limit = min(int(request.GET.get("limit", 10)), MAX_ALLOCATION_SITES)
+    except ValueError:
+        return HttpResponseBadRequest("limit has to be a number.")
+    return JsonResponse(memory_report(limit, app_only="all" not in request.GET))
@@ -0,0 +1,46 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that trusts PostgreSQL's row estimates for large tables.
+
+    An exact `COUNT(*)` reads the whole table (or all the rows matching the
+    filters). The planner already estimates both: from `pg_class.reltuples`
+    for an unfiltered table (summed over its partitions when it is
+    partitioned, the parent has no estimate of its own) and from the query
+    plan otherwise. Small results are still counted exactly, so short lists
+    show exact page numbers.
+    """
+
+    exact_count_limit = 10_000
+
+    @cached_property
+    def count(self):
+        estimate = self.estimated_count()
+        if estimate is None or estimate < self.exact_count_limit:
+            return super().count
+        return estimate
+
+    def estimated_count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        if not queryset.query.where:
+            with connection.cursor() as cursor:
+                # A plain table is the single leaf of its partition tree.
+                cursor.execute(
+                    "SELECT min(c.reltuples), sum(c.reltuples) "
+                    "FROM pg_partition_tree(to_regclass(%s)) t "
+                    "JOIN pg_class c ON c.oid = t.relid WHERE t.isleaf",
+                    [queryset.model._meta.db_table],
+                )
+                least, total = cursor.fetchone()
+            # Tables that were never vacuumed or analyzed have no estimate (-1).
+            return int(total) if least is not None and least >= 0 else None
+        plan = json.loads(queryset.explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,291 @@
+"""Online conversion of the album table into a PostgreSQL hash partitioned one.
+
+All album queries are scoped to a user, so partitioning by `user_id` lets the
+planner prune every per-user query to a single partition, and keeps the
+indexes and the vacuum work per partition small.
+
+The conversion runs while the application keeps serving traffic:
+
+1. `prepare` creates a partitioned copy of the table (same columns, indexes
+   and foreign keys, primary key extended with `user_id` as PostgreSQL
+   requires) and a trigger that mirrors every write on the old table into the
+   copy. `LIKE` copies neither indexes nor foreign keys, both are recreated
+   from the definitions of the old table.
+2. `copy` backfills the existing rows in primary key batches, each in its own
+   short transaction. Copied rows are locked (`FOR SHARE`) so that a
+   concurrent delete waits for the batch and is then mirrored by the trigger,
+   and rows mirrored already are skipped. An interrupted copy can be rerun.
+3. `swap` briefly locks the old table and renames the tables, indexes and
+   foreign keys, so that the ORM transparently uses the partitioned table.
+   The old table is kept, without its foreign keys.
+
+Unique indexes and foreign keys of a partitioned table must include its
+partition key. Unique indexes get `user_id` appended, and foreign keys to
+albums become `(album_id, user_id)` keys when the referencing table stores the
+user too (e.g. the search grams); others are dropped, Django enforces
+`on_delete` itself. `Album` updates filter by the stored user, so that they are
+pruned to a single partition as well.
+
+The conversion copies every album, so `migrate` never runs it: it is run once,
+explicitly, by `manage.py partition_albums`.
+"""
+
+import re
+
+from django.db import transaction
+
+from .domain.models import Album
+
+TABLE = Album._meta.db_table
+PARTITIONED_TABLE = f"{TABLE}_partitioned"
+OLD_TABLE = f"{TABLE}_unpartitioned"
+SEQUENCE = f"{TABLE}_partitioned_id_seq"
+TRIGGER = f"{TABLE}_mirror"
+PARTITION_KEY = "user_id"
+
+
+def partition_name(table, remainder):
+    return f"{table}_p{remainder}"
+
+
+def create_table_statements(partitions):
+    statements = [
+        f'CREATE SEQUENCE "{SEQUENCE}"',
+        f'CREATE TABLE "{PARTITIONED_TABLE}" (LIKE "{TABLE}" INCLUDING DEFAULTS) '
+        f'PARTITION BY HASH ("{PARTITION_KEY}")',
+        f'ALTER TABLE "{PARTITIONED_TABLE}" '
+        f'ALTER COLUMN "id" SET DEFAULT nextval(\'"{SEQUENCE}"\')',
+        f'ALTER SEQUENCE "{SEQUENCE}" OWNED BY "{PARTITIONED_TABLE}"."id"',
+        f'ALTER TABLE "{PARTITIONED_TABLE}" ADD PRIMARY KEY ("id", "{PARTITION_KEY}")',
+    ]
+    statements += [
+        f'CREATE TABLE "{partition_name(TABLE, remainder)}" '
+        f'PARTITION OF "{PARTITIONED_TABLE}" '
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder in range(partitions)
+    ]
+    return statements
+
+
+def mirror_trigger_statements():
+    function = f"{TRIGGER}_fn"
+    key = f'"id" = OLD."id" AND "{PARTITION_KEY}" = OLD."{PARTITION_KEY}"'
+    return [
+        f"""
+        CREATE FUNCTION "{function}"() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM "{PARTITIONED_TABLE}" WHERE {key};
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO "{PARTITIONED_TABLE}" SELECT (NEW).*;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f'CREATE TRIGGER "{TRIGGER}" AFTER INSERT OR UPDATE OR DELETE '
+        f'ON "{TABLE}" FOR EACH ROW EXECUTE FUNCTION "{function}"()',
+    ]
+
+
+def drop_trigger_statements():
+    return [
+        f'DROP TRIGGER IF EXISTS "{TRIGGER}" ON "{TABLE}"',
+        f'DROP FUNCTION IF EXISTS "{TRIGGER}_fn"()',
+    ]
+
+
+def copy_batch_statement():
+    return (
+        f'INSERT INTO "{PARTITIONED_TABLE}" '
+        f'SELECT * FROM "{TABLE}" WHERE "id" > %s AND "id" <= %s '
+        f'ORDER BY "id" FOR SHARE '
+        f"ON CONFLICT DO NOTHING"
+    )
+
+
+def partitioned_index_name(name):
+    return f"{name[:55]}_part"
+
+
+def _with_partition_key(definition):
+    # PostgreSQL only accepts unique indexes of a partitioned table that
+    # contain the partition key; uniqueness per user implies it overall.
+    start = definition.index("(", definition.index(" USING "))
+    depth = 0
+    for end in range(start, len(definition)):
+        depth += {"(": 1, ")": -1}.get(definition[end], 0)
+        if depth == 0:
+            break
+    columns = definition[start + 1 : end]
+    if re.search(rf'(^|[\s,(]){PARTITION_KEY}"?($|[\s,)])', columns):
+        return definition
+    return f"{definition[:end]}, {PARTITION_KEY}{definition[end:]}"
+
+
+def partitioned_index_definition(name, definition):
+    """Rewrites a `pg_get_indexdef` definition for the partitioned table."""
+    if definition.startswith("CREATE UNIQUE INDEX"):
+        definition = _with_partition_key(definition)
+    definition = re.sub(
+        rf'INDEX "?{re.escape(name)}"? ',
+        f'INDEX "{partitioned_index_name(name)}" ',
+        definition,
+        count=1,
+    )
+    return re.sub(
+        rf' ON (ONLY )?([\w"]+\.)?"?{TABLE}"? ',
+        f' ON "{PARTITIONED_TABLE}" ',
+        definition,
+        count=1,
+    )
+
+
+def referencing_foreign_key_statement(table, name, column):
+    """Adds a foreign key to albums that includes the partition key."""
+    return (
+        f'ALTER TABLE {table} ADD CONSTRAINT "{name}" '
+        f'FOREIGN KEY ("{column}", "{PARTITION_KEY}") '
+        f'REFERENCES "{TABLE}" ("id", "{PARTITION_KEY}") '
+        "DEFERRABLE INITIALLY DEFERRED NOT VALID"
+    )
+
+
+def partitioned_foreign_key_statement(name, definition):
+    """Adds a `pg_get_constraintdef` foreign key to the partitioned table."""
+    return (
+        f'ALTER TABLE "{PARTITIONED_TABLE}" '
+        f'ADD CONSTRAINT "{partitioned_index_name(name)}" {definition}'
+    )
+
+
+class AlbumPartitioner:
+    def __init__(self, connection, partitions, batch_size=50_000, log=None):
+        self.connection = connection
+        self.partitions = partitions
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+
+    def execute(self, statement, params=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(statement, params)
+            return cursor.fetchall() if cursor.description else None
+
+    def table_exists(self, table):
+        return self.execute("SELECT to_regclass(%s) IS NOT NULL", [table])[0][0]
+
+    def is_partitioned(self):
+        return self.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(%s))",
+            [TABLE],
+        )[0][0]
+
+    def secondary_indexes(self):
+        """Index definitions of the album table, except its primary key."""
+        return self.execute(
+            "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+            "JOIN pg_class i ON i.oid = x.indexrelid "
+            "WHERE x.indrelid = to_regclass(%s) AND NOT x.indisprimary",
+            [TABLE],
+        )
+
+    def foreign_keys(self):
+        """Foreign key definitions of the album table, e.g. to its user."""
+        return self.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE],
+        )
+
+    def referencing_constraints(self):
+        """Foreign keys to albums, with their column and whether the
+        referencing table stores the user as well."""
+        return self.execute(
+            "SELECT c.conrelid::regclass::text, c.conname, a.attname, "
+            "EXISTS (SELECT 1 FROM pg_attribute u WHERE u.attrelid = c.conrelid "
+            "AND u.attname = %s AND NOT u.attisdropped) "
+            "FROM pg_constraint c "
+            "JOIN pg_attribute a ON a.attrelid = c.conrelid "
+            "AND a.attnum = c.conkey[1] "
+            "WHERE c.confrelid = to_regclass(%s) AND c.contype = 'f'",
+            [PARTITION_KEY, TABLE],
+        )
+
+    def prepare(self):
+        if self.table_exists(PARTITIONED_TABLE):
+            self.log(f"{PARTITIONED_TABLE} exists already.")
+            return
+        with transaction.atomic(using=self.connection.alias):
+            for statement in create_table_statements(self.partitions):
+                self.execute(statement)
+            for name, definition in self.secondary_indexes():
+                self.execute(partitioned_index_definition(name, definition))
+            for name, definition in self.foreign_keys():
+                self.execute(partitioned_foreign_key_statement(name, definition))
+            for statement in mirror_trigger_statements():
+                self.execute(statement)
+        self.log(f"Created {PARTITIONED_TABLE} with {self.partitions} partitions.")
+
+    def copy(self):
+        last_id = self.execute(f'SELECT coalesce(max("id"), 0) FROM "{TABLE}"')[0][0]
+        start = 0
+        while start < last_id:
+            end = start + self.batch_size
+            with transaction.atomic(using=self.connection.alias):
+                self.execute(copy_batch_statement(), [start, end])
+            self.log(f"Copied albums up to id {min(end, last_id)} of {last_id}.")
+            start = end
+
+    def swap(self):
+        with transaction.atomic(using=self.connection.alias):
+            self.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+            # Rows inserted since `copy` looked up the last id were mirrored.
+            for statement in drop_trigger_statements():
+                self.execute(statement)
+            self.execute(
+                f"SELECT setval('\"{SEQUENCE}\"', "
+                f'(SELECT coalesce(max("id"), 0) + 1 FROM "{TABLE}"), false)'
+            )
+            referencing = self.referencing_constraints()
+            for table, constraint, _, _ in referencing:
+                self.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{constraint}"')
+            indexes = [name for name, _ in self.secondary_indexes()]
+            foreign_keys = [name for name, _ in self.foreign_keys()]
+            self.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{OLD_TABLE}"')
+            self.execute(f'ALTER TABLE "{PARTITIONED_TABLE}" RENAME TO "{TABLE}"')
+            for name in indexes:
+                self.execute(f'ALTER INDEX "{name}" RENAME TO "{name[:50]}_unpart"')
+                self.execute(
+                    f'ALTER INDEX "{partitioned_index_name(name)}" RENAME TO "{name}"'
+                )
+            for name in foreign_keys:
+                # The kept old rows must not block deleting their users.
+                self.execute(f'ALTER TABLE "{OLD_TABLE}" DROP CONSTRAINT "{name}"')
+                self.execute(
+                    f'ALTER TABLE "{TABLE}" RENAME CONSTRAINT '
+                    f'"{partitioned_index_name(name)}" TO "{name}"'
+                )
+            kept = []
+            for table, constraint, column, has_user in referencing:
+                if not has_user:
+                    self.log(f"Dropped {constraint}, {table} has no {PARTITION_KEY}.")
+                    continue
+                self.execute(
+                    referencing_foreign_key_statement(table, constraint, column)
+                )
+                kept.append((table, constraint))
+            self.execute(f'ANALYZE "{TABLE}"')
+        # Validating only locks the referencing tables against schema changes.
+        for table, constraint in kept:
+            self.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT "{constraint}"')
+        self.log(f"{TABLE} is partitioned, the old table is kept as {OLD_TABLE}.")
+
+    def run(self):
+        if self.is_partitioned():
+            self.log(f"{TABLE} is partitioned already.")
+            return
+        self.prepare()
+        self.copy()
+        self.swap()
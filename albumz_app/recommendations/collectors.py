@@ -0,0 +1,122 @@
+"""Collectors like you: users with the most similar rating profiles.
+
+The profile of a user is the genre distribution of their albums followed by
+their affinity to each artist. Each album adds 1 to the affinity to its artist,
+scaled by its rating: from 1/3 for a terrible album to 2 for the best one,
+unrated albums count 1. Both halves are scaled to the same length, so genres
+and artists weigh the same in the cosine similarity.
+"""
+
+import os
+
+import numpy as np
+from django.conf import settings
+from django.db import models, transaction
+from scipy import sparse
+
+from ..domain.models import Album, Genre, Rating
+from .models import SimilarCollector
+from .similarity import profile_similarities, top_entries
+
+WRITE_BATCH_SIZE = 1000
+
+
+class Profiles:
+    """Dense user x genre and sparse user x artist parts of the profiles."""
+
+    def __init__(self):
+        user_index, artist_index = {}, {}
+        genre_index = {genre: index for index, genre in enumerate(Genre.values)}
+        genre_rows = (
+            Album.albums.select_related(None)
+            .order_by()
+            .values("user_id", "genre")
+            .annotate(albums=models.Count("pk"))
+            .values_list("user_id", "genre", "albums")
+        )
+        genres = []
+        for user_id, genre, albums in genre_rows.iterator(chunk_size=10_000):
+            user = user_index.setdefault(user_id, len(user_index))
+            genres.append((user, genre_index[genre], albums))
+        self.user_ids = list(user_index)
+        self.genres = np.zeros((len(user_index), len(genre_index)), dtype=np.float32)
+        if genres:
+            users, columns, albums = np.array(genres).T
+            self.genres[users, columns] = albums
+
+        artist_rows = (
+            Album.albums.select_related(None)
+            .order_by()
+            .values("user_id", "artist_ref_id")
+            .annotate(
+                albums=models.Count("pk"),
+                rated=models.Count("pk", filter=models.Q(user_rating__gt=0)),
+                ratings=models.Sum("user_rating", default=0),
+            )
+            .values_list("user_id", "artist_ref_id", "albums", "rated", "ratings")
+        )
+        users, artists, affinities = [], [], []
+        for user_id, artist_id, albums, rated, ratings in artist_rows.iterator(
+            chunk_size=10_000
+        ):
+            users.append(user_index[user_id])
+            artists.append(artist_index.setdefault(artist_id, len(artist_index)))
+            affinities.append(albums + (ratings - Rating.AVERAGE * rated) / 3)
+        self.artists = sparse.csr_matrix(
+            (np.array(affinities, dtype=np.float32), (users, artists)),
+            shape=(len(user_index), len(artist_index)),
+        )
+        half = 0.5**0.5
+        self.genres *= scaling(np.linalg.norm(self.genres, axis=1), half)[:, None]
+        artist_norms = np.sqrt(
+            np.asarray(self.artists.multiply(self.artists).sum(axis=1)).ravel()
+        )
+        self.artists = sparse.diags(scaling(artist_norms, half)) @ self.artists
+
+    def similarities(self, neighbors, processes):
+        return profile_similarities(
+            self.genres, self.artists, neighbors, processes=processes
+        )
+
+
+def scaling(norms, length):
+    """Factors scaling rows of the given `norms` to `length`."""
+    norms[norms == 0] = np.inf
+    return (length / norms).astype(np.float32)
+
+
+def ranked(similarities):
+    """(user, [(collector, score)] best first) of every row of `similarities`."""
+    for user in range(similarities.shape[0]):
+        row = slice(similarities.indptr[user], similarities.indptr[user + 1])
+        yield user, zip(
+            *top_entries(
+                similarities.indices[row], similarities.data[row], row.stop - row.start
+            )
+        )
+
+
+def refresh_similar_collectors(processes=None):
+    """Recomputes the most similar collectors of all users."""
+    profiles = Profiles()
+    similarities = profiles.similarities(
+        settings.SIMILAR_COLLECTORS_PER_USER,
+        processes or settings.RECOMMENDATION_PROCESSES or os.cpu_count(),
+    )
+    user_ids = profiles.user_ids
+    with transaction.atomic():
+        SimilarCollector.objects.all().delete()
+        SimilarCollector.objects.bulk_create(
+            (
+                SimilarCollector(
+                    user_id=user_ids[user],
+                    collector_id=user_ids[collector],
+                    rank=rank,
+                    score=score,
+                )
+                for user, collectors in ranked(similarities)
+                for rank, (collector, score) in enumerate(collectors, start=1)
+            ),
+            batch_size=WRITE_BATCH_SIZE,
+        )
+    return len(user_ids)
@@ -0,0 +1,205 @@
+"""Collaborative filtering recommendations: users who own X also own Y.
+
+A full refresh builds the sparse user x album ownership matrix of all users,
+computes the nearest neighbours of every album (`SimilarAlbum`) and the
+recommendations of every user. An incremental refresh only recommends anew to
+the users whose albums changed since, from the stored neighbours.
+"""
+
+import os
+
+import numpy as np
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+from scipy import sparse
+
+from ..domain.models import Album, User
+from .models import Recommendation, RecommendationStatus, SimilarAlbum
+from .similarity import item_similarities, recommend
+
+WRITE_BATCH_SIZE = 1000
+
+
+class Collections:
+    """Sparse user x album matrices of the albums owned and of all albums.
+
+    Albums owned by fewer than RECOMMENDATION_MIN_OWNERS users cannot be
+    similar to any other album and are left out.
+    """
+
+    def __init__(self):
+        user_index, item_index = {}, {}
+        users, items, owned = [], [], []
+        rows = (
+            Album.albums.select_related(None)
+            .order_by()
+            .values_list("user_id", "match_key", "owned")
+        )
+        for user_id, match_key, is_owned in rows.iterator(chunk_size=10_000):
+            users.append(user_index.setdefault(user_id, len(user_index)))
+            items.append(item_index.setdefault(match_key, len(item_index)))
+            owned.append(is_owned)
+        users, items = np.array(users, dtype=int), np.array(items, dtype=int)
+        owned = np.array(owned, dtype=bool)
+        shape = (len(user_index), len(item_index))
+        owned_matrix = self.matrix(users[owned], items[owned], shape)
+        owners = np.asarray(owned_matrix.sum(axis=0)).ravel()
+        kept = np.flatnonzero(owners >= settings.RECOMMENDATION_MIN_OWNERS)
+        self.user_ids = list(user_index)
+        keys = list(item_index)
+        self.keys = [keys[index] for index in kept]
+        self.owned = owned_matrix[:, kept]
+        self.all = self.matrix(users, items, shape)[:, kept]
+
+    @staticmethod
+    def matrix(rows, columns, shape):
+        values = np.ones(len(rows), dtype=np.float32)
+        matrix = sparse.csr_matrix((values, (rows, columns)), shape=shape)
+        # Duplicates of an album in one collection count once.
+        matrix.data[:] = 1
+        return matrix
+
+
+def representatives(keys):
+    """Title and artist name of an album of each match key."""
+    found = {}
+    keys = list(keys)
+    for start in range(0, len(keys), WRITE_BATCH_SIZE):
+        first_albums = (
+            Album.albums.filter(match_key__in=keys[start : start + WRITE_BATCH_SIZE])
+            .order_by()
+            .values("match_key")
+            .annotate(first=models.Min("pk"))
+            .values("first")
+        )
+        found.update(
+            (album.match_key, (album.title, album.artist))
+            for album in Album.albums.filter(pk__in=first_albums)
+        )
+    return found
+
+
+def store_recommendations(recommendations, started_at):
+    """Replaces the recommendations of users, given as {user id: [(key, score)]}.
+
+    Albums deleted by all their owners since the similarities were computed
+    have no title to show anymore, and are left out.
+    """
+    albums = representatives(
+        {key for entries in recommendations.values() for key, _ in entries}
+    )
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id__in=recommendations).delete()
+        Recommendation.objects.bulk_create(
+            [
+                Recommendation(
+                    user_id=user_id,
+                    rank=rank,
+                    match_key=key,
+                    title=albums[key][0],
+                    artist=albums[key][1],
+                    score=score,
+                )
+                for user_id, entries in recommendations.items()
+                for rank, (key, score) in enumerate(
+                    [(key, score) for key, score in entries if key in albums], start=1
+                )
+            ],
+            batch_size=WRITE_BATCH_SIZE,
+        )
+        RecommendationStatus.objects.bulk_create(
+            [
+                RecommendationStatus(
+                    user_id=user_id, changed_at=started_at, refreshed_at=started_at
+                )
+                for user_id in recommendations
+            ],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["refreshed_at"],
+        )
+
+
+def full_refresh(processes=None):
+    """Recomputes the album neighbours and the recommendations of all users."""
+    started_at = timezone.now()
+    collections = Collections()
+    similarities = item_similarities(
+        collections.owned,
+        settings.RECOMMENDATION_NEIGHBORS,
+        processes=processes or settings.RECOMMENDATION_PROCESSES or os.cpu_count(),
+    ).tocoo()
+    with transaction.atomic():
+        SimilarAlbum.objects.all().delete()
+        SimilarAlbum.objects.bulk_create(
+            (
+                SimilarAlbum(
+                    album_key=collections.keys[row],
+                    similar_key=collections.keys[column],
+                    score=score,
+                )
+                for row, column, score in zip(
+                    similarities.row, similarities.col, similarities.data
+                )
+            ),
+            batch_size=WRITE_BATCH_SIZE,
+        )
+    recommendations = {
+        user_id: [(collections.keys[index], float(score)) for index, score in zip(*top)]
+        for user_id, top in zip(
+            collections.user_ids,
+            recommend(
+                collections.owned,
+                similarities.tocsr(),
+                collections.all,
+                settings.RECOMMENDATIONS_PER_USER,
+            ),
+        )
+    }
+    # Users without albums anymore keep no outdated recommendations.
+    for user_id in User.objects.exclude(pk__in=collections.user_ids).values_list(
+        "pk", flat=True
+    ):
+        recommendations[user_id] = []
+    store_recommendations(recommendations, started_at)
+    return len(recommendations)
+
+
+def recommendations_for(user):
+    """Recommendations of one user from the stored album neighbours."""
+    albums = Album.albums.for_user(user).select_related(None).order_by()
+    scores = (
+        SimilarAlbum.objects.filter(
+            album_key__in=albums.filter(owned=True).values("match_key")
+        )
+        .exclude(similar_key__in=albums.values("match_key"))
+        # Neighbours whose albums were all deleted since the full refresh.
+        .filter(
+            models.Exists(Album.albums.filter(match_key=models.OuterRef("similar_key")))
+        )
+        .values("similar_key")
+        .annotate(total=models.Sum("score"))
+        .order_by("-total", "similar_key")[: settings.RECOMMENDATIONS_PER_USER]
+    )
+    return [(entry["similar_key"], entry["total"]) for entry in scores]
+
+
+def incremental_refresh():
+    """Recommends anew to the users whose albums changed since their last
+    refresh, and to users who never got recommendations."""
+    started_at = timezone.now()
+    stale = User.objects.filter(
+        models.Q(recommendation_status__isnull=True)
+        | models.Q(
+            pk__in=RecommendationStatus.objects.stale().values("user_id"),
+        )
+    )
+    refreshed, last_pk = 0, 0
+    while users := list(stale.filter(pk__gt=last_pk).order_by("pk")[:WRITE_BATCH_SIZE]):
+        store_recommendations(
+            {user.pk: recommendations_for(user) for user in users}, started_at
+        )
+        refreshed += len(users)
+        last_pk = users[-1].pk
+    return refreshed
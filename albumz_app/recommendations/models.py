@@ -0,0 +1,93 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from ..domain.models import User
+
+
+class SimilarAlbum(models.Model):
+    """One of the nearest neighbours of an album among all collections.
+
+    Albums are identified across users by their match key. The neighbours are
+    only recomputed by a full refresh, user recommendations are refreshed
+    from them incrementally.
+    """
+
+    album_key = models.CharField(max_length=360)
+    similar_key = models.CharField(max_length=360)
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [models.Index(fields=["album_key"], name="similar_album_key_idx")]
+
+
+class Recommendation(models.Model):
+    user = models.ForeignKey(User, models.CASCADE, related_name="recommendations")
+    rank = models.PositiveSmallIntegerField()
+    match_key = models.CharField(max_length=360)
+    title = models.CharField(max_length=250)
+    artist = models.CharField(max_length=100)
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "rank"], name="recommendation_user_rank_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.title} by {self.artist} for {self.user}"
+
+
+class RecommendationStatusQuerySet(models.QuerySet):
+    def stale(self):
+        return self.filter(
+            models.Q(refreshed_at__isnull=True)
+            | models.Q(changed_at__gt=models.F("refreshed_at"))
+        )
+
+
+class RecommendationStatus(models.Model):
+    """When the albums of a user changed and their recommendations were made.
+
+    `refreshed_at` is the start of the refresh, so changes made while it ran
+    leave the user stale.
+    """
+
+    objects = RecommendationStatusQuerySet.as_manager()
+    user = models.OneToOneField(
+        User, models.CASCADE, primary_key=True, related_name="recommendation_status"
+    )
+    changed_at = models.DateTimeField(default=timezone.now)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    @classmethod
+    def mark_changed(cls, user_ids):
+        cls.objects.filter(user_id__in=user_ids).update(changed_at=timezone.now())
+
+
+class SimilarCollector(models.Model):
+    """One of the collectors with the most similar rating profile to a user."""
+
+    user = models.ForeignKey(User, models.CASCADE, related_name="similar_collectors")
+    collector = models.ForeignKey(User, models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "rank"], name="similar_collector_user_rank_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.collector} similar to {self.user}"
+
+    @property
+    def public_collector_id(self):
+        """Stable id of the collector that does not reveal their username."""
+        return salted_hmac(
+            "albumz_app.SimilarCollector", self.collector_id
+        ).hexdigest()[:20]
@@ -0,0 +1,172 @@
+"""Nearest neighbours by cosine similarity, computed in blocks.
+
+Item-item similarities of the sparse user x album matrix, and user-user
+similarities of rating profiles. Only NumPy and SciPy are used here, so that
+the pool processes computing the blocks of the similarity matrix do not need
+Django.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import get_context
+
+import numpy as np
+from scipy import sparse
+
+# Matrix shared with the blocks computed in a pool process.
+_matrix = None
+
+
+def _init_process(matrix):
+    global _matrix
+    _matrix = matrix
+
+
+def normalize_columns(matrix):
+    """Scales every column to unit length, for cosine similarities."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1
+    return (matrix @ sparse.diags(1 / norms)).tocsc()
+
+
+def top_entries(indices, values, count, exclude=()):
+    """The `count` largest values (with their indices), largest first."""
+    if len(exclude):
+        keep = ~np.isin(indices, exclude)
+        indices, values = indices[keep], values[keep]
+    if len(values) > count:
+        top = np.argpartition(-values, count)[:count]
+        indices, values = indices[top], values[top]
+    order = np.argsort(-values, kind="stable")
+    return indices[order], values[order]
+
+
+def block_neighbors(start, stop, neighbors, matrix=None):
+    """Nearest neighbours of the albums (columns) `start` to `stop`."""
+    matrix = _matrix if matrix is None else matrix
+    block = (matrix[:, start:stop].T @ matrix).tocsr()
+    rows, columns, scores = [], [], []
+    for offset, item in enumerate(range(start, stop)):
+        row = slice(block.indptr[offset], block.indptr[offset + 1])
+        indices, values = top_entries(
+            block.indices[row], block.data[row], neighbors, exclude=[item]
+        )
+        rows.append(np.full(len(indices), item))
+        columns.append(indices)
+        scores.append(values)
+    return np.concatenate(rows), np.concatenate(columns), np.concatenate(scores)
+
+
+def profile_block_neighbors(start, stop, neighbors, profiles=None, tile_size=16384):
+    """Nearest neighbours of the profiles (rows) `start` to `stop`.
+
+    A profile is a dense row of `profiles[0]` followed by a sparse row of
+    `profiles[1]`, both scaled so that profiles have unit length. Dense
+    profiles are similar to almost all others, so the similarities are
+    computed a tile of `tile_size` profiles at a time, keeping the best
+    `neighbors` found so far: memory is bounded by the block and tile sizes
+    rather than by the number of profiles.
+    """
+    dense, sparse_part = _matrix if profiles is None else profiles
+    count, block = dense.shape[0], np.arange(stop - start)
+    best = np.empty((stop - start, 0), dtype=int)
+    best_scores = np.empty((stop - start, 0), dtype=dense.dtype)
+    for tile_start in range(0, count, tile_size):
+        tile_stop = min(tile_start + tile_size, count)
+        scores = dense[start:stop] @ dense[tile_start:tile_stop].T
+        scores += (
+            sparse_part[start:stop] @ sparse_part[tile_start:tile_stop].T
+        ).toarray()
+        own = (block + start >= tile_start) & (block + start < tile_stop)
+        scores[block[own], block[own] + start - tile_start] = -np.inf
+        candidates = np.hstack(
+            [best, np.broadcast_to(np.arange(tile_start, tile_stop), scores.shape)]
+        )
+        candidate_scores = np.hstack([best_scores, scores])
+        if candidates.shape[1] > neighbors:
+            top = np.argpartition(-candidate_scores, neighbors - 1, axis=1)
+            top = top[:, :neighbors]
+            candidates = np.take_along_axis(candidates, top, axis=1)
+            candidate_scores = np.take_along_axis(candidate_scores, top, axis=1)
+        best, best_scores = candidates, candidate_scores
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    similar = best_scores > 0
+    rows = np.broadcast_to((block + start)[:, None], best.shape)
+    return rows[similar], best[similar], best_scores[similar]
+
+
+def _pooled_block_neighbors(function, bounds, neighbors):
+    return function(*bounds, neighbors)
+
+
+def nearest_neighbors(function, data, count, neighbors, processes, block_size):
+    """Sparse `count` x `count` matrix of the `neighbors` most similar of each
+    of `count` items, whose blocks are computed by `function` from `data`.
+
+    Blocks of items are computed in parallel in a pool of `processes`.
+    """
+    blocks = [
+        (start, min(start + block_size, count)) for start in range(0, count, block_size)
+    ]
+    if processes > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(
+            processes,
+            mp_context=get_context("spawn"),
+            initializer=_init_process,
+            initargs=(data,),
+        ) as pool:
+            parts = list(
+                pool.map(
+                    _pooled_block_neighbors, repeat(function), blocks, repeat(neighbors)
+                )
+            )
+    else:
+        parts = [function(*bounds, neighbors, data) for bounds in blocks]
+    rows, columns, scores = (
+        np.concatenate([part[index] for part in parts]) for index in range(3)
+    )
+    return sparse.csr_matrix((scores, (rows, columns)), shape=(count, count))
+
+
+def item_similarities(matrix, neighbors, processes=1, block_size=1000):
+    """Sparse album x album matrix of the cosine similarities of each album
+    with its `neighbors` most similar albums."""
+    items = matrix.shape[1]
+    if not items:
+        return sparse.csr_matrix((0, 0))
+    normalized = normalize_columns(matrix.tocsc())
+    return nearest_neighbors(
+        block_neighbors, normalized, items, neighbors, processes, block_size
+    )
+
+
+def profile_similarities(dense, sparse_part, neighbors, processes=1, block_size=256):
+    """Sparse user x user matrix of the cosine similarities of each profile
+    with its `neighbors` most similar profiles, see `profile_block_neighbors`."""
+    users = dense.shape[0]
+    if not users:
+        return sparse.csr_matrix((0, 0))
+    return nearest_neighbors(
+        profile_block_neighbors,
+        (dense, sparse_part.tocsr()),
+        users,
+        neighbors,
+        processes,
+        block_size,
+    )
+
+
+def recommend(owned, similarities, excluded, count):
+    """Top `count` albums per user, scored by the similarities of the albums
+    the user owns, leaving out the `excluded` albums of each user.
+
+    Yields the album indices and scores of every user (row).
+    """
+    scores = (owned @ similarities).tocsr()
+    excluded = excluded.tocsr()
+    for user in range(scores.shape[0]):
+        row = slice(scores.indptr[user], scores.indptr[user + 1])
+        exclude = excluded.indices[excluded.indptr[user] : excluded.indptr[user + 1]]
+        yield top_entries(scores.indices[row], scores.data[row], count, exclude)
@@ -0,0 +1,141 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "default"
+# Tables that must never be read behind a write, e.g. a session created at
+# login has to be visible on the very next request.
+PRIMARY_APP_LABELS = {"auth", "sessions", "contenttypes", "admin"}
+
+LAG_QUERIES = {
+    "postgresql": "SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())",
+}
+
+
+@dataclass
+class RoutingState:
+    use_replica: bool = False
+    wrote: bool = False
+
+
+# Only requests marked read-only by `ReplicaRoutingMiddleware` read from
+# replicas; management commands and job workers always use the primary.
+_routing_state = ContextVar("replica_routing_state", default=None)
+
+_lag_checks = {}
+
+
+def measure_lag(alias):
+    """Seconds the replica is behind the primary, None if it can't be told."""
+    query = LAG_QUERIES.get(connections[alias].vendor)
+    if query is None:
+        return None
+    with connections[alias].cursor() as cursor:
+        cursor.execute(query)
+        lag = cursor.fetchone()[0]
+    return None if lag is None else float(lag)
+
+
+def replica_lag(alias):
+    """Lag of a replica, measured at most every REPLICA_LAG_CHECK_INTERVAL."""
+    checked_at, lag = _lag_checks.get(alias, (None, None))
+    now = time.monotonic()
+    if checked_at is None or now - checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL:
+        try:
+            lag = measure_lag(alias)
+        except Exception:
+            logger.exception("Lag check of replica %s failed.", alias)
+            lag = float("inf")
+        if lag is not None and lag > settings.REPLICA_MAX_LAG:
+            logger.warning(
+                "Replica %s is %.1fs behind the primary, reads use the primary.",
+                alias,
+                lag,
+            )
+        _lag_checks[alias] = (now, lag)
+    return lag
+
+
+def healthy_replicas():
+    return [
+        alias
+        for alias in settings.DATABASE_REPLICAS
+        if (lag := replica_lag(alias)) is None or lag <= settings.REPLICA_MAX_LAG
+    ]
+
+
+class ReplicaRouter:
+    """Sends the reads of read-only requests to replicas, all else to primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if (
+            state is None
+            or not state.use_replica
+            or state.wrote
+            or model._meta.app_label in PRIMARY_APP_LABELS
+        ):
+            return PRIMARY
+        replicas = healthy_replicas()
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema through replication.
+        return db == PRIMARY
+
+
+def _pin_key(user):
+    return f"replicas:pin:user-{user.pk}"
+
+
+class ReplicaRoutingMiddleware:
+    """Routes the reads of safe requests to replicas (see `ReplicaRouter`).
+
+    A user who wrote to the database reads from the primary for the next
+    REPLICA_STICKINESS_SECONDS, so their own writes are never hidden by the
+    replication lag.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        safe = request.method in ("GET", "HEAD", "OPTIONS")
+        state = RoutingState(use_replica=safe and not self.is_pinned(request))
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        if state.wrote or not safe:
+            self.pin(request)
+        return response
+
+    def is_pinned(self, request):
+        user = request.user
+        return user.is_authenticated and cache.get(_pin_key(user)) is not None
+
+    def pin(self, request):
+        user = request.user
+        if user.is_authenticated:
+            cache.set(_pin_key(user), True, settings.REPLICA_STICKINESS_SECONDS)
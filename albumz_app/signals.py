@@ -1,11 +1,84 @@
+from django.conf import settings
 from django.contrib.auth.models import User as AuthUser
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from .analytics.models import RollupChanges
+from .domain.models import Album
 from .domain.models import User as DomainUser
+from .leaderboards.models import PopularityChanges
+from .recommendations.models import RecommendationStatus
+from .sync.models import AlbumTombstone, SyncState
 
 
 @receiver(post_save, sender=AuthUser)
 def create_domain_user(sender, instance, created, **kwargs):
     if created:
         DomainUser.objects.create(auth_user=instance)
+
+
+@receiver(connection_created)
+def set_trigram_threshold(sender, connection, **kwargs):
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SET pg_trgm.word_similarity_threshold = %s",
+                [settings.FUZZY_SEARCH_THRESHOLD],
+            )
+
+
+@receiver(post_save, sender=Album)
+@receiver(post_delete, sender=Album)
+def mark_recommendations_stale(sender, instance, **kwargs):
+    RecommendationStatus.mark_changed([instance.user_id])
+
+
+@receiver(pre_save, sender=Album)
+def remember_counted_album(sender, instance, raw=False, **kwargs):
+    # The stored state the popularity counters and rollups include, replaced
+    # on save.
+    instance._counted = None
+    if not raw and not instance._state.adding:
+        instance._counted = (
+            Album.albums.select_related(None)
+            .only(
+                "user",
+                "match_key",
+                "genre",
+                "owned",
+                "user_rating",
+                "add_date",
+                "pub_date",
+            )
+            .filter(pk=instance.pk)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Album)
+def count_saved_album(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for changes in (PopularityChanges(), RollupChanges()):
+        changes.add([instance])
+        if instance._counted is not None:
+            changes.remove([instance._counted])
+        changes.apply()
+
+
+@receiver(post_delete, sender=Album)
+def uncount_deleted_album(sender, instance, **kwargs):
+    PopularityChanges().remove([instance]).apply()
+    RollupChanges().remove([instance]).apply()
+
+
+@receiver(post_delete, sender=Album)
+def leave_tombstone(sender, instance, origin=None, **kwargs):
+    # Albums deleted along with their user are not synced anymore.
+    if isinstance(origin, Album) or getattr(origin, "model", None) is Album:
+        AlbumTombstone.objects.create(
+            user_id=instance.user_id,
+            album_id=instance.pk,
+            seq=SyncState.objects.reserve(instance.user_id),
+        )
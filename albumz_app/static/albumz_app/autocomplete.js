@@ -0,0 +1,59 @@
+// Suggests artists and titles while typing in the search bar. Requests are
+// debounced and only the response to the latest prefix is shown, so typing
+// never re-renders the page; submitting the form still runs a full search.
+(function () {
+    "use strict";
+
+    const DEBOUNCE_MS = 200;
+
+    function attach(input) {
+        const datalist = document.getElementById(input.getAttribute("list"));
+        const url = input.dataset.autocompleteUrl;
+        let timer = null;
+        let controller = null;
+
+        function render(data) {
+            const values = new Set([...data.artists, ...data.titles]);
+            datalist.replaceChildren(
+                ...[...values].map((value) => {
+                    const option = document.createElement("option");
+                    option.value = value;
+                    return option;
+                })
+            );
+        }
+
+        function complete(prefix) {
+            if (controller) {
+                controller.abort();
+            }
+            controller = new AbortController();
+            fetch(`${url}?prefix=${encodeURIComponent(prefix)}`, {
+                credentials: "same-origin",
+                headers: { Accept: "application/json" },
+                signal: controller.signal,
+            })
+                .then((response) => (response.ok ? response.json() : null))
+                .then((data) => data && render(data))
+                .catch((error) => {
+                    if (error.name !== "AbortError") {
+                        throw error;
+                    }
+                });
+        }
+
+        input.addEventListener("input", () => {
+            clearTimeout(timer);
+            const prefix = input.value.trim();
+            if (!prefix) {
+                datalist.replaceChildren();
+                return;
+            }
+            timer = setTimeout(() => complete(prefix), DEBOUNCE_MS);
+        });
+    }
+
+    document
+        .querySelectorAll("input[data-autocomplete-url]")
+        .forEach(attach);
+})();
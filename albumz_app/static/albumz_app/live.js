@@ -0,0 +1,25 @@
+// Tells the user when their albums change in another tab or device, from the
+// server-sent events of the albums. The stream is closed after the first one,
+// as the page has to be reloaded anyway.
+(function () {
+    "use strict";
+
+    const EVENT_TYPES = [
+        "album.created",
+        "album.updated",
+        "album.moved",
+        "album.deleted",
+        "resync",
+    ];
+
+    const notice = document.getElementById("live-updates");
+    if (!notice || !window.EventSource) {
+        return;
+    }
+    const source = new EventSource(document.currentScript.dataset.eventsUrl);
+    function show() {
+        source.close();
+        notice.hidden = false;
+    }
+    EVENT_TYPES.forEach((type) => source.addEventListener(type, show));
+})();
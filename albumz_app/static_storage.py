@@ -0,0 +1,52 @@
+"""Static files storage of the production setup.
+
+`collectstatic` names every file after a hash of its content (`styles.css`
+becomes `styles.4c2a9e1f0b3d.css`), so that nginx lets browsers cache the
+files forever: a changed file gets a new URL. Next to each compressible file
+it writes a gzip and a Brotli compressed copy, which nginx sends as they are
+(`gzip_static`) instead of compressing the file on every request.
+"""
+
+import gzip
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+COMPRESSED_EXTENSIONS = (".css", ".js", ".map", ".svg", ".json", ".txt", ".html")
+# Smaller files hardly shrink, while the compressed response costs a header.
+MIN_COMPRESSED_SIZE = 256
+
+
+def compressed_versions(content):
+    """{suffix: content} of the compressed copies worth serving."""
+    versions = {
+        "gz": gzip.compress(content, compresslevel=9, mtime=0),
+        "br": brotli.compress(content, mode=brotli.MODE_TEXT),
+    }
+    return {
+        suffix: compressed
+        for suffix, compressed in versions.items()
+        if len(compressed) < len(content)
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSED_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < MIN_COMPRESSED_SIZE:
+            return
+        for suffix, compressed in compressed_versions(content).items():
+            compressed_name = f"{name}.{suffix}"
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self.save(compressed_name, ContentFile(compressed))
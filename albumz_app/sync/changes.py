@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AlbumTombstone, SyncState
+
+
+class SyncTokenExpiredError(Exception):
+    """The tombstones of deletes after the token were compacted already."""
+
+
+@dataclass
+class Changes:
+    albums: list
+    deleted: list
+    token: int
+    has_more: bool
+
+
+def changes_since(user, since=0, page_size=None):
+    """The first `page_size` album changes of a user after the token `since`.
+
+    Changes are ordered by their sequence number, and the returned token is
+    the number of the last one, so passing it back pages through the changes.
+    A token of 0 (nothing synced yet) lists all albums without tombstones.
+
+    Albums and tombstones are read in two queries, so both are bounded by the
+    last number committed before them: the writes of a user commit in the
+    order of their numbers, so every change up to it is visible to both, and
+    a change committed between the queries is left for the next call instead
+    of being skipped by a token past it.
+    """
+    page_size = page_size or settings.SYNC_PAGE_SIZE
+    last_seq = (
+        SyncState.objects.filter(user=user).values_list("last_seq", flat=True).first()
+        or 0
+    )
+    albums = list(
+        user.albums.filter(sync_seq__gt=since, sync_seq__lte=last_seq)
+        .select_related("cover")
+        .order_by("sync_seq")[: page_size + 1]
+    )
+    tombstones = []
+    if since > 0:
+        tombstones = list(
+            AlbumTombstone.objects.filter(user=user, seq__gt=since, seq__lte=last_seq)
+            .order_by("seq")
+            .values_list("seq", "album_id")[: page_size + 1]
+        )
+        # Read after the tombstones: a compaction that removed some of them
+        # meanwhile has raised it already.
+        compacted_seq = (
+            SyncState.objects.filter(user=user)
+            .values_list("compacted_seq", flat=True)
+            .first()
+        )
+        if compacted_seq is not None and since < compacted_seq:
+            raise SyncTokenExpiredError
+    changes = sorted(
+        [(album.sync_seq, album) for album in albums] + tombstones,
+        key=lambda change: change[0],
+    )
+    page = changes[:page_size]
+    return Changes(
+        albums=[change for _, change in page if not isinstance(change, int)],
+        deleted=[change for _, change in page if isinstance(change, int)],
+        token=page[-1][0] if page else since,
+        has_more=len(changes) > page_size,
+    )
+
+
+def compact_tombstones(retention_days=None, batch_size=1000):
+    """Deletes the tombstones older than the retention window.
+
+    Returns the number of tombstones deleted. Tokens from before the newest
+    deleted tombstone of a user are refused from then on.
+    """
+    if retention_days is None:
+        retention_days = settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    before = timezone.now() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                AlbumTombstone.objects.filter(deleted_at__lt=before)
+                .order_by("pk")
+                .values_list("pk", "user_id", "seq")[:batch_size]
+            )
+            if not batch:
+                return deleted
+            newest = {}
+            for _, user_id, seq in batch:
+                newest[user_id] = max(newest.get(user_id, 0), seq)
+            for user_id, seq in newest.items():
+                SyncState.objects.filter(pk=user_id, compacted_seq__lt=seq).update(
+                    compacted_seq=seq
+                )
+            AlbumTombstone.objects.filter(pk__in=[pk for pk, _, _ in batch]).delete()
+        deleted += len(batch)
@@ -0,0 +1,68 @@
+"""Change feed of the albums of a user, for clients that sync incrementally.
+
+Every album write takes the next number of its user's change sequence and
+stores it in `Album.sync_seq`; a delete leaves an `AlbumTombstone` with its
+own number. A client remembers the highest number it has seen and asks for
+everything above it (see `changes.changes_since`).
+"""
+
+from django.db import models
+from django.utils import timezone
+
+
+class SyncStateManager(models.Manager):
+    def reserve(self, user_id, count=1):
+        """Reserves the next `count` sequence numbers of a user, returning the
+        last one.
+
+        Call it in the transaction of the write: the state row stays locked
+        until the commit, so the writes of a user commit in the order of their
+        numbers and a client never skips a number that commits later.
+        """
+        if not self.filter(pk=user_id).update(last_seq=models.F("last_seq") + count):
+            self.bulk_create([self.model(user_id=user_id)], ignore_conflicts=True)
+            self.filter(pk=user_id).update(last_seq=models.F("last_seq") + count)
+        return self.filter(pk=user_id).values_list("last_seq", flat=True).get()
+
+    def sequence(self, user_id, albums):
+        """Numbers the changes of albums of a user, in the given order."""
+        if not albums:
+            return
+        last_seq = self.reserve(user_id, len(albums))
+        for seq, album in enumerate(albums, start=last_seq - len(albums) + 1):
+            album.sync_seq = seq
+
+
+class SyncState(models.Model):
+    """Change sequence of a user.
+
+    `compacted_seq` is the highest number of the compacted tombstones; a
+    client that has only seen older changes may have missed deletes and has
+    to sync all albums again.
+    """
+
+    objects = SyncStateManager()
+    user = models.OneToOneField(
+        "User", models.CASCADE, primary_key=True, related_name="sync_state"
+    )
+    last_seq = models.BigIntegerField(default=0)
+    compacted_seq = models.BigIntegerField(default=0)
+
+
+class AlbumTombstone(models.Model):
+    """A deleted album, kept for SYNC_TOMBSTONE_RETENTION_DAYS."""
+
+    user = models.ForeignKey("User", models.CASCADE, related_name="+")
+    album_id = models.BigIntegerField()
+    seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "seq"], name="album_tombstone_user_seq_uniq"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["deleted_at"], name="album_tombstone_deleted_idx")
+        ]
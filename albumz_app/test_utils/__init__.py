@@ -1,6 +1,7 @@
 from .fixtures import (
     albums_factory,
     auth_user,
+    clear_cache,
     domain_user,
     form_data_factory,
     test_password,
@@ -8,6 +9,7 @@ from .fixtures import (
 )
 
 __all__ = [
+    "clear_cache",
     "test_password",
     "user_factory",
     "auth_user",
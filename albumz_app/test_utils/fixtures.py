@@ -2,6 +2,7 @@ from random import randint
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 
 from ..constants import TEST_PASSWORD
 from ..test_utils.utils import (
@@ -16,6 +17,15 @@ user_password = TEST_PASSWORD
 username = "testuser"
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    for cache in caches.all():
+        cache.clear()
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture
 def test_password():
     return user_password
@@ -0,0 +1,87 @@
+"""Query plan inspection for the query plan regression tests.
+
+The plans are captured with the `EXPLAIN` of the database the tests run on:
+`EXPLAIN QUERY PLAN` on SQLite, and `EXPLAIN (ANALYZE, FORMAT JSON)` on
+PostgreSQL, which also shows whether a sort spilled to disk.
+"""
+
+import json
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+APP_TABLE_PREFIX = "albumz_app_"
+
+
+def capture_queries(run, table):
+    """SQL of the queries that `run()` sends to `table`."""
+    with CaptureQueriesContext(connection) as captured:
+        run()
+    return [
+        query["sql"]
+        for query in captured.captured_queries
+        if query["sql"].startswith("SELECT") and f'"{table}"' in query["sql"]
+    ]
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+class QueryPlan:
+    def __init__(self, sql):
+        self.sql = sql
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + sql)
+                plan = cursor.fetchone()[0]
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                self.nodes = list(_plan_nodes(plan[0]["Plan"]))
+                self.text = json.dumps(plan, indent=2)
+            else:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                self.nodes = [row[-1] for row in cursor.fetchall()]
+                self.text = "\n".join(self.nodes)
+
+    def __str__(self):
+        return f"{self.sql}\n{self.text}"
+
+    def full_scans(self):
+        """App tables read in full instead of through an index."""
+        if connection.vendor == "postgresql":
+            return [
+                node["Relation Name"]
+                for node in self.nodes
+                if node["Node Type"] == "Seq Scan"
+                and node["Relation Name"].startswith(APP_TABLE_PREFIX)
+            ]
+        # "SCAN table USING INDEX" walks the whole index, which is a full scan too.
+        return [
+            match.group(1)
+            for detail in self.nodes
+            if (match := re.match(rf"SCAN ({APP_TABLE_PREFIX}\w+)", detail))
+        ]
+
+    def disk_sorts(self):
+        if connection.vendor != "postgresql":
+            # SQLite reports no sort spills in its plans.
+            return []
+        return [
+            node
+            for node in self.nodes
+            if node["Node Type"] in ("Sort", "Incremental Sort")
+            and node.get("Sort Space Type") == "Disk"
+        ]
+
+    def uses_index(self, name):
+        return name in self.text
+
+
+def assert_indexed(plan, index=None):
+    assert not plan.full_scans(), f"Full table scan:\n{plan}"
+    assert not plan.disk_sorts(), f"Sort spilled to disk:\n{plan}"
+    if index is not None:
+        assert plan.uses_index(index), f"{index} is not used:\n{plan}"
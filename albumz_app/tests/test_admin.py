@@ -0,0 +1,120 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from ..domain.models import Album
+from ..paginators import EstimatedCountPaginator
+from ..partitioning import AlbumPartitioner
+
+
+@pytest.fixture
+def admin_client(client, user_factory, test_password):
+    admin = user_factory(username="admin", is_staff=True, is_superuser=True)
+    client.login(username=admin.username, password=test_password)
+    return client
+
+
+class TestAlbumAdmin:
+    def test_changelist_does_not_count_all_albums_twice(
+        self, admin_client, albums_factory
+    ):
+        # Given
+        albums_factory(mix=True)
+        # When
+        response = admin_client.get(reverse("admin:albumz_app_album_changelist"))
+        # Then
+        assert response.status_code == 200
+        assert response.context["cl"].show_full_result_count is False
+
+    def test_search_matches_title_and_artist_prefixes(self, admin_client, domain_user):
+        # Given
+        abbey_road = domain_user.albums.create(
+            title="Abbey Road", artist="The Beatles", owned=True
+        )
+        odelay = domain_user.albums.create(title="Odelay", artist="Beck", owned=True)
+        domain_user.albums.create(title="Road to Nowhere", artist="X", owned=True)
+        url = reverse("admin:albumz_app_album_changelist")
+        # When
+        by_title = admin_client.get(url, {"q": "abbey r"})
+        by_artist = admin_client.get(url, {"q": "bec"})
+        # Then
+        assert list(by_title.context["cl"].result_list) == [abbey_road]
+        assert list(by_artist.context["cl"].result_list) == [odelay]
+
+    def test_search_matches_own_artist_spellings(
+        self, admin_client, domain_user, user_factory
+    ):
+        # Given
+        domain_user.albums.create(title="Abbey Road", artist="The Beatles", owned=True)
+        other_user = user_factory(username="otheruser").albumz_user
+        revolver = other_user.albums.create(
+            title="Revolver", artist="beatles", owned=True
+        )
+        url = reverse("admin:albumz_app_album_changelist")
+        # When
+        response = admin_client.get(url, {"q": "beatl"})
+        # Then
+        assert list(response.context["cl"].result_list) == [revolver]
+
+    def test_user_change_page_links_to_albums_instead_of_inline(
+        self, admin_client, albums_factory, domain_user
+    ):
+        # Given
+        albums_factory(owned=True)
+        # When
+        response = admin_client.get(
+            reverse("admin:albumz_app_user_change", args=[domain_user.pk])
+        )
+        # Then
+        assert response.status_code == 200
+        assert not response.context["inline_admin_formsets"]
+        assert f"?user__id__exact={domain_user.pk}" in response.content.decode()
+
+    def test_changelist_filtered_by_user(
+        self, admin_client, albums_factory, domain_user, user_factory
+    ):
+        # Given
+        albums = albums_factory(owned=True)
+        albums_factory(owned=True, user=user_factory(username="other").albumz_user)
+        # When
+        response = admin_client.get(
+            reverse("admin:albumz_app_album_changelist"),
+            {"user__id__exact": domain_user.pk},
+        )
+        # Then
+        assert set(response.context["cl"].result_list) == set(albums)
+
+
+class TestEstimatedCountPaginator:
+    def test_exact_count_without_estimate(self, albums_factory, domain_user):
+        albums = albums_factory(mix=True)
+        paginator = EstimatedCountPaginator(domain_user.albums.order_by("pk"), 2)
+        assert paginator.count == len(albums)
+
+    @pytest.mark.parametrize("estimate, expected", [(50_000, 50_000), (10, None)])
+    def test_large_estimates_replace_exact_count(
+        self, albums_factory, domain_user, monkeypatch, estimate, expected
+    ):
+        # Given
+        albums = albums_factory(mix=True)
+        monkeypatch.setattr(
+            EstimatedCountPaginator, "estimated_count", lambda self: estimate
+        )
+        paginator = EstimatedCountPaginator(domain_user.albums.order_by("pk"), 2)
+        # When/Then
+        assert paginator.count == (expected or len(albums))
+
+    @pytest.mark.skipif(
+        connection.vendor != "postgresql", reason="PostgreSQL row estimates"
+    )
+    @pytest.mark.parametrize("partitions", [0, 4])
+    def test_estimate_of_unfiltered_table(self, albums_factory, partitions):
+        # Given
+        albums = albums_factory(owned=True, count=8)
+        if partitions:
+            AlbumPartitioner(connection, partitions).run()
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE "{Album._meta.db_table}"')
+        paginator = EstimatedCountPaginator(Album.albums.order_by("pk"), 2)
+        # When/Then
+        assert paginator.estimated_count() == len(albums)
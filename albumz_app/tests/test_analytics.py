@@ -0,0 +1,254 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from pytest_django.asserts import assertRedirects
+
+from ..analytics.dashboard import collection_analytics
+from ..analytics.models import MonthlyRollup
+from ..analytics.rebuild import rebuild_rollups
+from ..constants import ReverseURLNames, URLNames
+from ..domain.models import Album, Genre, Rating, User
+from ..importers.importer import AlbumImporter, start_import
+from ..urls import app_name
+
+
+def rollups(user):
+    return sorted(
+        MonthlyRollup.objects.for_user(user).values_list(
+            "month", "genre", "rating", "decade", "albums"
+        ),
+        key=lambda row: (*row[:3], row[3] or 0),
+    )
+
+
+def this_month():
+    return date.today().replace(day=1)
+
+
+class TestRollupsOnWrites:
+    def test_collection_albums_are_rolled_up(self, domain_user):
+        # When
+        domain_user.add_to_collection(
+            Album(
+                title="A",
+                artist="X",
+                genre=Genre.ROCK,
+                user_rating=Rating.GOOD,
+                pub_date=date(1971, 5, 1),
+            )
+        )
+        domain_user.add_to_collection(
+            Album(
+                title="B",
+                artist="X",
+                genre=Genre.ROCK,
+                user_rating=Rating.GOOD,
+                pub_date=date(1979, 1, 1),
+            )
+        )
+        domain_user.add_to_collection(Album(title="C", artist="X"))
+        domain_user.add_to_wishlist(Album(title="D", artist="X"))
+        # Then
+        assert rollups(domain_user) == [
+            (this_month(), Genre.OTHER, Rating.NO_OPINION_YET, None, 1),
+            (this_month(), Genre.ROCK, Rating.GOOD, 1970, 2),
+        ]
+
+    def test_moved_album_is_rolled_up(self, domain_user):
+        # Given
+        album = Album(title="A", artist="X")
+        domain_user.add_to_wishlist(album)
+        # When
+        domain_user.move_to_collection(album.pk)
+        # Then
+        assert rollups(domain_user) == [
+            (this_month(), Genre.OTHER, Rating.NO_OPINION_YET, None, 1)
+        ]
+
+    def test_edited_album_moves_between_rollups(self, domain_user):
+        # Given
+        album = Album(title="A", artist="X")
+        domain_user.add_to_collection(album)
+        edited = Album(
+            title="A",
+            artist="X",
+            genre=Genre.JAZZ,
+            user_rating=Rating.BEST,
+            pub_date=date(1959, 8, 17),
+        )
+        # When
+        domain_user.edit_album(album, edited)
+        # Then
+        assert rollups(domain_user) == [
+            (this_month(), Genre.JAZZ, Rating.BEST, 1950, 1)
+        ]
+
+    def test_deleted_album_is_removed_from_rollups(self, domain_user):
+        # Given
+        albums = [Album(title=title, artist="X") for title in "AB"]
+        for album in albums:
+            domain_user.add_to_collection(album)
+        # When
+        albums[0].delete()
+        # Then
+        assert rollups(domain_user) == [
+            (this_month(), Genre.OTHER, Rating.NO_OPINION_YET, None, 1)
+        ]
+
+    def test_imported_albums_are_rolled_up(self, domain_user, tmp_path):
+        # Given
+        domain_user.add_to_wishlist(Album(title="Wished", artist="X"))
+        path = tmp_path / "export.csv"
+        path.write_text(
+            "title,artist,genre,rating,owned\n"
+            "Wished,X,rock,4,yes\n"
+            "New,X,rock,4,yes\n"
+            "Later,X,rock,4,no\n",
+            encoding="utf-8",
+        )
+        # When
+        AlbumImporter(start_import(domain_user, path)).import_all()
+        # Then
+        assert rollups(domain_user) == [
+            (this_month(), Genre.OTHER, Rating.NO_OPINION_YET, None, 1),
+            (this_month(), Genre.ROCK, Rating.GOOD, None, 1),
+        ]
+
+
+class TestRebuild:
+    @pytest.fixture
+    def collection(self, domain_user, user_factory):
+        other_user = user_factory(username="otheruser").albumz_user
+        for user in (domain_user, other_user):
+            for title, pub_date in [("A", date(1965, 1, 1)), ("B", None)]:
+                user.add_to_collection(
+                    Album(title=title, artist="X", pub_date=pub_date)
+                )
+        domain_user.albums.filter(title="A").update(add_date=date(2024, 2, 29))
+        return domain_user, other_user
+
+    def test_rebuild_recomputes_the_rollups(self, collection):
+        # Given
+        domain_user, other_user = collection
+        MonthlyRollup.objects.filter(user=other_user).update(albums=7)
+        # When
+        written = rebuild_rollups(batch_size=1)
+        # Then
+        assert written == 4
+        assert rollups(domain_user) == [
+            (date(2024, 2, 1), Genre.OTHER, Rating.NO_OPINION_YET, 1960, 1),
+            (this_month(), Genre.OTHER, Rating.NO_OPINION_YET, None, 1),
+        ]
+        assert [row[-1] for row in rollups(other_user)] == [1, 1]
+
+    def test_rebuild_counts_writes_committed_while_it_waited(
+        self, collection, monkeypatch
+    ):
+        # Given
+        domain_user, _ = collection
+        lock_users = MonthlyRollup.objects.lock_users
+
+        def lock_after_a_write(user_ids, exclusive=False):
+            # A write of the user commits while the rebuild waits for the lock.
+            if exclusive:
+                Album.albums.filter(user=domain_user, title="B").update(
+                    genre=Genre.JAZZ
+                )
+            lock_users(user_ids, exclusive)
+
+        monkeypatch.setattr(MonthlyRollup.objects, "lock_users", lock_after_a_write)
+        # When
+        rebuild_rollups(User.objects.filter(pk=domain_user.pk))
+        # Then
+        assert [row[1] for row in rollups(domain_user)] == [Genre.OTHER, Genre.JAZZ]
+
+    def test_rebuild_command_for_one_user(self, collection):
+        # Given
+        output = StringIO()
+        # When
+        call_command("rebuild_rollups", "--user", "otheruser", stdout=output)
+        # Then
+        assert output.getvalue() == "2 rollup rows written.\n"
+
+
+class TestDashboard:
+    @pytest.fixture
+    def collection(self, domain_user):
+        for title, genre, rating, pub_date in [
+            ("A", Genre.ROCK, Rating.GOOD, date(1971, 1, 1)),
+            ("B", Genre.ROCK, Rating.BEST, date(1975, 1, 1)),
+            ("C", Genre.JAZZ, Rating.GOOD, None),
+        ]:
+            domain_user.add_to_collection(
+                Album(
+                    title=title,
+                    artist="X",
+                    genre=genre,
+                    user_rating=rating,
+                    pub_date=pub_date,
+                )
+            )
+        domain_user.albums.filter(title="A").update(add_date=date(2023, 12, 24))
+        rebuild_rollups()
+
+    def test_collection_analytics(self, domain_user, collection):
+        # When
+        analytics = collection_analytics(domain_user)
+        # Then
+        assert analytics["added_per_month"] == [
+            {"month": date(2023, 12, 1), "albums": 1},
+            {"month": this_month(), "albums": 2},
+        ]
+        assert analytics["genres_per_month"] == [
+            {"month": date(2023, 12, 1), "genres": {Genre.ROCK: 1}},
+            {"month": this_month(), "genres": {Genre.ROCK: 1, Genre.JAZZ: 1}},
+        ]
+        assert [entry["albums"] for entry in analytics["ratings"]] == [
+            0,
+            0,
+            0,
+            0,
+            2,
+            0,
+            1,
+        ]
+        assert analytics["decades"] == [
+            {"decade": None, "albums": 1},
+            {"decade": 1970, "albums": 2},
+        ]
+
+    def test_collection_analytics_reads_only_rollups(
+        self, domain_user, collection, django_assert_num_queries
+    ):
+        # One query per chart, however many albums are rolled up.
+        with django_assert_num_queries(4):
+            collection_analytics(domain_user)
+
+    def test_dashboard_requires_login(self, client):
+        response = client.get(reverse(ReverseURLNames.ANALYTICS))
+        assertRedirects(
+            response, f"/accounts/login/?next=/{app_name}/{URLNames.ANALYTICS}/"
+        )
+
+    def test_dashboard(self, auth_client, collection):
+        # When
+        response = auth_client.get(reverse(ReverseURLNames.ANALYTICS))
+        # Then
+        assert response.status_code == 200
+        assert [bar["label"] for bar in response.context["decades"]] == [
+            "Unknown",
+            "1970s",
+        ]
+        assert response.context["added_per_month"][0] == {
+            "label": "2023-12",
+            "albums": 1,
+            "share": 50.0,
+        }
+        assert b"Genres per month" in response.content
+
+    def test_empty_dashboard(self, auth_client):
+        response = auth_client.get(reverse(ReverseURLNames.ANALYTICS))
+        assert b"No albums in your collection yet." in response.content
@@ -0,0 +1,232 @@
+from io import BytesIO
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from ..constants import ResponseStrings, ReverseURLNames
+from ..covers.models import Cover, CoverStatus, thumbnail_name
+from ..covers.thumbnails import generate_thumbnails
+from ..covers.uploads import attach_cover, validate_cover
+from ..domain.models import Album
+from ..jobs.models import Job
+from ..jobs.queue import claim_next, run_job
+
+
+def image_file(color="red", size=(600, 400), image_format="PNG", name="cover.png"):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.COVER_ORIGINALS_ROOT = tmp_path / "originals"
+    return settings.MEDIA_ROOT
+
+
+@pytest.fixture
+def album(domain_user):
+    return domain_user.albums.create(
+        title="Kind of Blue", artist="Miles Davis", owned=True
+    )
+
+
+class TestCoverStorage:
+    def test_identical_covers_are_stored_once(self, media_root, domain_user, settings):
+        # Given
+        first = domain_user.albums.create(title="A", artist="X", owned=True)
+        second = domain_user.albums.create(title="B", artist="X", owned=True)
+        # When
+        first_job = attach_cover(first, image_file())
+        second_job = attach_cover(second, image_file(name="copy.png"))
+        # Then
+        assert first_job is not None
+        assert second_job is None
+        cover = Cover.objects.get()
+        assert first.cover == second.cover == cover
+        originals = settings.COVER_ORIGINALS_ROOT
+        assert list(originals.rglob("original*")) == [originals / cover.original]
+        assert not list(media_root.rglob("original*"))
+
+    def test_different_covers_are_stored_apart(self, media_root, domain_user):
+        # Given
+        first = domain_user.albums.create(title="A", artist="X", owned=True)
+        second = domain_user.albums.create(title="B", artist="X", owned=True)
+        # When
+        attach_cover(first, image_file("red"))
+        attach_cover(second, image_file("blue"))
+        # Then
+        assert Cover.objects.count() == 2
+        assert first.cover.sha256 != second.cover.sha256
+
+    def test_cover_urls_are_empty_until_thumbnails_exist(self, media_root, album):
+        # When
+        attach_cover(album, image_file())
+        # Then
+        assert album.cover.status == CoverStatus.PENDING
+        assert album.cover_urls == {}
+        assert album.cover_url is None
+
+
+class TestThumbnails:
+    def test_thumbnails_are_generated_in_every_size_and_format(
+        self, media_root, album, settings
+    ):
+        # Given
+        attach_cover(album, image_file(size=(1200, 800)))
+        cover = album.cover
+        # When
+        generate_thumbnails(cover)
+        # Then
+        cover.refresh_from_db()
+        assert cover.status == CoverStatus.READY
+        assert (cover.width, cover.height) == (1200, 800)
+        for size, pixels in settings.COVER_THUMBNAIL_SIZES.items():
+            for image_format in ["webp", "jpeg"]:
+                with (
+                    default_storage.open(
+                        thumbnail_name(cover.sha256, size, image_format)
+                    ) as file,
+                    Image.open(file) as thumbnail,
+                ):
+                    assert thumbnail.format == image_format.upper()
+                    assert thumbnail.size == (pixels, pixels)
+        album.refresh_from_db()
+        assert album.cover_url == default_storage.url(
+            thumbnail_name(cover.sha256, "large", "jpeg")
+        )
+
+    def test_regenerating_thumbnails_overwrites_them(self, media_root, album):
+        # Given
+        attach_cover(album, image_file())
+        generate_thumbnails(album.cover)
+        # When
+        generate_thumbnails(album.cover)
+        # Then
+        names = {path.name for path in (media_root / "covers").rglob("*.*")}
+        assert names == {"small.webp", "small.jpeg", "large.webp", "large.jpeg"}
+
+    def test_undecodable_cover_fails(self, media_root, album):
+        # Given
+        attach_cover(album, SimpleUploadedFile("cover.png", b"\x89PNG\r\n\x1a\nbroken"))
+        # When
+        generate_thumbnails(album.cover)
+        # Then
+        album.cover.refresh_from_db()
+        assert album.cover.status == CoverStatus.FAILED
+        assert album.cover_urls == {}
+
+    def test_oversized_cover_fails(self, media_root, album, settings):
+        # Given
+        settings.COVER_MAX_PIXELS = 100
+        attach_cover(album, image_file(size=(20, 20)))
+        # When
+        generate_thumbnails(album.cover)
+        # Then
+        album.cover.refresh_from_db()
+        assert album.cover.status == CoverStatus.FAILED
+
+    def test_thumbnail_job_processes_the_cover(self, media_root, album):
+        # Given
+        attach_cover(album, image_file())
+        # When
+        run_job(claim_next("test-worker"))
+        # Then
+        job = Job.objects.get()
+        assert job.name == "covers.thumbnails"
+        assert job.result["status"] == CoverStatus.READY
+
+
+class TestValidateCover:
+    @pytest.mark.parametrize(
+        "image_format, name", [("JPEG", "a.jpg"), ("PNG", "a.png"), ("WEBP", "a.webp")]
+    )
+    def test_images_are_accepted(self, image_format, name):
+        validate_cover(image_file(image_format=image_format, name=name))
+
+    def test_other_files_are_rejected(self):
+        with pytest.raises(ValidationError) as error:
+            validate_cover(SimpleUploadedFile("cover.png", b"<svg></svg>"))
+        assert error.value.messages == [ResponseStrings.COVER_FORMAT_ERROR]
+
+    def test_large_files_are_rejected(self, settings):
+        settings.COVER_MAX_UPLOAD_SIZE = 10
+        with pytest.raises(ValidationError) as error:
+            validate_cover(image_file())
+        assert error.value.messages == [ResponseStrings.COVER_TOO_LARGE_ERROR]
+
+
+class TestCoverUploadView:
+    def test_edit_form_upload_queues_thumbnails(
+        self, media_root, auth_client, album, form_data_factory
+    ):
+        # Given
+        data = form_data_factory(title=album.title, artist=album.artist)
+        # When
+        response = auth_client.post(
+            reverse(ReverseURLNames.EDIT, args=[album.pk]),
+            {**data, "cover_image": image_file()},
+        )
+        # Then
+        assert response.status_code == 302
+        album.refresh_from_db()
+        assert album.cover is not None
+        job = Job.objects.get()
+        assert job.payload == {"cover_id": album.cover_id}
+
+    def test_edit_form_saves_the_album_once(
+        self, media_root, auth_client, album, form_data_factory
+    ):
+        # Given
+        data = form_data_factory(title="Kind of Blue (Legacy)", artist=album.artist)
+        # When
+        with CaptureQueriesContext(connection) as captured:
+            auth_client.post(
+                reverse(ReverseURLNames.EDIT, args=[album.pk]),
+                {**data, "cover_image": image_file()},
+            )
+        # Then
+        table = Album._meta.db_table
+        updates = [
+            query["sql"]
+            for query in captured.captured_queries
+            if query["sql"].startswith(f'UPDATE "{table}"')
+        ]
+        assert len(updates) == 1
+        album.refresh_from_db()
+        assert album.title == "Kind of Blue (Legacy)"
+        assert album.cover is not None
+
+    def test_edit_form_rejects_other_files(
+        self, media_root, auth_client, album, form_data_factory
+    ):
+        # Given
+        data = form_data_factory(title=album.title, artist=album.artist)
+        # When
+        response = auth_client.post(
+            reverse(ReverseURLNames.EDIT, args=[album.pk]),
+            {**data, "cover_image": SimpleUploadedFile("cover.txt", b"text")},
+        )
+        # Then
+        assert response.status_code == 200
+        assert ResponseStrings.COVER_FORMAT_ERROR in response.content.decode()
+        assert Album.albums.get(pk=album.pk).cover is None
+
+    def test_table_lazy_loads_thumbnails(self, media_root, auth_client, domain_user):
+        # Given
+        album = domain_user.albums.create(title="A", artist="X", owned=True)
+        attach_cover(album, image_file())
+        generate_thumbnails(album.cover)
+        # When
+        response = auth_client.get(reverse(ReverseURLNames.COLLECTION))
+        # Then
+        content = response.content.decode()
+        assert 'loading="lazy"' in content
+        assert thumbnail_name(album.cover.sha256, "small", "webp") in content
@@ -0,0 +1,342 @@
+import io
+import json
+import os
+import time
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+
+from ..domain.models import Album, Genre, Rating
+from ..importers import readers
+from ..importers.importer import (
+    AlbumImporter,
+    delete_upload,
+    purge_uploads,
+    start_import,
+)
+from ..importers.mapping import (
+    InvalidRecordError,
+    map_record,
+    normalize_genre,
+    normalize_rating,
+)
+from ..importers.readers import (
+    RecordTooLargeError,
+    iter_csv_records,
+    iter_json_records,
+    iter_records,
+)
+from ..test_utils.utils import future_date
+
+
+class TestRecordMapping:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("rock", Genre.ROCK),
+            ("Hip Hop", Genre.HIPHOP),
+            ("hip-hop", Genre.HIPHOP),
+            ("Rap", Genre.HIPHOP),
+            ("Jazz; Swing", Genre.JAZZ),
+            ("Polka", Genre.OTHER),
+            (None, Genre.OTHER),
+        ],
+    )
+    def test_normalize_genre(self, value, expected):
+        assert normalize_genre(value) == expected
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("5", Rating.EXCELLENT),
+            (4, Rating.GOOD),
+            ("10", Rating.BEST),
+            ("50", Rating.AVERAGE),
+            ("terrible", Rating.TERRIBLE),
+            ("", Rating.NO_OPINION_YET),
+            ("n/a", Rating.NO_OPINION_YET),
+            ("-3", Rating.NO_OPINION_YET),
+        ],
+    )
+    def test_normalize_rating(self, value, expected):
+        assert normalize_rating(value) == expected
+
+    def test_map_record_with_aliased_columns(self):
+        # When
+        data = map_record(
+            {
+                "Album": "Rust In Peace",
+                "Artist Name": "Megadeth",
+                "Year": "1990",
+                "Style": "metal",
+                "My Rating": "6",
+                "Status": "Wishlist",
+            }
+        )
+        # Then
+        assert data == {
+            "title": "Rust In Peace",
+            "artist": "Megadeth",
+            "pub_date": date(1990, 1, 1),
+            "genre": Genre.ROCK,
+            "user_rating": Rating.BEST,
+            "owned": False,
+        }
+
+    def test_map_record_uses_default_ownership(self):
+        data = map_record({"title": "Kind of Blue", "artist": "Miles Davis"}, False)
+        assert data["owned"] is False
+
+    def test_map_record_wishlist_column(self):
+        data = map_record({"title": "Ride", "artist": "Ride", "wishlist": "yes"})
+        assert data["owned"] is False
+
+    @pytest.mark.parametrize(
+        "record",
+        [
+            {"title": "", "artist": "Megadeth"},
+            {"title": "Rust In Peace"},
+            {"title": "x" * 251, "artist": "Megadeth"},
+            {"title": "Rust In Peace", "artist": "Megadeth", "year": "someday"},
+            ["not", "an", "object"],
+        ],
+    )
+    def test_map_record_invalid(self, record):
+        with pytest.raises(InvalidRecordError):
+            map_record(record)
+
+    def test_map_record_names_the_missing_artist_field(self):
+        with pytest.raises(InvalidRecordError, match="Missing artist."):
+            map_record({"title": "Rust In Peace"})
+
+    def test_map_record_future_pub_date_is_invalid(self):
+        with pytest.raises(InvalidRecordError):
+            map_record({"title": "T", "artist": "A", "date": future_date().isoformat()})
+
+
+class TestReaders:
+    records = [{"title": f"Album {i}", "artist": 'Artist, "Thé"'} for i in range(50)]
+
+    def read(self, reader, content, start=0):
+        stream = io.BytesIO(content.encode())
+        return [record for record, _ in reader(stream, start)]
+
+    def test_iter_json_array_across_read_boundaries(self, monkeypatch):
+        # Given
+        monkeypatch.setattr(readers, "READ_SIZE", 7)
+        content = json.dumps(self.records, indent=2, ensure_ascii=False)
+        # When/Then
+        assert self.read(iter_json_records, content) == self.records
+
+    def test_iter_json_lines(self, monkeypatch):
+        # Given
+        monkeypatch.setattr(readers, "READ_SIZE", 5)
+        content = "\n".join(json.dumps(r) for r in self.records) + "\n"
+        # When/Then
+        assert self.read(iter_json_records, content) == self.records
+
+    @pytest.mark.parametrize("content", ["", "[]", "  [ ]  "])
+    def test_iter_json_empty(self, content):
+        assert self.read(iter_json_records, content) == []
+
+    def test_iter_json_truncated_document_raises(self):
+        with pytest.raises(ValueError):
+            self.read(iter_json_records, '[{"title": "A"}, {"title": ')
+
+    def test_iter_json_stops_at_an_unterminated_record(self, monkeypatch):
+        # Given
+        monkeypatch.setattr(readers, "READ_SIZE", 10)
+        monkeypatch.setattr(readers, "MAX_RECORD_SIZE", 100)
+        stream = io.BytesIO(b'[{"title": "A"}, {"title": "' + b"x" * 10_000 + b'"}]')
+        records = iter_json_records(stream)
+        # When/Then
+        assert next(records)[0] == {"title": "A"}
+        with pytest.raises(RecordTooLargeError):
+            next(records)
+        assert stream.tell() < 200
+
+    def test_iter_csv_records(self):
+        content = 'title,artist\nAlbum 1,"Artist, ""Thé"""\n'
+        assert self.read(iter_csv_records, content) == [
+            self.records[0] | {"title": "Album 1"}
+        ]
+
+    @pytest.mark.parametrize(
+        "file_format, content",
+        [
+            ("json", json.dumps(records[:5], ensure_ascii=False)),
+            ("json", "\n".join(json.dumps(r) for r in records[:5])),
+            (
+                "csv",
+                "\ufefftitle,artist\n"
+                + "".join(f'{r["title"]},"Artist, ""Thé"""\r\n' for r in records[:5]),
+            ),
+        ],
+    )
+    def test_iter_records_resumes_at_offset(self, file_format, content):
+        # Given
+        stream = io.BytesIO(content.encode())
+        offsets = [offset for _, offset in iter_records(stream, file_format)]
+        # When
+        resumed = [
+            record for record, _ in iter_records(stream, file_format, start=offsets[1])
+        ]
+        # Then
+        assert resumed == self.records[2:5]
+        assert list(iter_records(stream, file_format, start=offsets[-1])) == []
+
+
+class TestAlbumImporter:
+    def write_csv(self, tmp_path, rows):
+        path = tmp_path / "export.csv"
+        lines = ["title,artist,genre,rating,owned"] + [",".join(row) for row in rows]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    def test_import_creates_albums_in_chunks(self, domain_user, tmp_path):
+        # Given
+        rows = [(f"Title {i}", f"Artist {i}", "rock", "4", "yes") for i in range(25)]
+        run = start_import(domain_user, self.write_csv(tmp_path, rows))
+        progress = []
+        # When
+        summary = AlbumImporter(
+            run,
+            chunk_size=10,
+            progress=lambda run: progress.append(run.records_processed),
+        ).import_all()
+        # Then
+        assert progress == [10, 20, 25]
+        assert summary["created"] == 25
+        assert domain_user.albums.in_collection().count() == 25
+        run.refresh_from_db()
+        assert run.finished_at is not None
+        # Files outside of IMPORTS_ROOT are not uploads
+        assert os.path.exists(run.source)
+
+    def test_import_dedupes_against_existing_and_within_file(
+        self, domain_user, tmp_path
+    ):
+        # Given
+        domain_user.albums.create(title="Owned", artist="A", owned=True)
+        domain_user.albums.create(title="Wished", artist="A", owned=False)
+        rows = [
+            ("Owned", "A", "rock", "1", "yes"),
+            ("Wished", "A", "rock", "1", "yes"),
+            ("New", "A", "rock", "1", "no"),
+            ("New", "A", "rock", "1", "yes"),
+            ("", "A", "rock", "1", "yes"),
+        ]
+        run = start_import(domain_user, self.write_csv(tmp_path, rows))
+        # When
+        summary = AlbumImporter(run, chunk_size=2).import_all()
+        # Then
+        assert summary == {
+            "records_processed": 5,
+            "created": 1,
+            "moved_to_collection": 1,
+            "duplicates": 2,
+            "invalid": 1,
+        }
+        assert domain_user.albums.get(title="Wished").owned is True
+        assert domain_user.albums.filter(title="New").count() == 1
+
+    def test_import_resumes_after_last_committed_chunk(
+        self, domain_user, tmp_path, monkeypatch
+    ):
+        # Given
+        rows = [(f"Title {i}", "Artist", "jazz", "3", "yes") for i in range(30)]
+        run = start_import(domain_user, self.write_csv(tmp_path, rows))
+        original_import_chunk = AlbumImporter.import_chunk
+        calls = []
+
+        def crashing_import_chunk(importer, records, source_offset):
+            calls.append(len(records))
+            if len(calls) == 2:
+                raise RuntimeError("worker killed")
+            original_import_chunk(importer, records, source_offset)
+
+        monkeypatch.setattr(AlbumImporter, "import_chunk", crashing_import_chunk)
+        with pytest.raises(RuntimeError):
+            AlbumImporter(run, chunk_size=10).import_all()
+        run.refresh_from_db()
+        assert run.records_processed == 10
+        assert 0 < run.source_offset < os.path.getsize(run.source)
+        monkeypatch.setattr(AlbumImporter, "import_chunk", original_import_chunk)
+        # When
+        summary = AlbumImporter(run, chunk_size=10).import_all()
+        # Then
+        assert summary["records_processed"] == 30
+        assert summary["created"] == 30
+        assert Album.albums.for_user(domain_user).count() == 30
+
+    def test_import_json_file(self, domain_user, tmp_path):
+        # Given
+        path = tmp_path / "export.json"
+        path.write_text(
+            json.dumps([{"name": "Blue Train", "band": "John Coltrane", "owned": True}])
+        )
+        run = start_import(domain_user, path)
+        # When
+        AlbumImporter(run).import_all()
+        # Then
+        album = domain_user.albums.get()
+        assert (album.title, album.artist, album.owned) == (
+            "Blue Train",
+            "John Coltrane",
+            True,
+        )
+
+
+class TestUploadCleanup:
+    @pytest.fixture
+    def imports_root(self, settings, tmp_path):
+        settings.IMPORTS_ROOT = tmp_path / "imports"
+        settings.IMPORTS_ROOT.mkdir()
+        return settings.IMPORTS_ROOT
+
+    def store(self, directory, name, age_days=0):
+        path = directory / name
+        path.write_text("title,artist\n")
+        stored_at = time.time() - age_days * 24 * 60 * 60
+        os.utime(path, (stored_at, stored_at))
+        return path
+
+    def test_only_uploads_are_deleted(self, imports_root, tmp_path):
+        # Given
+        upload = self.store(imports_root, "upload.csv")
+        local = self.store(tmp_path, "local.csv")
+        # When
+        delete_upload(upload)
+        delete_upload(local)
+        # Then
+        assert not upload.exists()
+        assert local.exists()
+
+    def test_old_uploads_are_purged(self, imports_root):
+        # Given
+        self.store(imports_root, "old.csv", age_days=8)
+        self.store(imports_root, "recent.csv", age_days=1)
+        # When
+        deleted = purge_uploads(retention_days=7)
+        # Then
+        assert deleted == 1
+        assert [path.name for path in imports_root.iterdir()] == ["recent.csv"]
+
+    def test_zero_retention_purges_all_uploads(self, imports_root, settings):
+        # Given
+        settings.IMPORT_UPLOAD_RETENTION_DAYS = 7
+        self.store(imports_root, "recent.csv", age_days=0.01)
+        # When
+        deleted = purge_uploads(retention_days=0)
+        # Then
+        assert deleted == 1
+
+    def test_purge_import_uploads_command(self, imports_root):
+        # Given
+        self.store(imports_root, "old.csv", age_days=30)
+        out = io.StringIO()
+        # When
+        call_command("purge_import_uploads", stdout=out)
+        # Then
+        assert "1 uploads deleted." in out.getvalue()
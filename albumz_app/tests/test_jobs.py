@@ -0,0 +1,245 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from ..domain.models import Album
+from ..jobs import queue
+from ..jobs.models import Job, JobStatus
+from ..jobs.queue import (
+    STALE_JOB_ERROR,
+    Worker,
+    claim_next,
+    enqueue,
+    register,
+    requeue_stale,
+    run_job,
+)
+
+WORKER_ID = "test-worker"
+
+
+@register("tests.succeed")
+def succeed(job):
+    job.report_progress(1, 1)
+    return {"echo": job.payload.get("value")}
+
+
+@register("tests.fail")
+def fail(job):
+    raise RuntimeError("boom")
+
+
+class TestJobQueue:
+    def test_enqueue_unknown_job_raises(self, db):
+        with pytest.raises(KeyError):
+            enqueue("tests.does_not_exist")
+
+    def test_enqueue_creates_queued_job(self, domain_user):
+        # When
+        job = enqueue("tests.succeed", user=domain_user, payload={"value": 1})
+        # Then
+        job.refresh_from_db()
+        assert job.status == JobStatus.QUEUED
+        assert job.user == domain_user
+        assert job.payload == {"value": 1}
+
+    def test_claim_next_marks_job_running(self, db):
+        # Given
+        job = enqueue("tests.succeed")
+        # When
+        claimed = claim_next(WORKER_ID)
+        # Then
+        assert claimed.pk == job.pk
+        assert claimed.status == JobStatus.RUNNING
+        assert claimed.locked_by == WORKER_ID
+        assert claimed.attempts == 1
+        assert claim_next(WORKER_ID) is None
+
+    def test_claim_next_skips_jobs_not_due_yet(self, db):
+        # Given
+        job = enqueue("tests.succeed")
+        Job.objects.filter(pk=job.pk).update(
+            run_after=timezone.now() + timedelta(minutes=5)
+        )
+        # When/Then
+        assert claim_next(WORKER_ID) is None
+
+    def test_claim_next_takes_oldest_job_first(self, db):
+        # Given
+        first = enqueue("tests.succeed")
+        enqueue("tests.succeed")
+        # When/Then
+        assert claim_next(WORKER_ID).pk == first.pk
+
+    def test_run_job_success(self, db):
+        # Given
+        enqueue("tests.succeed", payload={"value": "x"})
+        job = claim_next(WORKER_ID)
+        # When
+        run_job(job)
+        # Then
+        job.refresh_from_db()
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result == {"echo": "x"}
+        assert job.progress_done == job.progress_total == 1
+        assert job.finished_at is not None
+
+    def test_run_job_failure_schedules_retry_with_backoff(self, db, settings):
+        # Given
+        settings.JOB_RETRY_BACKOFF = 10
+        enqueue("tests.fail", max_attempts=3)
+        job = claim_next(WORKER_ID)
+        before = timezone.now()
+        # When
+        run_job(job)
+        # Then
+        job.refresh_from_db()
+        assert job.status == JobStatus.QUEUED
+        assert "boom" in job.error
+        assert job.run_after >= before + timedelta(seconds=10)
+        assert claim_next(WORKER_ID) is None
+
+    def test_backoff_grows_exponentially(self, db, settings):
+        # Given
+        settings.JOB_RETRY_BACKOFF = 10
+        job = enqueue("tests.fail", max_attempts=5)
+        Job.objects.filter(pk=job.pk).update(attempts=2)
+        job = claim_next(WORKER_ID)
+        before = timezone.now()
+        # When
+        run_job(job)
+        # Then
+        job.refresh_from_db()
+        assert job.run_after >= before + timedelta(seconds=40)
+
+    def test_run_job_failure_after_last_attempt(self, db):
+        # Given
+        enqueue("tests.fail", max_attempts=1)
+        job = claim_next(WORKER_ID)
+        # When
+        run_job(job)
+        # Then
+        job.refresh_from_db()
+        assert job.status == JobStatus.FAILED
+        assert job.is_finished()
+
+    def test_requeue_stale_jobs(self, db, settings):
+        # Given
+        settings.JOB_LOCK_TIMEOUT = 60
+        enqueue("tests.succeed")
+        job = claim_next(WORKER_ID)
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=120)
+        )
+        # When
+        requeued = requeue_stale()
+        # Then
+        job.refresh_from_db()
+        assert requeued == 1
+        assert job.status == JobStatus.QUEUED
+        assert job.locked_by == ""
+
+    def test_progress_reports_keep_long_jobs_locked(self, db, settings):
+        # Given
+        settings.JOB_LOCK_TIMEOUT = 60
+        enqueue("tests.succeed")
+        job = claim_next(WORKER_ID)
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=120)
+        )
+        # When
+        job.report_progress(5, 10)
+        requeued = requeue_stale()
+        # Then
+        job.refresh_from_db()
+        assert requeued == 0
+        assert job.status == JobStatus.RUNNING
+        assert job.progress_done == 5
+
+    def test_stale_jobs_fail_when_attempts_run_out(self, db, settings):
+        # Given
+        settings.JOB_LOCK_TIMEOUT = 60
+        enqueue("tests.succeed", max_attempts=2)
+        for _ in range(2):
+            job = claim_next(WORKER_ID)
+            Job.objects.filter(pk=job.pk).update(
+                locked_at=timezone.now() - timedelta(seconds=120)
+            )
+            # When
+            requeued = requeue_stale()
+        # Then
+        job.refresh_from_db()
+        assert requeued == 0
+        assert job.attempts == 2
+        assert job.status == JobStatus.FAILED
+        assert job.error == STALE_JOB_ERROR
+        assert job.is_finished()
+        assert claim_next(WORKER_ID) is None
+
+
+class TestBulkDeleteJob:
+    def test_bulk_delete_removes_only_own_albums(
+        self, domain_user, albums_factory, user_factory
+    ):
+        # Given
+        albums = albums_factory(mix=True)
+        other_user = user_factory(username="otheruser").albumz_user
+        other_albums = albums_factory(owned=True, user=other_user)
+        ids = [album.pk for album in albums[:-1] + other_albums]
+        enqueue("albums.bulk_delete", user=domain_user, payload={"album_ids": ids})
+        job = claim_next(WORKER_ID)
+        # When
+        run_job(job)
+        # Then
+        job.refresh_from_db()
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result == {"deleted": len(albums) - 1}
+        assert list(Album.albums.for_user(domain_user)) == [albums[-1]]
+        assert Album.albums.for_user(other_user).count() == len(other_albums)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWorker:
+    def test_heartbeat_refreshes_own_running_jobs(self, settings):
+        # Given
+        settings.JOB_LOCK_TIMEOUT = 60
+        worker = Worker()
+        jobs = [enqueue("tests.succeed") for _ in range(2)]
+        own = claim_next(worker.worker_id)
+        other = claim_next(WORKER_ID)
+        Job.objects.update(locked_at=timezone.now() - timedelta(seconds=120))
+        # When
+        refreshed = worker.heartbeat([job.pk for job in jobs])
+        requeue_stale()
+        # Then
+        own.refresh_from_db()
+        other.refresh_from_db()
+        assert refreshed == 1
+        assert own.status == JobStatus.RUNNING
+        assert other.status == JobStatus.QUEUED
+
+    def test_worker_logs_crashed_jobs(self, monkeypatch, caplog):
+        # Given
+        job = enqueue("tests.succeed")
+
+        def crash(job_id):
+            raise MemoryError
+
+        monkeypatch.setattr(queue, "_run_pooled_job", crash)
+        # When
+        Worker(concurrency=1, poll_interval=0.01).run(once=True)
+        # Then
+        job.refresh_from_db()
+        assert job.status == JobStatus.RUNNING
+        assert f"Running job #{job.pk} crashed." in caplog.text
+
+    def test_worker_runs_all_due_jobs_and_exits_once_idle(self):
+        # Given
+        jobs = [enqueue("tests.succeed", payload={"value": i}) for i in range(3)]
+        # When
+        Worker(concurrency=1, poll_interval=0.01).run(once=True)
+        # Then
+        for job in jobs:
+            job.refresh_from_db()
+            assert job.status == JobStatus.SUCCEEDED
@@ -0,0 +1,251 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from ..domain.models import Album, Genre, Rating
+from ..domain.normalization import album_match_key
+from ..importers.importer import AlbumImporter, start_import
+from ..jobs.handlers import bulk_delete_albums
+from ..jobs.queue import enqueue
+from ..leaderboards.models import ALL_GENRES, AlbumPopularity
+from ..leaderboards import reconcile as reconcile_module
+from ..leaderboards.reconcile import reconcile
+from ..recommendations.engine import representatives
+
+
+def counters(title, artist, genre=ALL_GENRES):
+    counter = AlbumPopularity.objects.get(
+        key=album_match_key(title, artist), genre=genre
+    )
+    return (
+        counter.owners,
+        counter.wishlisters,
+        counter.ratings,
+        counter.average_rating,
+    )
+
+
+def snapshot():
+    return sorted(
+        AlbumPopularity.objects.values_list(
+            "key", "genre", "owners", "wishlisters", "ratings", "average_rating"
+        )
+    )
+
+
+@pytest.fixture
+def collectors(user_factory):
+    return [
+        user_factory(username=f"collector{number}").albumz_user for number in range(3)
+    ]
+
+
+class TestPopularityCounters:
+    def test_added_albums_are_counted_overall_and_per_genre(self, collectors):
+        # When
+        collectors[0].add_to_collection(
+            Album(
+                title="Kind of Blue",
+                artist="Miles Davis",
+                genre=Genre.JAZZ,
+                user_rating=Rating.BEST,
+            )
+        )
+        collectors[1].add_to_collection(
+            Album(
+                title="kind of blue",
+                artist="miles davis",
+                genre=Genre.OTHER,
+                user_rating=Rating.GOOD,
+            )
+        )
+        collectors[2].add_to_wishlist(
+            Album(title="Kind of Blue", artist="Miles Davis", genre=Genre.JAZZ)
+        )
+        # Then
+        assert counters("Kind of Blue", "Miles Davis") == (2, 1, 2, 5.0)
+        assert counters("Kind of Blue", "Miles Davis", Genre.JAZZ) == (1, 1, 1, 6.0)
+        assert counters("Kind of Blue", "Miles Davis", Genre.OTHER) == (1, 0, 1, 4.0)
+        counter = AlbumPopularity.objects.get(genre=ALL_GENRES)
+        assert (counter.title, counter.artist) == ("Kind of Blue", "Miles Davis")
+
+    def test_moved_album_is_counted_as_owned(self, collectors):
+        # Given
+        album = Album(title="Blue Train", artist="John Coltrane")
+        collectors[0].add_to_wishlist(album)
+        # When
+        collectors[0].move_to_collection(album.pk)
+        # Then
+        assert counters("Blue Train", "John Coltrane") == (1, 0, 0, 0)
+
+    def test_edited_album_moves_its_counts(self, collectors):
+        # Given
+        album = Album(
+            title="Giant Steps",
+            artist="John Coltrane",
+            genre=Genre.OTHER,
+            user_rating=Rating.BAD,
+        )
+        collectors[0].add_to_collection(album)
+        edited = Album(
+            title="Giant Steps",
+            artist="John Coltrane",
+            genre=Genre.JAZZ,
+            user_rating=Rating.EXCELLENT,
+        )
+        # When
+        collectors[0].edit_album(album, edited)
+        # Then
+        assert counters("Giant Steps", "John Coltrane") == (1, 0, 1, 5.0)
+        assert counters("Giant Steps", "John Coltrane", Genre.JAZZ) == (1, 0, 1, 5.0)
+        assert counters("Giant Steps", "John Coltrane", Genre.OTHER) == (0, 0, 0, 0)
+
+    def test_renamed_album_is_counted_under_its_new_key(self, collectors):
+        # Given
+        album = Album(title="Giant Step", artist="John Coltrane")
+        collectors[0].add_to_collection(album)
+        # When
+        collectors[0].edit_album(
+            album, Album(title="Giant Steps", artist="John Coltrane")
+        )
+        # Then
+        assert counters("Giant Step", "John Coltrane") == (0, 0, 0, 0)
+        assert counters("Giant Steps", "John Coltrane") == (1, 0, 0, 0)
+
+    def test_deleted_albums_are_uncounted(self, collectors):
+        # Given
+        albums = []
+        for user in collectors:
+            album = Album(
+                title="Ballads", artist="John Coltrane", user_rating=Rating.GOOD
+            )
+            user.add_to_collection(album)
+            albums.append(album)
+        job = enqueue(
+            "albums.bulk_delete",
+            user=collectors[0],
+            payload={"album_ids": [albums[0].pk]},
+        )
+        # When
+        albums[1].delete()
+        bulk_delete_albums(job)
+        # Then
+        assert counters("Ballads", "John Coltrane") == (1, 0, 1, 4.0)
+
+    def test_imported_albums_are_counted(self, collectors, tmp_path):
+        # Given
+        collectors[0].add_to_wishlist(Album(title="Wished", artist="A"))
+        path = tmp_path / "export.csv"
+        path.write_text(
+            "title,artist,genre,rating,owned\n"
+            "Wished,A,rock,1,yes\n"
+            "New,A,jazz,4,yes\n",
+            encoding="utf-8",
+        )
+        # When
+        AlbumImporter(start_import(collectors[0], path)).import_all()
+        # Then
+        assert counters("Wished", "A") == (1, 0, 0, 0)
+        assert counters("New", "A") == (1, 0, 1, 4.0)
+        assert counters("New", "A", Genre.JAZZ) == (1, 0, 1, 4.0)
+
+
+class TestLeaderboards:
+    def test_highest_rated_needs_min_ratings(self, collectors):
+        # Given
+        for user in collectors:
+            user.add_to_collection(
+                Album(title="Popular", artist="A", user_rating=Rating.GOOD)
+            )
+        collectors[0].add_to_collection(
+            Album(title="Niche", artist="A", user_rating=Rating.BEST)
+        )
+        # When
+        ranked = AlbumPopularity.objects.highest_rated(min_ratings=1)
+        qualified = AlbumPopularity.objects.highest_rated(min_ratings=2)
+        # Then
+        assert [counter.title for counter in ranked] == ["Niche", "Popular"]
+        assert [counter.title for counter in qualified] == ["Popular"]
+
+    def test_most_owned_and_wishlisted_per_genre(self, collectors):
+        # Given
+        for user in collectors:
+            user.add_to_collection(Album(title="Rock", artist="A", genre=Genre.ROCK))
+        for user in collectors[:2]:
+            user.add_to_collection(Album(title="Pop", artist="A", genre=Genre.POP))
+        collectors[0].add_to_wishlist(Album(title="Wish", artist="A"))
+        # When
+        most_owned = AlbumPopularity.objects.most_owned()
+        most_owned_pop = AlbumPopularity.objects.most_owned(Genre.POP)
+        most_wishlisted = AlbumPopularity.objects.most_wishlisted()
+        # Then
+        assert [counter.title for counter in most_owned] == ["Rock", "Pop"]
+        assert [counter.title for counter in most_owned_pop] == ["Pop"]
+        assert [counter.title for counter in most_wishlisted] == ["Wish"]
+
+
+class TestReconciliation:
+    @pytest.fixture
+    def albums(self, collectors):
+        for number, user in enumerate(collectors):
+            for title in ["First", "Second", "Third", "Fourth"][: number + 2]:
+                user.add_to_collection(
+                    Album(title=title, artist="A", genre=Genre.ROCK, user_rating=number)
+                )
+        user.add_to_wishlist(Album(title="Fifth", artist="A"))
+
+    def test_consistent_counters_are_kept(self, albums):
+        # Given
+        counted = snapshot()
+        # When
+        corrected = reconcile(batch_size=2)
+        # Then
+        assert corrected == 0
+        assert snapshot() == counted
+
+    @pytest.mark.parametrize("batch_size", [1, 2, 1000])
+    def test_drift_is_corrected(self, albums, batch_size):
+        # Given
+        counted = snapshot()
+        AlbumPopularity.objects.filter(title="First").update(owners=10)
+        AlbumPopularity.objects.filter(title="Second").delete()
+        AlbumPopularity.objects.create(key="zzz", title="Gone", artist="A", owners=1)
+        # When
+        corrected = reconcile(batch_size=batch_size)
+        # Then
+        assert corrected == 5
+        assert snapshot() == counted
+
+    def test_counters_created_concurrently_are_recounted(
+        self, albums, user_factory, monkeypatch
+    ):
+        # Given
+        AlbumPopularity.objects.filter(title="Second").delete()
+        late = user_factory(username="late").albumz_user
+
+        def representatives_during_a_write(keys):
+            # Between the count and the insert, an album is added and its
+            # counters are created by the write path.
+            late.add_to_collection(Album(title="Second", artist="A", genre=Genre.ROCK))
+            return representatives(keys)
+
+        monkeypatch.setattr(
+            reconcile_module, "representatives", representatives_during_a_write
+        )
+        # When
+        reconcile()
+        # Then
+        assert counters("Second", "A") == (4, 0, 2, 1.5)
+        assert counters("Second", "A", Genre.ROCK) == (4, 0, 2, 1.5)
+        monkeypatch.undo()
+        assert reconcile() == 0
+
+    def test_reconcile_command(self, albums):
+        # Given
+        AlbumPopularity.objects.all().delete()
+        output = StringIO()
+        # When
+        call_command("reconcile_leaderboards", stdout=output)
+        # Then
+        assert output.getvalue() == "10 popularity counters corrected.\n"
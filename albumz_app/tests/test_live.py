@@ -0,0 +1,233 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.urls import reverse
+
+from ..constants import ReverseURLNames
+from ..domain.exceptions import AlbumAlreadyInCollectionError
+from ..domain.models import Album
+from ..jobs.handlers import bulk_delete_albums
+from ..jobs.queue import enqueue
+from ..live.broker import RESYNC, AlbumEvent, AlbumEventType, Broker, broker
+
+# Seconds to wait for an event that should arrive.
+TIMEOUT = 5
+
+
+def album_event(user_id, seq=1):
+    return AlbumEvent(
+        user_id=user_id, type=AlbumEventType.UPDATED, album_id=1, seq=seq, owned=True
+    )
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+    monkeypatch.setattr(broker, "publish", events.append)
+    return events
+
+
+class TestPublishedEvents:
+    def test_domain_writes_publish_events(
+        self, domain_user, published, django_capture_on_commit_callbacks
+    ):
+        # When
+        with django_capture_on_commit_callbacks(execute=True):
+            album = Album(title="A", artist="X")
+            domain_user.add_to_wishlist(album)
+            album_id = album.pk
+            domain_user.edit_album(album, Album(title="A (Live)", artist="X"))
+            domain_user.move_to_collection(album.pk)
+            domain_user.delete_album(album)
+        # Then
+        assert [(event.type, event.seq, event.owned) for event in published] == [
+            (AlbumEventType.CREATED, 1, False),
+            (AlbumEventType.UPDATED, 2, False),
+            (AlbumEventType.MOVED, 3, True),
+            (AlbumEventType.DELETED, 4, None),
+        ]
+        assert {event.album_id for event in published} == {album_id}
+
+    def test_events_are_published_on_commit(
+        self, domain_user, published, django_capture_on_commit_callbacks
+    ):
+        # When
+        with django_capture_on_commit_callbacks() as callbacks:
+            domain_user.add_to_collection(Album(title="A", artist="X"))
+        # Then
+        assert published == []
+        for callback in callbacks:
+            callback()
+        assert len(published) == 1
+
+    def test_rejected_duplicates_publish_nothing(
+        self, domain_user, published, django_capture_on_commit_callbacks
+    ):
+        # Given
+        domain_user.add_to_collection(Album(title="A", artist="X"))
+        # When
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(AlbumAlreadyInCollectionError):
+                domain_user.add_to_collection(Album(title="A", artist="X"))
+        # Then
+        assert published == []
+
+    def test_bulk_delete_publishes_the_deleted_albums(
+        self, domain_user, user_factory, published, django_capture_on_commit_callbacks
+    ):
+        # Given
+        first = domain_user.albums.create(title="A", artist="X", owned=True)
+        second = domain_user.albums.create(title="B", artist="X", owned=True)
+        other_user = user_factory(username="otheruser").albumz_user
+        foreign = other_user.albums.create(title="A", artist="X", owned=True)
+        job = enqueue(
+            "albums.bulk_delete",
+            user=domain_user,
+            payload={"album_ids": [first.pk, second.pk, foreign.pk]},
+        )
+        # When
+        with django_capture_on_commit_callbacks(execute=True):
+            bulk_delete_albums(job)
+        # Then
+        assert sorted((event.album_id, event.type) for event in published) == [
+            (first.pk, AlbumEventType.DELETED),
+            (second.pk, AlbumEventType.DELETED),
+        ]
+        assert {event.user_id for event in published} == {domain_user.pk}
+
+
+class TestBroker:
+    def test_events_reach_the_streams_of_their_user(self):
+        # Given
+        local_broker = Broker()
+
+        async def receive():
+            with (
+                local_broker.subscribe(1, max_size=10) as mine,
+                local_broker.subscribe(2, max_size=10) as others,
+            ):
+                # When
+                local_broker.publish(album_event(user_id=1))
+                return await mine.get(TIMEOUT), await others.get(0.01)
+
+        # Then
+        assert async_to_sync(receive)() == (album_event(user_id=1), None)
+
+    def test_slow_streams_are_told_to_resync(self):
+        # Given
+        local_broker = Broker()
+
+        async def receive():
+            with local_broker.subscribe(1, max_size=2) as subscription:
+                # When
+                for seq in range(1, 5):
+                    local_broker.publish(album_event(user_id=1, seq=seq))
+                await asyncio.sleep(0)
+                return [await subscription.get(0.01) for _ in range(2)]
+
+        # Then
+        assert async_to_sync(receive)() == [RESYNC, None]
+
+    def test_closed_streams_are_unsubscribed(self):
+        # Given
+        local_broker = Broker()
+
+        async def subscribe():
+            with local_broker.subscribe(1, max_size=10):
+                assert len(local_broker.subscriptions(1)) == 1
+
+        # When
+        async_to_sync(subscribe)()
+        # Then
+        assert local_broker.subscriptions() == []
+
+
+class TestAlbumEventsView:
+    def test_anonymous_users_are_rejected(self, async_client, db):
+        # When
+        response = async_to_sync(async_client.get)(reverse(ReverseURLNames.EVENTS))
+        # Then
+        assert response.status_code == 401
+
+    def test_wsgi_requests_are_rejected(self, auth_client):
+        # When
+        response = auth_client.get(reverse(ReverseURLNames.EVENTS))
+        # Then
+        assert response.status_code == 501
+
+    def test_stream_pushes_the_album_changes_of_the_user(
+        self,
+        async_client,
+        auth_user,
+        domain_user,
+        user_factory,
+        django_capture_on_commit_callbacks,
+    ):
+        # Given
+        async_client.force_login(auth_user)
+        other_user = user_factory(username="otheruser").albumz_user
+
+        @sync_to_async
+        def add_albums():
+            with django_capture_on_commit_callbacks(execute=True):
+                other_user.add_to_collection(Album(title="B", artist="X"))
+                domain_user.add_to_wishlist(Album(title="A", artist="X"))
+
+        async def stream():
+            response = await async_client.get(reverse(ReverseURLNames.EVENTS))
+            chunks = aiter(response.streaming_content)
+            first = await anext(chunks)
+            # When
+            await add_albums()
+            second = await asyncio.wait_for(anext(chunks), TIMEOUT)
+            await chunks.aclose()
+            return response, first, second
+
+        response, first, second = async_to_sync(stream)()
+        # Then
+        assert response["Content-Type"] == "text/event-stream"
+        assert first == b"retry: 3000\n\n"
+        album = domain_user.albums.get()
+        assert second.decode() == (
+            "id: 1\nevent: album.created\n"
+            f'data: {{"album": {album.pk}, "seq": 1, "owned": false}}\n\n'
+        )
+        assert broker.subscriptions() == []
+
+    def test_idle_streams_send_keepalives_and_end(
+        self, async_client, auth_user, settings
+    ):
+        # Given
+        settings.LIVE_KEEPALIVE_SECONDS = 0.01
+        settings.LIVE_STREAM_MAX_SECONDS = 0.05
+        async_client.force_login(auth_user)
+
+        async def stream():
+            response = await async_client.get(reverse(ReverseURLNames.EVENTS))
+            return [chunk async for chunk in response.streaming_content]
+
+        # When
+        chunks = async_to_sync(stream)()
+        # Then
+        assert len(chunks) > 2
+        assert set(chunks[1:]) == {b": keepalive\n\n"}
+
+    def test_slow_streams_end_with_a_resync(
+        self, async_client, auth_user, domain_user, settings
+    ):
+        # Given
+        settings.LIVE_QUEUE_SIZE = 1
+        async_client.force_login(auth_user)
+
+        async def stream():
+            response = await async_client.get(reverse(ReverseURLNames.EVENTS))
+            chunks = aiter(response.streaming_content)
+            await anext(chunks)
+            # When
+            for seq in (1, 2):
+                broker.publish(album_event(user_id=domain_user.pk, seq=seq))
+            return [chunk async for chunk in chunks]
+
+        # Then
+        assert async_to_sync(stream)() == [b"event: resync\ndata: {}\n\n"]
@@ -0,0 +1,119 @@
+import tracemalloc
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from ..constants import ReverseURLNames, URLNames
+from ..observability.memory import take_snapshot, top_allocations
+
+retained = []
+
+
+def allocate_strings():
+    retained.extend(f"album {number}" * 10 for number in range(10_000))
+
+
+@pytest.fixture
+def tracing():
+    tracemalloc.start(5)
+    yield
+    tracemalloc.stop()
+    retained.clear()
+
+
+@pytest.fixture
+def staff_client(client, user_factory, test_password):
+    staff = user_factory(username="staff", is_staff=True)
+    client.login(username=staff.username, password=test_password)
+    return client
+
+
+class TestTopAllocations:
+    def test_growth_is_attributed_to_the_app_call_site(self, tracing):
+        # Given
+        before = take_snapshot()
+        # When
+        allocate_strings()
+        after = take_snapshot()
+        # Then
+        top = top_allocations(before, after, limit=1)[0]
+        assert top["site"].startswith("albumz_app/tests/test_memory.py:")
+        assert top["size_diff"] > 10_000 * 100
+        assert top["count_diff"] >= 10_000
+
+
+class TestMemoryPeakMiddleware:
+    def test_peak_memory_of_requests_is_recorded_while_tracing(
+        self, auth_client, tracing
+    ):
+        # Given
+        labels = {"view": str(URLNames.COLLECTION)}
+        name = "albumz_http_request_peak_memory_bytes_count"
+        before = REGISTRY.get_sample_value(name, labels) or 0
+        # When
+        auth_client.get(reverse(ReverseURLNames.COLLECTION))
+        # Then
+        assert REGISTRY.get_sample_value(name, labels) == before + 1
+
+
+class TestMemoryView:
+    def test_other_users_are_denied(self, auth_client):
+        assert auth_client.get(reverse("memory")).status_code == 403
+
+    def test_report_without_tracing(self, staff_client):
+        # When
+        report = staff_client.get(reverse("memory")).json()
+        # Then
+        assert report["tracing"] is False
+        assert "top_allocations" not in report
+
+    def test_started_tracing_reports_growth_between_calls(self, staff_client):
+        try:
+            # Given
+            staff_client.post(reverse("memory"), {"action": "start"})
+            # When
+            allocate_strings()
+            report = staff_client.get(reverse("memory"), {"limit": 3}).json()
+        finally:
+            staff_client.post(reverse("memory"), {"action": "stop"})
+            retained.clear()
+        # Then
+        assert report["tracing"] is True
+        assert report["traced_bytes"] > 0
+        assert any(
+            site["site"].startswith("albumz_app/tests/test_memory.py")
+            for site in report["top_allocations"]
+        )
+        assert not tracemalloc.is_tracing()
+
+    def test_unknown_action(self, staff_client):
+        response = staff_client.post(reverse("memory"), {"action": "restart"})
+        assert response.status_code == 400
+
+
+class TestMemoryProfileCommand:
+    def test_reports_peak_per_request(self, auth_user, albums_factory):
+        # Given
+        albums_factory(owned=True)
+        out = StringIO()
+        # When
+        call_command(
+            "memory_profile",
+            reverse(ReverseURLNames.COLLECTION),
+            "--user",
+            auth_user.username,
+            "--requests",
+            "3",
+            stdout=out,
+        )
+        # Then
+        assert out.getvalue().startswith("3 requests: peak per request")
+        assert not tracemalloc.is_tracing()
+
+    def test_unknown_user(self, db):
+        with pytest.raises(CommandError):
+            call_command("memory_profile", "/albumz/", "--user", "nobody")
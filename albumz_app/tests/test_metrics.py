@@ -0,0 +1,177 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from prometheus_client import REGISTRY, Counter, values
+
+from ..constants import ReverseURLNames, URLNames
+from ..domain.exceptions import AlbumAlreadyInCollectionError
+from ..domain.models import Album
+from ..observability.cache import InstrumentedFileBasedCache
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture
+def staff_client(client, user_factory, test_password):
+    staff = user_factory(username="staff", is_staff=True)
+    client.login(username=staff.username, password=test_password)
+    return client
+
+
+class TestRequestMetrics:
+    def test_request_latency_and_status_are_recorded_per_url_name(
+        self, auth_client, albums_factory
+    ):
+        # Given
+        albums_factory(owned=True)
+        labels = {"view": str(URLNames.COLLECTION), "method": "GET"}
+        requests_before = sample("albumz_http_request_duration_seconds_count", **labels)
+        responses_before = sample("albumz_http_responses_total", status="200", **labels)
+        # When
+        auth_client.get(reverse(ReverseURLNames.COLLECTION))
+        # Then
+        assert (
+            sample("albumz_http_request_duration_seconds_count", **labels)
+            == requests_before + 1
+        )
+        assert (
+            sample("albumz_http_responses_total", status="200", **labels)
+            == responses_before + 1
+        )
+
+    def test_sql_queries_of_a_request_are_recorded(self, auth_client, albums_factory):
+        # Given
+        albums_factory(owned=True)
+        view = str(URLNames.API.ALBUMS)
+        requests_before = sample("albumz_db_queries_per_request_count", view=view)
+        queries_before = sample("albumz_db_queries_per_request_sum", view=view)
+        # When
+        auth_client.get(reverse(ReverseURLNames.API.ALBUMS))
+        # Then
+        assert (
+            sample("albumz_db_queries_per_request_count", view=view)
+            == requests_before + 1
+        )
+        assert sample("albumz_db_queries_per_request_sum", view=view) > queries_before
+
+    def test_unknown_urls_are_not_labelled_by_path(self, client):
+        # Given
+        before = sample(
+            "albumz_http_responses_total", view="unmatched", method="GET", status="404"
+        )
+        # When
+        client.get("/no-such-page/")
+        # Then
+        assert (
+            sample(
+                "albumz_http_responses_total",
+                view="unmatched",
+                method="GET",
+                status="404",
+            )
+            == before + 1
+        )
+
+
+class TestCacheMetrics:
+    def test_cache_hits_and_misses_are_counted(self):
+        # Given
+        hits = sample("albumz_cache_requests_total", result="hit")
+        misses = sample("albumz_cache_requests_total", result="miss")
+        cache.set("present", None)
+        # When
+        cache.get("present", "default")
+        cache.get("absent")
+        cache.get_many(["present", "absent"])
+        # Then
+        assert sample("albumz_cache_requests_total", result="hit") == hits + 2
+        assert sample("albumz_cache_requests_total", result="miss") == misses + 2
+
+
+class TestFileBasedCacheAdd:
+    def test_only_the_first_add_succeeds(self, tmp_path):
+        # Given
+        first = InstrumentedFileBasedCache(str(tmp_path), {})
+        second = InstrumentedFileBasedCache(str(tmp_path), {})
+        # When / Then
+        assert first.add("lock", 1)
+        assert not second.add("lock", 2)
+        assert second.get("lock") == 1
+
+    def test_expired_entries_are_replaced(self, tmp_path):
+        # Given
+        file_cache = InstrumentedFileBasedCache(str(tmp_path), {})
+        file_cache.set("lock", 1, timeout=-1)
+        # When / Then
+        assert file_cache.add("lock", 2)
+        assert file_cache.get("lock") == 2
+        assert len(list(tmp_path.iterdir())) == 1
+
+
+class TestDomainEventMetrics:
+    def test_added_moved_and_rejected_albums_are_counted(self, domain_user):
+        # Given
+        added = sample("albumz_albums_added_total", destination="wishlist")
+        moved = sample("albumz_albums_moved_to_collection_total")
+        rejected = sample("albumz_duplicates_rejected_total", existing_in="collection")
+        # When
+        domain_user.add_to_wishlist(Album(title="Blue Train", artist="John Coltrane"))
+        domain_user.add_to_collection(Album(title="Blue Train", artist="John Coltrane"))
+        with pytest.raises(AlbumAlreadyInCollectionError):
+            domain_user.add_to_wishlist(
+                Album(title="Blue Train", artist="John Coltrane")
+            )
+        # Then
+        assert sample("albumz_albums_added_total", destination="wishlist") == added + 1
+        assert sample("albumz_albums_moved_to_collection_total") == moved + 1
+        assert (
+            sample("albumz_duplicates_rejected_total", existing_in="collection")
+            == rejected + 1
+        )
+
+
+class TestMetricsEndpoint:
+    def test_anonymous_access_is_denied(self, client, settings):
+        settings.METRICS_TOKEN = "secret"
+        assert client.get(reverse("metrics")).status_code == 403
+
+    def test_regular_users_are_denied(self, auth_client):
+        assert auth_client.get(reverse("metrics")).status_code == 403
+
+    def test_wrong_token_is_denied(self, client, settings):
+        settings.METRICS_TOKEN = "secret"
+        response = client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer nope")
+        assert response.status_code == 403
+
+    def test_token_grants_access_in_prometheus_format(self, client, settings, db):
+        # Given
+        settings.METRICS_TOKEN = "secret"
+        # When
+        response = client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        # Then
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        assert b"# TYPE albumz_http_request_duration_seconds histogram" in (
+            response.content
+        )
+
+    def test_staff_users_have_access(self, staff_client):
+        assert staff_client.get(reverse("metrics")).status_code == 200
+
+    def test_multiprocess_mode_aggregates_worker_files(
+        self, staff_client, tmp_path, monkeypatch
+    ):
+        # Given
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+        for pid in (101, 102):
+            monkeypatch.setattr(
+                values, "ValueClass", values.MultiProcessValue(lambda pid=pid: pid)
+            )
+            Counter("albumz_worker_requests", "Test.", registry=None).inc(2)
+        # When
+        response = staff_client.get(reverse("metrics"))
+        # Then
+        assert response.status_code == 200
+        assert b"albumz_worker_requests_total 4.0" in response.content
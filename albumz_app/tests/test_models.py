@@ -8,7 +8,7 @@ from ..domain.exceptions import (
     AlbumAlreadyOnWishlistError,
     AlbumDoesNotExistError,
 )
-from ..domain.models import Album
+from ..domain.models import Album, Artist
 from ..test_utils.utils import (
     AlbumFiltersMixin,
     future_date,
@@ -54,6 +54,14 @@ class TestAlbumModel:
             "Kill 'Em All", artist
         )
 
+    def test_album_equal_to_differently_spelled_album(self):
+        assert self.album_instance("Abbey Road", "The Beatles") == self.album_instance(
+            "abbey  road", "beatles "
+        )
+        assert hash(self.album_instance("Abbey Road", "The Beatles")) == hash(
+            self.album_instance("ABBEY ROAD", "the beatles")
+        )
+
     @pytest.mark.parametrize("pub_date", [date(1991, 9, 21), present_date(), None])
     def test_album_valid_pub_date(self, pub_date):
         album = self.album_instance("Rust In Peace", "Megadeth", pub_date=pub_date)
@@ -64,6 +72,50 @@ class TestAlbumModel:
         assert not album.is_pub_date_valid()
 
 
+class TestArtistModel:
+    def test_resolve_creates_one_artist_per_spelling_variant(self, db):
+        # When
+        artists = Artist.objects.resolve(["The Beatles", "beatles", "Björk"])
+        # Then
+        assert Artist.objects.count() == 2
+        assert artists["beatles"].name == "The Beatles"
+        assert artists["bjork"].name == "Björk"
+
+    def test_resolve_reuses_existing_artists(self, db, django_assert_num_queries):
+        # Given
+        existing = Artist.objects.get_for_name("Miles Davis")
+        # When
+        with django_assert_num_queries(1):
+            artists = Artist.objects.resolve(["MILES DAVIS", "Miles  Davis"])
+        # Then
+        assert artists == {"miles davis": existing}
+
+    def test_album_saved_with_spelling_variant_links_existing_artist(
+        self, domain_user, user_factory
+    ):
+        # Given
+        first = domain_user.albums.create(title="A", artist="The Beatles", owned=True)
+        other_user = user_factory(username="otheruser").albumz_user
+        # When
+        second = other_user.albums.create(title="B", artist="beatles", owned=True)
+        # Then
+        assert first.artist_ref == second.artist_ref
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.artist, second.artist) == ("The Beatles", "beatles")
+        assert (first.artist_spelling, second.artist_spelling) == ("", "beatles")
+
+    def test_edited_artist_keeps_new_spelling(self, domain_user):
+        # Given
+        album = domain_user.albums.create(title="A", artist="The Beatles", owned=True)
+        album.artist = "BEATLES"
+        # When
+        album.save(update_fields=["artist"])
+        # Then
+        album.refresh_from_db()
+        assert album.artist == "BEATLES"
+
+
 class TestUserModel(AlbumFiltersMixin):
     def album_instance(
         self,
@@ -207,7 +259,9 @@ class TestUserModel(AlbumFiltersMixin):
         # Then
         album_from_db = (
             Album.albums.for_user(user=domain_user)
-            .filter(title=album_from_form.title, artist=album_from_form.artist)
+            .filter(
+                title=album_from_form.title, artist_ref__name=album_from_form.artist
+            )
             .first()
         )
         assert album_from_db.pk == edited_album.pk
@@ -292,3 +346,39 @@ class TestUserModel(AlbumFiltersMixin):
         # When/Then
         with pytest.raises(AlbumAlreadyInCollectionError):
             domain_user.move_to_collection(choice(albums_in_collection).pk)
+
+    def test_add_to_wishlist_when_differently_spelled_album_in_collection(
+        self, domain_user
+    ):
+        # Given
+        domain_user.add_to_collection(self.album_instance("Abbey Road", "The Beatles"))
+        # When/Then
+        with pytest.raises(AlbumAlreadyInCollectionError):
+            domain_user.add_to_wishlist(self.album_instance("abbey road", "Beatles"))
+        assert len(self.get_albums_on_wishlist(domain_user)) == 0
+
+    def test_saved_album_stores_match_key(self, albums_factory):
+        # Given
+        album = choice(albums_factory(mix=True))
+        # When
+        album.title = "Héroes"
+        album.save(update_fields=["title"])
+        # Then
+        album.refresh_from_db()
+        assert album.match_key == album.compute_match_key()
+        assert album.match_key.endswith("|heroes")
+
+    def test_duplicate_lookup_is_a_single_query(
+        self, albums_factory, domain_user, django_assert_num_queries
+    ):
+        # Given
+        album = choice(albums_factory(mix=True))
+        # When/Then
+        with django_assert_num_queries(1) as captured:
+            assert (
+                domain_user.find_duplicate(
+                    self.album_instance(album.title.upper(), album.artist)
+                )
+                == album
+            )
+        assert "match_key" in captured.captured_queries[0]["sql"]
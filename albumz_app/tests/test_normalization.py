@@ -0,0 +1,38 @@
+import pytest
+
+from ..domain.normalization import album_match_key, normalize_text
+
+
+class TestNormalization:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("The Beatles", "beatles"),
+            ("  the   beatles ", "beatles"),
+            ("Beatles", "beatles"),
+            ("Björk", "bjork"),
+            ("AC/DC", "ac dc"),
+            ("Guns N' Roses", "guns n roses"),
+            ("Ｆｕｌｌｗｉｄｔｈ", "fullwidth"),
+            ("STRASSE", "strasse"),
+            ("Straße", "strasse"),
+            ("The", "the"),
+            ("A Tribe Called Quest", "tribe called quest"),
+            ("...", "..."),
+            ("", ""),
+            (None, ""),
+        ],
+    )
+    def test_normalize_text(self, value, expected):
+        assert normalize_text(value) == expected
+
+    def test_normalize_text_keeps_articles_when_disabled(self):
+        assert normalize_text("The Beatles", strip_articles=False) == "the beatles"
+
+    def test_articles_follow_setting(self, settings):
+        settings.ALBUM_MATCH_KEY_STRIP_ARTICLES = False
+        assert normalize_text("The Beatles") == "the beatles"
+
+    def test_album_match_key_separates_artist_and_title(self):
+        assert album_match_key("Abbey Road", "The Beatles") == "beatles|abbey road"
+        assert album_match_key("b c", "a") != album_match_key("c", "a b")
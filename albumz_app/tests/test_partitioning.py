@@ -0,0 +1,189 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..domain.models import Album
+from ..partitioning import (
+    OLD_TABLE,
+    PARTITIONED_TABLE,
+    TABLE,
+    AlbumPartitioner,
+    copy_batch_statement,
+    create_table_statements,
+    partitioned_foreign_key_statement,
+    partitioned_index_definition,
+    referencing_foreign_key_statement,
+)
+
+
+class TestPartitioningStatements:
+    def test_create_table_statements_create_one_table_per_remainder(self):
+        # When
+        statements = create_table_statements(4)
+        # Then
+        partitions = [s for s in statements if "PARTITION OF" in s]
+        assert len(partitions) == 4
+        assert all("MODULUS 4" in s for s in partitions)
+        assert all(f"REMAINDER {r})" in s for r, s in enumerate(partitions))
+        assert any('PRIMARY KEY ("id", "user_id")' in s for s in statements)
+
+    def test_partitioned_index_definition_targets_partitioned_table(self):
+        # Given
+        definition = (
+            f'CREATE INDEX album_user_artist_idx ON public."{TABLE}" '
+            "USING btree (user_id, artist_ref_id)"
+        )
+        # When
+        rewritten = partitioned_index_definition("album_user_artist_idx", definition)
+        # Then
+        assert rewritten == (
+            'CREATE INDEX "album_user_artist_idx_part" '
+            f'ON "{PARTITIONED_TABLE}" USING btree (user_id, artist_ref_id)'
+        )
+
+    @pytest.mark.parametrize(
+        "columns, expected",
+        [
+            ("(id)", "(id, user_id)"),
+            ("(id) WHERE (owned = true)", "(id, user_id) WHERE (owned = true)"),
+            ("(user_id, upper((title)::text))", "(user_id, upper((title)::text))"),
+        ],
+    )
+    def test_unique_indexes_include_the_partition_key(self, columns, expected):
+        # Given
+        definition = f"CREATE UNIQUE INDEX some_idx ON {TABLE} USING btree {columns}"
+        # When
+        rewritten = partitioned_index_definition("some_idx", definition)
+        # Then
+        assert rewritten == (
+            f'CREATE UNIQUE INDEX "some_idx_part" ON "{PARTITIONED_TABLE}" '
+            f"USING btree {expected}"
+        )
+
+    def test_partitioned_foreign_key_statement_keeps_the_definition(self):
+        # Given
+        definition = (
+            'FOREIGN KEY (artist_ref_id) REFERENCES "albumz_app_artist"(id) '
+            "DEFERRABLE INITIALLY DEFERRED"
+        )
+        # When
+        statement = partitioned_foreign_key_statement("album_artist_fk", definition)
+        # Then
+        assert statement == (
+            f'ALTER TABLE "{PARTITIONED_TABLE}" '
+            f'ADD CONSTRAINT "album_artist_fk_part" {definition}'
+        )
+
+    def test_referencing_foreign_keys_include_the_partition_key(self):
+        # When
+        statement = referencing_foreign_key_statement(
+            "albumz_app_albumsearchgram", "gram_album_fk", "album_id"
+        )
+        # Then
+        assert 'FOREIGN KEY ("album_id", "user_id")' in statement
+        assert f'REFERENCES "{TABLE}" ("id", "user_id")' in statement
+        assert statement.endswith("NOT VALID")
+
+    def test_copy_batch_statement_is_rerunnable(self):
+        # When
+        statement = copy_batch_statement()
+        # Then
+        assert f'INSERT INTO "{PARTITIONED_TABLE}"' in statement
+        assert "FOR SHARE" in statement
+        assert statement.endswith("ON CONFLICT DO NOTHING")
+
+
+@pytest.mark.django_db
+class TestPartitioningCommands:
+    @pytest.mark.parametrize("command", ["partition_albums", "benchmark_partitioning"])
+    def test_commands_require_postgresql(self, command):
+        with pytest.raises(CommandError):
+            call_command(command)
+
+
+class TestAlbumUpdates:
+    def album_update(self, album):
+        with CaptureQueriesContext(connection) as captured:
+            album.save(update_fields=["owned"])
+        return next(
+            query["sql"]
+            for query in captured.captured_queries
+            if query["sql"].startswith(f'UPDATE "{TABLE}"')
+        )
+
+    def test_updates_filter_by_the_stored_user(self, albums_factory):
+        # Given
+        album = Album.albums.get(pk=albums_factory(owned=True, count=2)[0].pk)
+        album.owned = False
+        # When
+        update = self.album_update(album)
+        # Then
+        assert f'"{TABLE}"."user_id" = {album.user_id}' in update
+
+    def test_created_albums_update_by_their_user(self, albums_factory):
+        # Given
+        album = albums_factory(owned=True, count=2)[0]
+        album.owned = False
+        # When
+        update = self.album_update(album)
+        # Then
+        assert f'"{TABLE}"."user_id" = {album.user_id}' in update
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="PostgreSQL partitioning")
+class TestAlbumPartitioner:
+    def query(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def test_conversion_keeps_albums_and_constraints(
+        self, albums_factory, user_factory
+    ):
+        # Given
+        albums_factory(owned=True, count=5)
+        other = user_factory(username="other").albumz_user
+        albums_factory(owned=False, count=4, user=other)
+        partitioner = AlbumPartitioner(connection, 4, batch_size=2)
+        # When
+        partitioner.prepare()
+        mirrored = albums_factory(owned=True, count=2, user=other)
+        Album.albums.filter(pk=mirrored[0].pk).delete()
+        partitioner.copy()
+        partitioner.swap()
+        # Then
+        assert self.query(
+            "SELECT count(*) FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(%s)",
+            [TABLE],
+        ) == [(1,)]
+        assert Album.albums.count() == 10
+        assert not Album.albums.filter(pk=mirrored[0].pk).exists()
+        assert self.query(f'SELECT count(*) FROM "{OLD_TABLE}"') == [(10,)]
+        assert self.query(
+            "SELECT count(*) FROM pg_constraint WHERE conrelid = to_regclass(%s) "
+            "AND contype = 'f'",
+            [TABLE],
+        ) == [(3,)]
+        assert self.query(
+            "SELECT array_length(conkey, 1), convalidated FROM pg_constraint "
+            "WHERE confrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE],
+        ) == [(2, True)]
+
+    def test_albums_are_writable_after_the_conversion(self, albums_factory):
+        # Given
+        album = albums_factory(owned=True, count=3)[0]
+        AlbumPartitioner(connection, 4, batch_size=2).run()
+        # When
+        album.title = "Partitioned"
+        album.save(update_fields=["title"])
+        created = albums_factory(owned=False, count=1)[0]
+        album.delete()
+        # Then
+        assert created.pk > album.pk
+        assert Album.albums.filter(title="Partitioned").count() == 0
+        assert Album.albums.count() == 3
+        assert AlbumPartitioner(connection, 4).is_partitioned()
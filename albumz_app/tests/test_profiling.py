@@ -0,0 +1,108 @@
+import os
+import re
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+
+from ..constants import ReverseURLNames
+from ..observability.profiling import StackSampler, profile_path, store_profile
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def profiles_root(settings, tmp_path):
+    settings.PROFILES_ROOT = tmp_path
+    settings.PROFILE_SAMPLE_INTERVAL = 0.001
+    return tmp_path
+
+
+@pytest.fixture
+def staff_client(client, user_factory, test_password):
+    staff = user_factory(username="staff", is_staff=True)
+    client.login(username=staff.username, password=test_password)
+    return client
+
+
+class TestStackSampler:
+    def test_samples_are_collapsed_stacks(self):
+        # When
+        with StackSampler(threading.get_ident(), 0.001) as sampler:
+            busy_loop(0.1)
+        # Then
+        lines = sampler.collapsed().splitlines()
+        assert lines
+        assert all(re.fullmatch(r".+ \d+", line) for line in lines)
+        assert any(
+            "test_samples_are_collapsed_stacks" in line and "busy_loop" in line
+            for line in lines
+        )
+        # Stacks go from the outermost frame to the innermost one.
+        assert all(
+            line.index("test_samples_are") < line.index("busy_loop")
+            for line in lines
+            if "busy_loop" in line
+        )
+
+
+class TestProfilingMiddleware:
+    def test_staff_request_with_query_flag_is_profiled(
+        self, staff_client, profiles_root
+    ):
+        # When
+        response = staff_client.get(reverse(ReverseURLNames.COLLECTION), {"profile": 1})
+        # Then
+        name = response["X-Profile"]
+        assert "albumz_collection" in name
+        assert profile_path(name).is_file()
+
+    def test_staff_request_with_header_is_profiled(self, staff_client, profiles_root):
+        response = staff_client.get(
+            reverse(ReverseURLNames.API.ALBUMS), HTTP_X_PROFILE="1"
+        )
+        assert profile_path(response["X-Profile"]).is_file()
+
+    def test_other_users_are_not_profiled(self, auth_client, profiles_root):
+        # When
+        response = auth_client.get(reverse(ReverseURLNames.COLLECTION), {"profile": 1})
+        # Then
+        assert "X-Profile" not in response
+        assert not list(profiles_root.iterdir())
+
+    def test_only_the_newest_profiles_are_kept(self, settings, profiles_root):
+        # Given
+        settings.PROFILES_MAX_COUNT = 2
+        names = []
+        for age in (30, 20, 10):
+            names.append(store_profile("main 1\n", "albumz:collection"))
+            os.utime(profile_path(names[-1]), (time.time() - age,) * 2)
+        # When
+        newest = store_profile("main 1\n", "albumz:collection")
+        # Then
+        assert sorted(path.stem for path in profiles_root.iterdir()) == sorted(
+            [names[-1], newest]
+        )
+
+
+class TestProfileView:
+    def test_staff_users_download_profiles(self, staff_client, profiles_root):
+        # Given
+        name = store_profile("main;view 3\n", "albumz:collection")
+        # When
+        response = staff_client.get(reverse("profile", args=[name]))
+        # Then
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content) == b"main;view 3\n"
+
+    def test_other_users_are_denied(self, auth_client, profiles_root):
+        name = store_profile("main 1\n", "albumz:collection")
+        assert auth_client.get(reverse("profile", args=[name])).status_code == 403
+
+    def test_unknown_profile(self, staff_client, profiles_root):
+        assert staff_client.get(reverse("profile", args=["nope"])).status_code == 404
@@ -0,0 +1,139 @@
+"""Query plan regression tests of the hot album queries.
+
+The plans are checked on a seeded dataset with fresh planner statistics. On
+PostgreSQL sequential scans are disabled for the test, so a `Seq Scan` of an
+app table means that no index can serve the query at all.
+"""
+
+import random
+
+import pytest
+from django.contrib.auth.models import User as AuthUser
+from django.db import connection
+from django.urls import reverse
+
+from ..constants import ReverseURLNames
+from ..domain.models import Album, Artist, Genre, Rating
+from ..domain.normalization import album_match_key, normalize_text
+from ..leaderboards.models import AlbumPopularity
+from ..leaderboards.reconcile import reconcile
+from ..test_utils.plans import QueryPlan, assert_indexed, capture_queries
+
+ALBUM_TABLE = Album._meta.db_table
+USERS = 20
+ALBUMS_PER_USER = 100
+
+
+@pytest.fixture
+def seeded_users(db):
+    generator = random.Random(42)
+    artist_names = [f"Artist {number}" for number in range(200)]
+    artists = Artist.objects.resolve(artist_names)
+    users = [
+        AuthUser.objects.create_user(f"collector{number}").albumz_user
+        for number in range(USERS)
+    ]
+    albums = []
+    for user in users:
+        for number in range(ALBUMS_PER_USER):
+            title = f"Album {number}"
+            artist = generator.choice(artist_names)
+            albums.append(
+                Album(
+                    user=user,
+                    title=title,
+                    artist_ref=artists[normalize_text(artist)],
+                    match_key=album_match_key(title, artist),
+                    genre=generator.choice(Genre.values),
+                    user_rating=generator.choice(Rating.values),
+                    owned=generator.random() < 0.7,
+                )
+            )
+    Album.albums.bulk_create(albums)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        if connection.vendor == "postgresql":
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    return users
+
+
+@pytest.fixture
+def domain_user(seeded_users):
+    return seeded_users[0]
+
+
+def plans(run, table=ALBUM_TABLE):
+    queries = capture_queries(run, table)
+    assert queries, f"No query on {table}."
+    return [QueryPlan(sql) for sql in queries]
+
+
+class TestQueryPlan:
+    def test_unindexed_query_is_a_full_scan(self, seeded_users):
+        # Given
+        albums = Album.albums.select_related(None).filter(title__icontains="1")
+        # When
+        (plan,) = plans(lambda: list(albums))
+        # Then
+        assert plan.full_scans() == [ALBUM_TABLE]
+        with pytest.raises(AssertionError):
+            assert_indexed(plan)
+
+
+class TestHotQueryPlans:
+    def test_duplicate_lookup_of_add_to_collection(self, domain_user):
+        # Given
+        album = Album(title="Album 1", artist="Artist 1")
+        # When
+        lookup, *_ = plans(lambda: domain_user.add_to_collection(album))
+        # Then
+        assert_indexed(lookup, "album_user_match_key_idx")
+
+    def test_albums_api_list_ordered_by_artist_and_title(self, client, domain_user):
+        # Given
+        client.force_login(domain_user.auth_user)
+        # When
+        queries = plans(lambda: client.get(reverse(ReverseURLNames.API.ALBUMS)))
+        # Then
+        assert any("ORDER BY" in plan.sql for plan in queries)
+        for plan in queries:
+            assert_indexed(plan)
+
+    def test_search_query(self, domain_user):
+        # When
+        (search,) = plans(lambda: list(domain_user.albums.search_query("album 1")))
+        # Then
+        assert_indexed(search)
+
+    def test_artist_completions(self, domain_user):
+        # When
+        (completions,) = plans(
+            lambda: list(domain_user.albums.artist_completions("artist 1")[:10])
+        )
+        # Then
+        assert_indexed(completions)
+
+    def test_average_rating_filtered_by_genre(self, domain_user):
+        # When
+        (average,) = plans(lambda: domain_user.albums.average_rating(Genre.ROCK))
+        # Then
+        assert_indexed(average)
+
+    @pytest.mark.parametrize(
+        "ranking, index",
+        [
+            ("most_owned", "popularity_owners_idx"),
+            ("most_wishlisted", "popularity_wishlisters_idx"),
+        ],
+    )
+    def test_leaderboard_top_albums(self, seeded_users, ranking, index):
+        # Given
+        reconcile()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        top = getattr(AlbumPopularity.objects, ranking)(Genre.ROCK)[:20]
+        # When
+        (plan,) = plans(lambda: list(top), AlbumPopularity._meta.db_table)
+        # Then
+        assert_indexed(plan, index)
+        assert "ORDER BY" in plan.sql
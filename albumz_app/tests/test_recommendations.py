@@ -0,0 +1,296 @@
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from scipy import sparse
+
+from ..domain.models import Genre, Rating
+from ..recommendations.collectors import refresh_similar_collectors
+from ..recommendations.engine import (
+    full_refresh,
+    incremental_refresh,
+    store_recommendations,
+)
+from ..recommendations.models import (
+    Recommendation,
+    RecommendationStatus,
+    SimilarCollector,
+)
+from ..recommendations.similarity import (
+    item_similarities,
+    profile_similarities,
+    recommend,
+)
+
+# Users (rows) owning albums (columns).
+OWNERSHIP = [
+    [1, 1, 1, 0],
+    [1, 1, 0, 0],
+    [0, 1, 1, 1],
+    [1, 0, 0, 0],
+]
+
+
+class TestSimilarity:
+    def matrix(self):
+        return sparse.csr_matrix(np.array(OWNERSHIP, dtype=np.float32))
+
+    def test_item_similarities_are_cosine_top_neighbours(self):
+        # When
+        similarities = item_similarities(self.matrix(), neighbors=2).toarray()
+        # Then
+        # Albums 0 and 1 share 2 of their 3 owners.
+        assert similarities[0, 1] == pytest.approx(2 / 3)
+        assert similarities[0, 0] == 0
+        # Album 2 keeps only its 2 nearest neighbours (1 and 3).
+        assert np.count_nonzero(similarities[2]) == 2
+        assert similarities[2, 0] == 0
+
+    def test_parallel_blocks_match_a_single_block(self):
+        # When
+        single = item_similarities(self.matrix(), neighbors=3)
+        parallel = item_similarities(
+            self.matrix(), neighbors=3, processes=2, block_size=1
+        )
+        # Then
+        assert np.allclose(single.toarray(), parallel.toarray())
+
+    def test_recommend_skips_excluded_albums(self):
+        # Given
+        owned = self.matrix()
+        similarities = item_similarities(owned, neighbors=3)
+        # When
+        recommendations = list(recommend(owned, similarities, owned, count=1))
+        # Then
+        indices, scores = recommendations[3]
+        assert list(indices) == [1]
+        assert scores[0] > 0
+        assert len(recommendations[0][0]) == 1
+        assert recommendations[0][0][0] == 3
+
+
+class TestProfileSimilarity:
+    def profiles(self):
+        rng = np.random.default_rng(0)
+        dense = rng.random((30, 5), dtype=np.float32)
+        artists = sparse.random(30, 40, density=0.1, random_state=0, format="csr")
+        norms = np.sqrt(
+            (dense**2).sum(axis=1) + np.asarray(artists.power(2).sum(axis=1)).ravel()
+        )
+        return dense / norms[:, None], sparse.diags(1 / norms) @ artists
+
+    def test_neighbours_are_the_most_similar_other_profiles(self):
+        # Given
+        dense, artists = self.profiles()
+        expected = dense @ dense.T + (artists @ artists.T).toarray()
+        np.fill_diagonal(expected, -1)
+        # When
+        similarities = profile_similarities(dense, artists, neighbors=3).toarray()
+        # Then
+        for user in range(30):
+            assert set(np.flatnonzero(similarities[user])) == set(
+                np.argsort(-expected[user])[:3]
+            )
+            assert similarities[user, user] == 0
+
+    def test_tiles_and_processes_match_a_single_block(self):
+        # Given
+        dense, artists = self.profiles()
+        # When
+        single = profile_similarities(dense, artists, neighbors=4, block_size=30)
+        blocked = profile_similarities(
+            dense, artists, neighbors=4, processes=2, block_size=7
+        )
+        tiled = profile_similarities(dense, artists, neighbors=4, block_size=7)
+        # Then
+        assert np.allclose(single.toarray(), blocked.toarray())
+        assert np.allclose(single.toarray(), tiled.toarray())
+
+
+class TestRecommendationRefresh:
+    @pytest.fixture
+    def collectors(self, user_factory):
+        users = [
+            user_factory(username=f"collector{number}").albumz_user
+            for number in range(len(OWNERSHIP))
+        ]
+        for user, row in zip(users, OWNERSHIP):
+            for album, owns in enumerate(row):
+                if owns:
+                    user.albums.create(
+                        title=f"Album {album}", artist="Artist", owned=True
+                    )
+        return users
+
+    def titles(self, user):
+        return list(
+            Recommendation.objects.filter(user=user)
+            .order_by("rank")
+            .values_list("title", flat=True)
+        )
+
+    def test_full_refresh_recommends_albums_of_similar_collectors(
+        self, collectors, settings
+    ):
+        # Given
+        settings.RECOMMENDATIONS_PER_USER = 1
+        # When
+        refreshed = full_refresh(processes=1)
+        # Then
+        assert refreshed == len(collectors)
+        assert self.titles(collectors[3]) == ["Album 1"]
+        assert self.titles(collectors[1]) == ["Album 2"]
+
+    def test_wishlist_albums_are_not_recommended(self, collectors):
+        # Given
+        collectors[3].albums.create(title="Album 1", artist="Artist", owned=False)
+        # When
+        full_refresh(processes=1)
+        # Then
+        assert "Album 1" not in self.titles(collectors[3])
+
+    def test_albums_of_a_single_owner_are_not_recommended(
+        self, collectors, user_factory
+    ):
+        # Given
+        collectors[0].albums.create(title="Rarity", artist="Artist", owned=True)
+        # When
+        full_refresh(processes=1)
+        # Then
+        assert all("Rarity" not in self.titles(user) for user in collectors)
+
+    def test_changed_collections_are_marked_stale(self, collectors):
+        # Given
+        full_refresh(processes=1)
+        assert not RecommendationStatus.objects.stale().exists()
+        # When
+        collectors[3].albums.create(title="Album 2", artist="Artist", owned=True)
+        # Then
+        assert list(RecommendationStatus.objects.stale()) == [
+            RecommendationStatus.objects.get(user=collectors[3])
+        ]
+
+    def test_incremental_refresh_only_updates_stale_users(self, collectors):
+        # Given
+        full_refresh(processes=1)
+        collectors[3].albums.create(title="Album 1", artist="Artist", owned=True)
+        other_recommendations = self.titles(collectors[0])
+        # When
+        refreshed = incremental_refresh()
+        # Then
+        assert refreshed == 1
+        assert "Album 1" not in self.titles(collectors[3])
+        assert self.titles(collectors[3])
+        assert self.titles(collectors[0]) == other_recommendations
+        assert not RecommendationStatus.objects.stale().exists()
+
+    def test_incremental_refresh_skips_albums_deleted_by_all_owners(self, collectors):
+        # Given
+        full_refresh(processes=1)
+        for owner in (collectors[0], collectors[2]):
+            owner.delete_album(owner.albums.get(title="Album 2"))
+        # When
+        refreshed = incremental_refresh()
+        # Then
+        assert refreshed == 2
+        assert "Album 2" not in self.titles(collectors[0])
+        assert "Album 2" not in self.titles(collectors[2])
+
+    def test_stored_recommendations_skip_albums_without_owners(self, collectors):
+        # Given
+        album = collectors[0].albums.get(title="Album 1")
+        recommendations = {collectors[3].pk: [("gone", 2.0), (album.match_key, 1.0)]}
+        # When
+        store_recommendations(recommendations, timezone.now())
+        # Then
+        assert self.titles(collectors[3]) == ["Album 1"]
+
+    def test_incremental_refresh_covers_new_users(self, collectors, user_factory):
+        # Given
+        full_refresh(processes=1)
+        newcomer = user_factory(username="newcomer").albumz_user
+        newcomer.albums.create(title="Album 0", artist="Artist", owned=True)
+        # When
+        incremental_refresh()
+        # Then
+        assert self.titles(newcomer)[0] == "Album 1"
+
+    def test_refresh_command(self, collectors):
+        # Given
+        output = StringIO()
+        # When
+        call_command(
+            "refresh_recommendations", "--full", "--processes", "1", stdout=output
+        )
+        call_command("refresh_recommendations", stdout=output)
+        # Then
+        assert output.getvalue().splitlines() == [
+            "Refreshed the recommendations of 4 users.",
+            "Refreshed the recommendations of 0 users.",
+        ]
+
+
+class TestSimilarCollectors:
+    def add_albums(self, user, albums):
+        for title, artist, genre, rating in albums:
+            user.albums.create(
+                title=title,
+                artist=artist,
+                genre=genre,
+                user_rating=rating,
+                owned=True,
+            )
+
+    def test_collectors_with_similar_genres_and_artists(self, user_factory):
+        # Given
+        jazz_fan, other_jazz_fan, rock_fan = (
+            user_factory(username=name).albumz_user
+            for name in ["jazzfan", "otherjazzfan", "rockfan"]
+        )
+        self.add_albums(
+            jazz_fan,
+            [
+                ("Kind of Blue", "Miles Davis", Genre.JAZZ, Rating.BEST),
+                ("A Love Supreme", "John Coltrane", Genre.JAZZ, Rating.GOOD),
+            ],
+        )
+        self.add_albums(
+            other_jazz_fan,
+            [("Bitches Brew", "Miles Davis", Genre.JAZZ, Rating.EXCELLENT)],
+        )
+        self.add_albums(
+            rock_fan,
+            [
+                ("Paranoid", "Black Sabbath", Genre.ROCK, Rating.BEST),
+                ("Nefertiti", "Miles Davis", Genre.JAZZ, Rating.TERRIBLE),
+            ],
+        )
+        # When
+        refreshed = refresh_similar_collectors(processes=1)
+        # Then
+        assert refreshed == 3
+        similar = SimilarCollector.objects.filter(user=jazz_fan).order_by("rank")
+        assert [entry.collector for entry in similar] == [other_jazz_fan, rock_fan]
+        assert similar[0].score > similar[1].score
+        # Same genres; Miles Davis (affinity 2 and 5/3) and John Coltrane (4/3).
+        assert similar[0].score == pytest.approx(
+            0.5 + 0.5 * 2 / (2**2 + (4 / 3) ** 2) ** 0.5, rel=1e-5
+        )
+
+    def test_refresh_replaces_previous_collectors(self, user_factory):
+        # Given
+        first, second = (
+            user_factory(username=name).albumz_user for name in ["first", "second"]
+        )
+        for user in (first, second):
+            self.add_albums(user, [("Album", "Artist", Genre.POP, Rating.GOOD)])
+        refresh_similar_collectors(processes=1)
+        second.albums.all().delete()
+        # When
+        call_command(
+            "refresh_similar_collectors", "--processes", "1", stdout=StringIO()
+        )
+        # Then
+        assert not SimilarCollector.objects.exists()
@@ -0,0 +1,114 @@
+import logging
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import User as AuthUser
+from django.http import HttpResponse
+
+from .. import replicas
+from ..domain.models import Album
+from ..replicas import PRIMARY, ReplicaRouter, ReplicaRoutingMiddleware
+
+REPLICA = "replica1"
+
+
+@pytest.fixture
+def replica_settings(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = [REPLICA]
+    settings.REPLICA_MAX_LAG = 5
+    settings.REPLICA_LAG_CHECK_INTERVAL = 60
+    monkeypatch.setattr(replicas, "_lag_checks", {})
+    monkeypatch.setattr(replicas, "measure_lag", lambda alias: 0.0)
+    return settings
+
+
+class TestReplicaRouting:
+    router = ReplicaRouter()
+
+    def route(self, rf, user, method="get", before=None):
+        """Returns where a read of albums goes while `before` ran in a request."""
+        routes = []
+
+        def view(request):
+            if before:
+                before()
+            routes.append(self.router.db_for_read(Album))
+            return HttpResponse()
+
+        request = getattr(rf, method)("/")
+        request.user = user
+        ReplicaRoutingMiddleware(view)(request)
+        return routes[0]
+
+    def test_reads_outside_requests_use_primary(self, replica_settings):
+        assert self.router.db_for_read(Album) == PRIMARY
+
+    def test_get_request_reads_from_replica(self, rf, replica_settings, auth_user):
+        assert self.route(rf, auth_user) == REPLICA
+
+    def test_post_request_reads_from_primary(self, rf, replica_settings, auth_user):
+        assert self.route(rf, auth_user, method="post") == PRIMARY
+
+    def test_user_sticks_to_primary_after_writing(
+        self, rf, replica_settings, auth_user
+    ):
+        # Given
+        self.route(rf, auth_user, method="post")
+        # When/Then
+        assert self.route(rf, auth_user) == PRIMARY
+        assert self.route(rf, AnonymousUser()) == REPLICA
+
+    def test_reads_after_a_write_within_a_request_use_primary(
+        self, rf, replica_settings, auth_user
+    ):
+        # When
+        route = self.route(
+            rf, auth_user, before=lambda: self.router.db_for_write(Album)
+        )
+        # Then
+        assert route == PRIMARY
+        assert self.route(rf, auth_user) == PRIMARY
+
+    def test_auth_tables_are_read_from_primary(self, rf, replica_settings, auth_user):
+        routes = []
+
+        def view(request):
+            routes.append(self.router.db_for_read(AuthUser))
+            return HttpResponse()
+
+        request = rf.get("/")
+        request.user = auth_user
+        ReplicaRoutingMiddleware(view)(request)
+        assert routes == [PRIMARY]
+
+    def test_lagging_replica_is_skipped(
+        self, rf, replica_settings, auth_user, monkeypatch, caplog
+    ):
+        # Given
+        monkeypatch.setattr(replicas, "measure_lag", lambda alias: 30.0)
+        # When
+        with caplog.at_level(logging.WARNING, logger=replicas.__name__):
+            route = self.route(rf, auth_user)
+        # Then
+        assert route == PRIMARY
+        assert "replica1 is 30.0s behind" in caplog.text
+
+    def test_lag_is_measured_once_per_interval(self, replica_settings, monkeypatch):
+        # Given
+        measured = []
+        monkeypatch.setattr(
+            replicas, "measure_lag", lambda alias: measured.append(alias) or 1.0
+        )
+        # When
+        for _ in range(3):
+            replicas.healthy_replicas()
+        # Then
+        assert measured == [REPLICA]
+
+    def test_no_replicas_configured(self, rf, settings, auth_user):
+        settings.DATABASE_REPLICAS = []
+        assert self.route(rf, auth_user) == PRIMARY
+
+    def test_migrations_only_run_on_primary(self):
+        assert self.router.allow_migrate(PRIMARY, "albumz_app")
+        assert not self.router.allow_migrate(REPLICA, "albumz_app")
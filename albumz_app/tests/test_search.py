@@ -0,0 +1,129 @@
+import pytest
+
+from ..domain import models as models_module
+from ..domain.models import AlbumSearchGram
+from ..domain.search import edit_distance, similarity, trigrams
+from ..importers.importer import AlbumImporter, start_import
+
+
+class TestSearchFunctions:
+    def test_trigrams_are_padded_per_word(self):
+        assert trigrams("Ab C") == {"  a", " ab", "ab ", "  c", " c "}
+
+    @pytest.mark.parametrize(
+        "a, b, expected",
+        [
+            ("beatles", "beatles", 0),
+            ("beatels", "beatles", 1),
+            ("beatle", "beatles", 1),
+            ("kitten", "sitting", 3),
+            ("", "abc", 3),
+        ],
+    )
+    def test_edit_distance(self, a, b, expected):
+        assert edit_distance(a, b) == expected
+
+    def test_similarity_matches_best_run_of_words(self):
+        assert similarity("abbey road", "Abbey Road (Remastered)") == 1.0
+        assert similarity("Beatels", "The Beatles") == pytest.approx(6 / 7)
+        assert similarity("Beatels", "Metallica") < 0.5
+
+
+class TestFuzzySearch:
+    @pytest.fixture
+    def albums(self, domain_user):
+        return {
+            title: domain_user.albums.create(title=title, artist=artist, owned=owned)
+            for title, artist, owned in [
+                ("Abbey Road", "The Beatles", True),
+                ("Let It Be", "The Beatles", False),
+                ("Beat", "King Crimson", True),
+                ("Master of Puppets", "Metallica", True),
+            ]
+        }
+
+    def test_fuzzy_search_tolerates_typos(self, domain_user, albums):
+        # When
+        results = list(domain_user.albums.fuzzy_search("Beatels"))
+        # Then
+        assert results[:2] == [albums["Abbey Road"], albums["Let It Be"]]
+        assert albums["Master of Puppets"] not in results
+
+    def test_fuzzy_search_ranks_by_similarity(self, domain_user, albums):
+        # When
+        results = domain_user.albums.fuzzy_search("masterr of pupets")
+        # Then
+        assert results[0] == albums["Master of Puppets"]
+        assert results[0].similarity > 0.8
+
+    def test_fuzzy_search_keeps_queryset_filters(self, domain_user, albums):
+        results = domain_user.albums.in_collection().fuzzy_search("Beatels")
+        assert albums["Let It Be"] not in results
+
+    def test_fuzzy_search_of_other_users_albums(
+        self, domain_user, albums, user_factory
+    ):
+        other_user = user_factory(username="otheruser").albumz_user
+        assert not other_user.albums.fuzzy_search("Beatles").exists()
+
+    def test_edited_album_is_reindexed(self, domain_user, albums):
+        # Given
+        album = albums["Beat"]
+        # When
+        album.title = "Discipline"
+        album.save()
+        # Then
+        assert album in domain_user.albums.fuzzy_search("Disciplin")
+        assert album not in domain_user.albums.fuzzy_search("Beat")
+
+    def test_imported_albums_are_indexed(self, domain_user, tmp_path):
+        # Given
+        path = tmp_path / "export.csv"
+        path.write_text("title,artist\nKind of Blue,Miles Davis\n")
+        # When
+        AlbumImporter(start_import(domain_user, path)).import_all()
+        # Then
+        assert AlbumSearchGram.objects.filter(user=domain_user).exists()
+        assert domain_user.albums.fuzzy_search("Myles Davis").exists()
+
+    def test_fuzzy_search_reranks_bounded_candidates(
+        self, domain_user, albums, settings
+    ):
+        # Given
+        settings.FUZZY_SEARCH_CANDIDATES = 1
+        # When/Then
+        assert len(domain_user.albums.fuzzy_search("Beatels")) == 1
+
+    def test_fuzzy_search_keeps_albums_containing_the_query(
+        self, domain_user, settings
+    ):
+        # Given
+        settings.FUZZY_SEARCH_CANDIDATES = 5
+        for number in range(20):
+            domain_user.albums.create(title=f"Hit {number}", artist="X", owned=True)
+        whitsun = domain_user.albums.create(title="Whitsun", artist="X", owned=True)
+        # When
+        results = list(domain_user.albums.fuzzy_search("hits"))
+        # Then
+        assert whitsun in results
+
+    def test_fuzzy_search_re_ranks_a_bounded_number_of_matches(
+        self, domain_user, settings, monkeypatch
+    ):
+        # Given
+        settings.FUZZY_SEARCH_CANDIDATES = 10
+        for number in range(40):
+            domain_user.albums.create(
+                title=f"Greatest Hits {number}", artist="Various", owned=True
+            )
+        compared = []
+        monkeypatch.setattr(
+            models_module,
+            "similarity",
+            lambda query, text: compared.append(text) or similarity(query, text),
+        )
+        # When
+        results = list(domain_user.albums.fuzzy_search("e"))
+        # Then
+        assert len(results) == 10
+        assert len(compared) <= 3 * 2 * settings.FUZZY_SEARCH_CANDIDATES
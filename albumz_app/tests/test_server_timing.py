@@ -0,0 +1,84 @@
+import re
+import time
+
+import pytest
+from django.urls import reverse
+
+from ..constants import ReverseURLNames
+from ..observability.timing import ServerTimer
+
+
+def durations(header):
+    return {
+        name: float(duration)
+        for name, duration in re.findall(r"(\w+);dur=([\d.]+)", header)
+    }
+
+
+@pytest.fixture
+def staff_user(user_factory):
+    return user_factory(username="staff", is_staff=True)
+
+
+@pytest.fixture
+def staff_client(client, staff_user, test_password):
+    client.login(username=staff_user.username, password=test_password)
+    return client
+
+
+class TestServerTimer:
+    def test_phases_are_timed_exclusively(self):
+        # Given
+        timer = ServerTimer()
+        # When
+        with timer.phase("render"):
+            time.sleep(0.01)
+            with timer.phase("db"):
+                time.sleep(0.02)
+            with timer.phase("render"):
+                time.sleep(0.01)
+        # Then
+        timings = durations(timer.header())
+        assert 20 <= timings["db"] < 30
+        assert 20 <= timings["render"] < 30
+        assert timings["total"] == pytest.approx(
+            timings["db"] + timings["render"] + timings["app"], abs=0.2
+        )
+
+
+class TestServerTimingMiddleware:
+    def test_staff_users_get_the_breakdown(self, staff_client):
+        # When
+        response = staff_client.get(reverse(ReverseURLNames.COLLECTION))
+        # Then
+        assert set(durations(response["Server-Timing"])) == {
+            "auth",
+            "db",
+            "render",
+            "app",
+            "total",
+        }
+
+    def test_api_serialization_is_timed_as_rendering(
+        self, staff_client, staff_user, albums_factory
+    ):
+        # Given
+        albums_factory(owned=True, user=staff_user.albumz_user)
+        # When
+        response = staff_client.get(reverse(ReverseURLNames.API.ALBUMS))
+        # Then
+        assert "render;dur=" in response["Server-Timing"]
+
+    def test_other_users_get_no_header(self, auth_client):
+        response = auth_client.get(reverse(ReverseURLNames.COLLECTION))
+        assert "Server-Timing" not in response
+
+    def test_setting_enables_it_for_everyone(self, client, settings, db):
+        settings.SERVER_TIMING = True
+        response = client.get(reverse(ReverseURLNames.COLLECTION))
+        assert "total;dur=" in response["Server-Timing"]
+
+    def test_middleware_is_unused_when_disabled(self, staff_client, settings):
+        settings.SERVER_TIMING_FOR_STAFF = False
+        response = staff_client.get(reverse(ReverseURLNames.COLLECTION))
+        assert "Server-Timing" not in response
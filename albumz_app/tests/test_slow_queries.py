@@ -0,0 +1,136 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from ..constants import ReverseURLNames
+from ..observability.models import SlowQuery
+from ..observability.slow_queries import (
+    ExecutedStatement,
+    explain,
+    fingerprint,
+    redact,
+)
+
+
+@pytest.fixture
+def log_all_queries(settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 1
+
+
+class TestSlowQueryLog:
+    def test_slow_queries_are_stored_with_view_user_and_plan(
+        self, auth_client, auth_user, albums_factory, log_all_queries
+    ):
+        # Given
+        albums_factory(owned=True)
+        # When
+        auth_client.get(reverse(ReverseURLNames.COLLECTION))
+        # Then
+        logged = SlowQuery.objects.filter(sql__contains="albumz_app_album")
+        assert logged.exists()
+        assert {query.view for query in logged} == {str(ReverseURLNames.COLLECTION)}
+        assert {query.user_id for query in logged} == {auth_user.pk}
+        assert all(query.plan for query in logged if query.sql.startswith("SELECT"))
+
+    def test_queries_under_the_threshold_are_not_stored(
+        self, auth_client, albums_factory, settings
+    ):
+        # Given
+        settings.SLOW_QUERY_THRESHOLD_MS = 60_000
+        albums_factory(owned=True)
+        # When
+        auth_client.get(reverse(ReverseURLNames.COLLECTION))
+        # Then
+        assert not SlowQuery.objects.exists()
+
+    def test_plans_are_only_captured_for_the_sample(
+        self, auth_client, albums_factory, log_all_queries, settings
+    ):
+        # Given
+        settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 0
+        albums_factory(owned=True)
+        # When
+        auth_client.get(reverse(ReverseURLNames.COLLECTION))
+        # Then
+        assert SlowQuery.objects.exists()
+        assert not SlowQuery.objects.exclude(plan="").exists()
+
+    def test_parameter_values_are_not_stored(
+        self, auth_client, albums_factory, log_all_queries, caplog
+    ):
+        # Given
+        albums_factory(owned=True)
+        # When
+        auth_client.get(reverse(ReverseURLNames.COLLECTION), {"query": "secretive"})
+        # Then
+        logged = SlowQuery.objects.filter(sql__contains="LIKE")
+        assert logged.exists()
+        assert not SlowQuery.objects.filter(params__contains="secretive").exists()
+        assert "secretive" not in caplog.text
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            (None, ""),
+            (["secret", 1, None], "[str, int, NoneType]"),
+            ({"term": "secret"}, "{'term': 'str'}"),
+        ],
+    )
+    def test_redact_keeps_only_parameter_types(self, params, expected):
+        assert redact(params) == expected
+
+    @pytest.mark.django_db
+    def test_writing_statements_are_never_explained(self):
+        statement = ExecutedStatement(
+            'UPDATE "albumz_app_album" SET "owned" = %s', [True], 500.0, "default"
+        )
+        assert explain(statement) == ""
+
+    def test_fingerprint_ignores_parameters_and_in_list_lengths(self):
+        assert fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s)') == fingerprint(
+            'SELECT *  FROM "t"\nWHERE "id" IN (%s)'
+        )
+        assert fingerprint('SELECT * FROM "t"') != fingerprint('SELECT "id" FROM "t"')
+
+
+@pytest.mark.django_db
+class TestSlowQueriesCommand:
+    def log(self, sql, duration_ms, **fields):
+        return SlowQuery.objects.create(
+            fingerprint=fingerprint(sql),
+            sql=sql,
+            duration_ms=duration_ms,
+            database="default",
+            **fields,
+        )
+
+    def test_summary_orders_statements_by_total_time(self):
+        # Given
+        self.log("SELECT rare", 900)
+        for _ in range(3):
+            self.log("SELECT frequent", 400, plan="SCAN frequent")
+        out = StringIO()
+        # When
+        call_command("slow_queries", stdout=out)
+        # Then
+        lines = out.getvalue().splitlines()
+        assert lines[0].startswith("1200ms total, 3 times, 400ms average")
+        assert lines[1:3] == ["  SELECT frequent", "    SCAN frequent"]
+        assert lines[3].startswith("900ms total, 1 times")
+
+    def test_purge_deletes_old_queries(self):
+        # Given
+        old = self.log("SELECT old", 300)
+        SlowQuery.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+        recent = self.log("SELECT recent", 300)
+        # When
+        call_command("slow_queries", "--purge", "--days", "7", stdout=StringIO())
+        # Then
+        assert list(SlowQuery.objects.all()) == [recent]
@@ -0,0 +1,83 @@
+import gzip
+import json
+import os
+import re
+
+import brotli
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.urls import reverse
+
+from ..constants import ReverseURLNames
+from ..static_storage import compressed_versions
+
+STYLESHEET = "vendor/bootstrap/css/bootstrap.min.css"
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {
+            "BACKEND": "albumz_app.static_storage.CompressedManifestStaticFilesStorage"
+        },
+    }
+    # The files of the admin and of DRF only make collecting slower.
+    call_command(
+        "collectstatic",
+        interactive=False,
+        verbosity=0,
+        ignore_patterns=["admin", "rest_framework"],
+    )
+    return tmp_path
+
+
+class TestCompressedManifestStorage:
+    def test_files_are_fingerprinted(self, collected):
+        # When
+        url = Template("{% load static %}{% static path %}").render(
+            Context({"path": STYLESHEET})
+        )
+        # Then
+        assert url.startswith("/static/vendor/bootstrap/css/bootstrap.min.")
+        assert url != f"/static/{STYLESHEET}"
+        paths = json.loads((collected / "staticfiles.json").read_text())["paths"]
+        source_map = paths[f"{STYLESHEET}.map"].rsplit("/", 1)[1]
+        # References between the files are rewritten to the fingerprinted names
+        content = (collected / paths[STYLESHEET]).read_text()
+        assert content.endswith(f"/*# sourceMappingURL={source_map} */")
+
+    def test_fingerprinted_files_are_precompressed(self, collected):
+        # Given
+        hashed = collected / staticfiles_storage.stored_name(STYLESHEET)
+        content = hashed.read_bytes()
+        # Then
+        gzipped = hashed.with_name(f"{hashed.name}.gz").read_bytes()
+        brotlied = hashed.with_name(f"{hashed.name}.br").read_bytes()
+        assert gzip.decompress(gzipped) == content
+        assert brotli.decompress(brotlied) == content
+        assert len(brotlied) < len(gzipped) < len(content)
+
+
+class TestCompressedVersions:
+    def test_incompressible_content_is_skipped(self):
+        assert compressed_versions(os.urandom(1024)) == {}
+
+    def test_text_is_compressed(self):
+        assert set(compressed_versions(b"body { margin: 0; }\n" * 100)) == {
+            "gz",
+            "br",
+        }
+
+
+class TestSelfHostedAssets:
+    def test_pages_load_no_third_party_assets(self, auth_client):
+        # When
+        response = auth_client.get(reverse(ReverseURLNames.COLLECTION))
+        # Then
+        content = response.content.decode()
+        assert not re.findall(r'(?:href|src)="(?:https?:)?//', content)
+        assert f'href="/static/{STYLESHEET}"' in content
@@ -0,0 +1,237 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from ..domain.models import Album
+from ..importers.importer import AlbumImporter, start_import
+from ..jobs.handlers import bulk_delete_albums
+from ..jobs.queue import enqueue
+from ..sync.changes import SyncTokenExpiredError, changes_since, compact_tombstones
+from ..sync.models import AlbumTombstone, SyncState
+
+
+def seqs(user):
+    return dict(user.albums.values_list("title", "sync_seq"))
+
+
+def sync_all(user, since=0, synced=None, page_size=2):
+    """Applies the pages of changes since `since` to {id: title}, as a client."""
+    synced = dict(synced or {})
+    while True:
+        changes = changes_since(user, since, page_size=page_size)
+        synced.update((album.pk, album.title) for album in changes.albums)
+        for album_id in changes.deleted:
+            synced.pop(album_id, None)
+        since = changes.token
+        if not changes.has_more:
+            return synced, since
+
+
+class TestChangeSequence:
+    def test_every_write_takes_the_next_number(self, domain_user):
+        # When
+        domain_user.add_to_wishlist(Album(title="A", artist="X"))
+        domain_user.add_to_collection(Album(title="B", artist="X"))
+        domain_user.move_to_collection(domain_user.albums.get(title="A").pk)
+        # Then
+        assert seqs(domain_user) == {"A": 3, "B": 2}
+        assert SyncState.objects.get(user=domain_user).last_seq == 3
+
+    def test_users_have_their_own_sequences(self, domain_user, user_factory):
+        # Given
+        other_user = user_factory(username="otheruser").albumz_user
+        # When
+        domain_user.add_to_collection(Album(title="A", artist="X"))
+        other_user.add_to_collection(Album(title="A", artist="X"))
+        # Then
+        assert seqs(domain_user) == seqs(other_user) == {"A": 1}
+
+    def test_saving_some_fields_takes_a_number(self, domain_user):
+        # Given
+        album = Album(title="A", artist="X")
+        domain_user.add_to_collection(album)
+        # When
+        album.user_rating = 5
+        album.save(update_fields=["user_rating"])
+        # Then
+        assert seqs(domain_user) == {"A": 2}
+
+    def test_imported_albums_are_numbered(self, domain_user, tmp_path):
+        # Given
+        domain_user.add_to_wishlist(Album(title="Wished", artist="X"))
+        path = tmp_path / "export.csv"
+        path.write_text(
+            "title,artist,owned\nWished,X,yes\nNew,X,yes\nLater,X,no\n",
+            encoding="utf-8",
+        )
+        # When
+        AlbumImporter(start_import(domain_user, path)).import_all()
+        # Then
+        assert seqs(domain_user) == {"New": 2, "Later": 3, "Wished": 4}
+        assert domain_user.albums.get(title="Wished").owned is True
+
+
+class TestTombstones:
+    def test_deleted_albums_leave_tombstones(self, domain_user):
+        # Given
+        for title in ("A", "B", "C"):
+            domain_user.add_to_collection(Album(title=title, artist="X"))
+        ids = dict(domain_user.albums.values_list("title", "pk"))
+        job = enqueue(
+            "albums.bulk_delete", user=domain_user, payload={"album_ids": [ids["B"]]}
+        )
+        # When
+        domain_user.albums.get(title="A").delete()
+        bulk_delete_albums(job)
+        # Then
+        tombstones = AlbumTombstone.objects.filter(user=domain_user)
+        assert sorted(tombstones.values_list("album_id", "seq")) == [
+            (ids["A"], 4),
+            (ids["B"], 5),
+        ]
+
+    def test_deleted_user_leaves_no_tombstones(self, domain_user):
+        # Given
+        domain_user.add_to_collection(Album(title="A", artist="X"))
+        # When
+        domain_user.auth_user.delete()
+        # Then
+        assert not AlbumTombstone.objects.exists()
+        assert not SyncState.objects.exists()
+
+
+class TestChangesSince:
+    @pytest.fixture
+    def collection(self, domain_user):
+        for title in ("A", "B", "C", "D", "E"):
+            domain_user.add_to_collection(Album(title=title, artist="X"))
+        return domain_user
+
+    def test_first_sync_lists_all_albums(self, collection):
+        # Given
+        collection.albums.get(title="C").delete()
+        # When
+        synced, token = sync_all(collection)
+        # Then
+        assert sorted(synced.values()) == ["A", "B", "D", "E"]
+        assert token == 6
+
+    def test_later_syncs_only_get_the_changes(self, collection):
+        # Given
+        synced, token = sync_all(collection)
+        album = collection.albums.get(title="A")
+        album.title = "A (Remastered)"
+        album.save()
+        collection.albums.get(title="C").delete()
+        collection.add_to_wishlist(Album(title="F", artist="X"))
+        # When
+        changes = changes_since(collection, token, page_size=10)
+        # Then
+        assert [album.title for album in changes.albums] == ["A (Remastered)", "F"]
+        assert len(changes.deleted) == 1
+        assert changes.token == 8
+        assert not changes.has_more
+        synced, _ = sync_all(collection, token, synced)
+        assert synced == dict(collection.albums.values_list("pk", "title"))
+
+    def test_changes_are_paged_in_sequence_order(self, collection):
+        # Given
+        _, token = sync_all(collection)
+        collection.albums.get(title="B").delete()
+        collection.albums.get(title="D").delete()
+        collection.add_to_collection(Album(title="G", artist="X"))
+        # When
+        changes = changes_since(collection, token, page_size=2)
+        rest = changes_since(collection, changes.token, page_size=2)
+        # Then
+        assert changes.has_more
+        assert len(changes.deleted) == 2
+        assert [album.title for album in rest.albums] == ["G"]
+        assert not rest.has_more
+
+    def test_changes_committed_between_the_reads_are_not_skipped(
+        self, collection, monkeypatch
+    ):
+        # Given
+        _, token = sync_all(collection)
+        read_tombstones = AlbumTombstone.objects.filter
+
+        def write_then_read_tombstones(*args, **kwargs):
+            # Another request commits an edit and a delete after the albums
+            # were read.
+            monkeypatch.setattr(AlbumTombstone.objects, "filter", read_tombstones)
+            album = collection.albums.get(title="A")
+            album.title = "A (Remastered)"
+            album.save()
+            collection.albums.get(title="C").delete()
+            return read_tombstones(*args, **kwargs)
+
+        monkeypatch.setattr(
+            AlbumTombstone.objects, "filter", write_then_read_tombstones
+        )
+        # When
+        changes = changes_since(collection, token, page_size=10)
+        rest = changes_since(collection, changes.token, page_size=10)
+        # Then
+        assert (changes.albums, changes.deleted, changes.token) == ([], [], token)
+        assert [album.title for album in rest.albums] == ["A (Remastered)"]
+        assert len(rest.deleted) == 1
+
+    def test_no_changes_keep_the_token(self, collection):
+        # When
+        changes = changes_since(collection, 5)
+        # Then
+        assert (changes.albums, changes.deleted, changes.token) == ([], [], 5)
+
+
+class TestCompaction:
+    @pytest.fixture
+    def deleted(self, domain_user):
+        for title in ("A", "B", "C"):
+            domain_user.add_to_collection(Album(title=title, artist="X"))
+        domain_user.albums.get(title="A").delete()
+        domain_user.albums.get(title="B").delete()
+        AlbumTombstone.objects.filter(seq=4).update(
+            deleted_at=timezone.now() - timedelta(days=40)
+        )
+        return domain_user
+
+    def test_old_tombstones_are_compacted(self, deleted):
+        # When
+        compacted = compact_tombstones(retention_days=30)
+        # Then
+        assert compacted == 1
+        assert list(AlbumTombstone.objects.values_list("seq", flat=True)) == [5]
+        assert SyncState.objects.get(user=deleted).compacted_seq == 4
+
+    def test_zero_retention_compacts_all_tombstones(self, deleted, settings):
+        # Given
+        settings.SYNC_TOMBSTONE_RETENTION_DAYS = 30
+        # When
+        compacted = compact_tombstones(retention_days=0)
+        # Then
+        assert compacted == 2
+        assert not AlbumTombstone.objects.exists()
+        assert SyncState.objects.get(user=deleted).compacted_seq == 5
+
+    def test_tokens_before_compaction_expire(self, deleted):
+        # Given
+        compact_tombstones(retention_days=30)
+        # When / Then
+        with pytest.raises(SyncTokenExpiredError):
+            changes_since(deleted, 3)
+        assert changes_since(deleted, 4).deleted == [
+            AlbumTombstone.objects.get().album_id
+        ]
+        assert [album.title for album in changes_since(deleted, 0).albums] == ["C"]
+
+    def test_compact_tombstones_command(self, deleted):
+        # Given
+        out = StringIO()
+        # When
+        call_command("compact_tombstones", "--days", "30", stdout=out)
+        # Then
+        assert "1 tombstones deleted." in out.getvalue()
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from albumz_app import constants, views
+from albumz_app.live.views import album_events_view
 
 app_name = constants.APP_NAME
 urlpatterns = [
@@ -48,4 +49,12 @@ urlpatterns = [
         views.AlbumAddWishlistView.as_view(),
         name=constants.URLNames.ADD_TO_WISHLIST,
     ),
+    # ex: /albumz/analytics/
+    path(
+        "analytics/",
+        views.AnalyticsView.as_view(),
+        name=constants.URLNames.ANALYTICS,
+    ),
+    # Server-sent events, see albumz_app/live/
+    path("events/", album_events_view, name=constants.URLNames.EVENTS),
 ]
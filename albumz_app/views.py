@@ -8,12 +8,14 @@ from django.views.decorators.cache import never_cache
 from django.views.generic.edit import DeleteView, FormView, UpdateView
 
 from . import constants
+from .analytics.dashboard import collection_analytics
+from .covers.uploads import attach_cover
 from .domain.exceptions import (
     AlbumAlreadyInCollectionError,
     AlbumAlreadyOnWishlistError,
     AlbumDoesNotExistError,
 )
-from .domain.models import Album
+from .domain.models import Album, Genre, Rating
 from .forms.album_forms import (
     AlbumCollectionForm,
     AlbumSearchForm,
@@ -40,6 +42,10 @@ class EditView(LoginRequiredMixin, UpdateView):
     def form_valid(self, form):
         domain_user = self.request.user.albumz_user
         edited_album = form.save(commit=False)
+        if form.cleaned_data.get("cover_image"):
+            # Only stores the upload, the thumbnails are made by the job worker.
+            # The cover is saved along with the edit, not in a save of its own.
+            attach_cover(self.object, form.cleaned_data["cover_image"], save=False)
         try:
             domain_user.edit_album(self.object, edited_album)
         except AlbumAlreadyInCollectionError:
@@ -48,7 +54,8 @@ class EditView(LoginRequiredMixin, UpdateView):
         except AlbumAlreadyOnWishlistError:
             form.add_error(None, constants.ResponseStrings.ALBUM_ON_WISHLIST_ERROR)
             return self.form_invalid(form)
-        return super().form_valid(form)
+        # `edit_album` saved the album, saving the form would save it again.
+        return HttpResponseRedirect(self.get_success_url())
 
     def get_success_url(self):
         if self.object.is_in_collection():
@@ -80,7 +87,7 @@ class AlbumsSearchMixin:
     def get_search_queryset(self, queryset):
         self.form = AlbumSearchForm(self.request.GET)
         if self.form.is_valid() and self.form.cleaned_data["query"] is not None:
-            return queryset.search_query(self.form.cleaned_data["query"])
+            return queryset.fuzzy_search(self.form.cleaned_data["query"])
         return queryset
 
 
@@ -109,7 +116,7 @@ class AlbumsView(LoginRequiredMixin, AlbumsSearchMixin, generic.ListView):
         domain_user = self.request.user.albumz_user
         return self.get_search_queryset(
             self.mode_config[self.kwargs["mode"]]["queryset"](domain_user.albums)
-        )
+        ).select_related("cover")
 
 
 class AlbumAddColletionView(LoginRequiredMixin, FormView):
@@ -150,6 +157,11 @@ class AlbumAddWishlistView(LoginRequiredMixin, FormView):
 class AlbumDeleteView(LoginRequiredMixin, DeleteView):
     model = Album
 
+    def form_valid(self, form):
+        success_url = self.get_success_url()
+        self.request.user.albumz_user.delete_album(self.object)
+        return HttpResponseRedirect(success_url)
+
     def get_success_url(self):
         if self.object.is_in_collection():
             return reverse_lazy(constants.ReverseURLNames.COLLECTION)
@@ -158,3 +170,47 @@ class AlbumDeleteView(LoginRequiredMixin, DeleteView):
     def get_queryset(self):
         domain_user = self.request.user.albumz_user
         return domain_user.albums.all()
+
+
+def chart(entries, label):
+    """Labelled bars of the album counts, as percentages of the largest one."""
+    largest = max((entry["albums"] for entry in entries), default=0) or 1
+    return [
+        {
+            "label": label(entry),
+            "albums": entry["albums"],
+            "share": 100 * entry["albums"] / largest,
+        }
+        for entry in entries
+    ]
+
+
+@method_decorator(never_cache, name="dispatch")
+class AnalyticsView(LoginRequiredMixin, generic.TemplateView):
+    template_name = constants.DirPaths.TEMPLATES_PATH.file("analytics.html")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        analytics = collection_analytics(self.request.user.albumz_user)
+        ratings = dict(Rating.choices)
+        context.update(
+            added_per_month=chart(
+                analytics["added_per_month"], lambda entry: f"{entry['month']:%Y-%m}"
+            ),
+            ratings=chart(analytics["ratings"], lambda entry: ratings[entry["rating"]]),
+            decades=chart(
+                analytics["decades"],
+                lambda entry: (
+                    "Unknown" if entry["decade"] is None else f"{entry['decade']}s"
+                ),
+            ),
+            genres=Genre.labels,
+            genres_per_month=[
+                {
+                    "month": entry["month"],
+                    "albums": [entry["genres"].get(genre, 0) for genre in Genre.values],
+                }
+                for entry in analytics["genres_per_month"]
+            ],
+        )
+        return context
@@ -14,5 +14,13 @@ python manage.py migrate --noinput
 
 python manage.py collectstatic --noinput
 
+# Workers share their metrics through files, stale ones must not be summed up
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/albumz_metrics}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 echo "Starting Gunicorn..."
-exec gunicorn --bind 0.0.0.0:8000 --workers 3 albumz.wsgi:application
+# Workers are replaced after a (jittered) number of requests, so that memory
+# they hold on to cannot grow without bound
+exec gunicorn --config gunicorn.conf.py --bind 0.0.0.0:8000 --workers 3 \
+    --max-requests 1000 --max-requests-jitter 100 albumz.wsgi:application
@@ -0,0 +1,6 @@
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Counters of a dead worker keep counting, its live gauges are dropped.
+    multiprocess.mark_process_dead(worker.pid)